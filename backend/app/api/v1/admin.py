@@ -0,0 +1,50 @@
+"""
+Admin endpoints (users listed in ADMIN_USERNAMES)
+"""
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends, status
+from pydantic import BaseModel
+
+from app.middleware.auth_middleware import get_current_admin_user
+from app.services.user_provisioning import (
+    ProvisioningError, TooManyRowsError, parse_rows, user_provisioner
+)
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+class ProvisionRowResult(BaseModel):
+    row: int
+    username: Optional[str] = None
+    status: str
+    error: Optional[str] = None
+
+class ProvisionReport(BaseModel):
+    dry_run: bool
+    total_rows: int
+    counts: Dict[str, int]
+    elapsed_seconds: float
+    rows: List[ProvisionRowResult]
+
+@router.post("/users/provision", response_model=ProvisionReport)
+async def provision_users(
+    file: UploadFile = File(...),
+    dry_run: bool = Form(False),
+    current_user: dict = Depends(get_current_admin_user),
+):
+    """
+    Create users in bulk from a CSV (name,email,username,password header) or
+    JSONL upload; every row is validated like /auth/register and reported
+    """
+    try:
+        rows = parse_rows(await file.read(), file.filename or "")
+        return await user_provisioner.provision(rows, dry_run=dry_run)
+    except TooManyRowsError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except ProvisioningError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.get("/users/provision/stats")
+async def get_provisioning_stats(current_user: dict = Depends(get_current_admin_user)):
+    """Get bulk provisioning throughput for this worker"""
+    return user_provisioner.get_stats()
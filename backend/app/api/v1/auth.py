@@ -1,4 +1,5 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Request, status, Depends
 from fastapi.security import HTTPAuthorizationCredentials
 from app.schemas.auth import (
     UserRegister, 
@@ -6,11 +7,16 @@ from app.schemas.auth import (
     UserResponse, 
     Token, 
     LoginResponse, 
-    RegisterResponse
+    RegisterResponse,
+    RefreshRequest
 )
-from app.services.auth_service import AuthService
-from app.middleware.auth_middleware import get_current_active_user
-from datetime import timedelta
+from app.services.auth_service import AuthService, DuplicateUserError
+from app.middleware.auth_middleware import get_current_active_user, security
+from app.services.login_throttle import LoginThrottledError, login_throttle
+from app.services.password_hasher import PasswordHasherBusyError, password_hasher
+from app.services.principal_cache import principal_cache
+from app.services.token_denylist import token_denylist
+from app.services.user_state import user_state
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
@@ -18,24 +24,8 @@ router = APIRouter(prefix="/auth", tags=["authentication"])
 async def register_user(user_data: UserRegister):
     """Register a new user"""
     
-    # Check if username already exists
-    existing_user = await AuthService.get_user_by_username(user_data.username)
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already registered"
-        )
-    
-    # Check if email already exists
-    existing_email = await AuthService.get_user_by_email(user_data.email)
-    if existing_email:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
-    
     try:
-        # Create user
+        # Create user; the unique constraints on username and email reject duplicates
         user = await AuthService.create_user(
             name=user_data.name,
             email=user_data.email,
@@ -43,19 +33,26 @@ async def register_user(user_data: UserRegister):
             password=user_data.password
         )
         
-        # Create access token
-        access_token_expires = timedelta(minutes=30)
-        access_token = AuthService.create_access_token(
-            data={"sub": user["username"]}, 
-            expires_delta=access_token_expires
-        )
+        # Create access and refresh tokens
+        tokens = AuthService.create_token_pair(user)
         
         return RegisterResponse(
             user=UserResponse(**user),
-            token=Token(access_token=access_token),
+            token=Token(**tokens),
             message="Registration successful"
         )
         
+    except DuplicateUserError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except PasswordHasherBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -63,15 +60,36 @@ async def register_user(user_data: UserRegister):
         )
 
 @router.post("/login", response_model=LoginResponse)
-async def login_user(user_credentials: UserLogin):
+async def login_user(user_credentials: UserLogin, request: Request):
     """Login user with username and password"""
     
-    # Authenticate user
-    user = await AuthService.authenticate_user(
-        username=user_credentials.username,
-        password=user_credentials.password
+    # Throttle per username and client IP before any password hashing
+    client_ip = login_throttle.client_ip(
+        request.client.host if request.client else None, request.headers.get("x-forwarded-for")
     )
+    try:
+        await login_throttle.check(user_credentials.username, client_ip)
+    except LoginThrottledError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    
+    # Authenticate user
+    try:
+        user = await AuthService.authenticate_user(
+            username=user_credentials.username,
+            password=user_credentials.password
+        )
+    except PasswordHasherBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
     
+    await login_throttle.record(user_credentials.username, success=user is not None)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -79,16 +97,12 @@ async def login_user(user_credentials: UserLogin):
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Create access token
-    access_token_expires = timedelta(minutes=30)
-    access_token = AuthService.create_access_token(
-        data={"sub": user["username"]}, 
-        expires_delta=access_token_expires
-    )
+    # Create access and refresh tokens
+    tokens = AuthService.create_token_pair(user)
     
     return LoginResponse(
         user=UserResponse(**user),
-        token=Token(access_token=access_token),
+        token=Token(**tokens),
         message="Login successful"
     )
 
@@ -98,20 +112,40 @@ async def get_current_user_info(current_user: dict = Depends(get_current_active_
     return UserResponse(**current_user)
 
 @router.post("/logout")
-async def logout_user(current_user: dict = Depends(get_current_active_user)):
-    """Logout user (client should remove token)"""
+async def logout_user(
+    body: Optional[RefreshRequest] = None,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: dict = Depends(get_current_active_user),
+):
+    """Logout user: revoke the access token and, if sent, the refresh token"""
+    # get_current_active_user already verified this token
+    payload = AuthService.verify_token(credentials.credentials)
+    await AuthService.logout(payload, body.refresh_token if body else None)
     return {
         "message": "Logout successful",
-        "detail": "Please remove the token from client storage"
+        "detail": "Tokens have been revoked"
     }
 
 @router.post("/refresh", response_model=Token)
-async def refresh_token(current_user: dict = Depends(get_current_active_user)):
-    """Refresh access token"""
-    access_token_expires = timedelta(minutes=30)
-    access_token = AuthService.create_access_token(
-        data={"sub": current_user["username"]}, 
-        expires_delta=access_token_expires
-    )
+async def refresh_token(body: RefreshRequest):
+    """Exchange a refresh token for a new access and refresh token (the old one is spent)"""
+    user = await AuthService.rotate_refresh_token(body.refresh_token)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     
-    return Token(access_token=access_token)
+    return Token(**AuthService.create_token_pair(user))
+
+@router.get("/stats")
+async def get_auth_stats(current_user: dict = Depends(get_current_active_user)):
+    """Get authentication cache metrics for this worker"""
+    return {
+        "principal_cache": principal_cache.get_stats(),
+        "password_hashing": password_hasher.get_stats(),
+        "user_state": user_state.get_stats(),
+        "token_denylist": token_denylist.get_stats(),
+        "login_throttle": login_throttle.get_stats(),
+    }
@@ -0,0 +1,191 @@
+"""
+Batch analysis job endpoints with authentication
+"""
+import asyncio
+import json
+from datetime import datetime
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends, Request, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from tortoise.functions import Count
+from tortoise.transactions import in_transaction
+
+from app.core.config import settings
+from app.models.batch import BatchJob, BatchJobItem
+from app.middleware.auth_middleware import get_current_active_user
+from app.services.batch_worker import batch_worker_pool, remove_spooled, spool_upload
+from app.services.preflight import RequestTooLargeError, estimate_analysis
+
+router = APIRouter(prefix="/batch", tags=["batch"])
+
+class BatchTextJobRequest(BaseModel):
+    texts: List[str]
+    analysis_type: str = "summary"
+
+class BatchJobCreated(BaseModel):
+    job_id: UUID
+    status: str
+    total_items: int
+
+class BatchJobItemResponse(BaseModel):
+    id: int
+    position: int
+    source_name: str
+    status: str
+    attempts: int
+    result: Optional[str] = None
+    error: Optional[str] = None
+
+class BatchJobResponse(BaseModel):
+    job_id: UUID
+    status: str
+    analysis_type: str
+    total_items: int
+    counts: Dict[str, int]
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+    items: Optional[List[BatchJobItemResponse]] = None
+
+ITEM_FIELDS = ("id", "position", "source_name", "status", "attempts", "result", "error")
+
+def _check_item_count(count: int):
+    if not count:
+        raise HTTPException(status_code=400, detail="A batch job needs at least one item")
+    if count > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"A batch job can have at most {settings.BATCH_MAX_ITEMS} items"
+        )
+
+async def _create_job(owner_id: int, analysis_type: str, sources: List[tuple]) -> BatchJob:
+    """
+    Insert the job and its queue items in one transaction, then wake local workers.
+    sources are (name, text, spooled path) tuples; file items have no text yet.
+    """
+    _check_item_count(len(sources))
+    for name, text, source_path in sources:
+        if source_path is not None:
+            continue
+        try:
+            estimate_analysis(text, analysis_type)
+        except RequestTooLargeError as e:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=f"{name}: {str(e)}")
+
+    async with in_transaction():
+        job = await BatchJob.create(owner_id=owner_id, analysis_type=analysis_type, total_items=len(sources))
+        await BatchJobItem.bulk_create([
+            BatchJobItem(job_id=job.id, position=i, source_name=name, text=text, source_path=source_path)
+            for i, (name, text, source_path) in enumerate(sources)
+        ])
+
+    batch_worker_pool.notify()
+    return job
+
+async def _get_owned_job(job_id: UUID, current_user: dict) -> BatchJob:
+    job = await BatchJob.filter(id=job_id, owner_id=current_user["id"]).first()
+    if job is None:
+        raise HTTPException(status_code=404, detail="Batch job not found")
+    return job
+
+async def _status_counts(job_id: UUID) -> Dict[str, int]:
+    rows = await BatchJobItem.filter(job_id=job_id).annotate(count=Count("id")).group_by("status").values("status", "count")
+    counts = {"pending": 0, "running": 0, "done": 0, "failed": 0}
+    counts.update({row["status"]: row["count"] for row in rows})
+    return counts
+
+@router.post("/jobs", response_model=BatchJobCreated, status_code=status.HTTP_202_ACCEPTED)
+async def create_text_job(request: BatchTextJobRequest, current_user: dict = Depends(get_current_active_user)):
+    """Queue a batch of texts for analysis"""
+    sources = [(f"text-{i + 1}", text, None) for i, text in enumerate(request.texts) if text.strip()]
+    job = await _create_job(current_user["id"], request.analysis_type, sources)
+    return BatchJobCreated(job_id=job.id, status=job.status, total_items=job.total_items)
+
+@router.post("/jobs/files", response_model=BatchJobCreated, status_code=status.HTTP_202_ACCEPTED)
+async def create_file_job(
+    files: List[UploadFile] = File(...),
+    analysis_type: str = Form("summary"),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Queue a batch of uploaded documents for analysis. Files are only spooled here;
+    workers extract each one as the first step of its item, so extraction errors
+    show up as failed items rather than rejecting the batch.
+    """
+    _check_item_count(len(files))
+    paths = []
+    try:
+        for file in files:
+            paths.append(await asyncio.to_thread(spool_upload, file.file, file.filename))
+        job = await _create_job(
+            current_user["id"], analysis_type,
+            [(file.filename, "", path) for file, path in zip(files, paths)]
+        )
+    except BaseException:
+        for path in paths:
+            remove_spooled(path)
+        raise
+    return BatchJobCreated(job_id=job.id, status=job.status, total_items=job.total_items)
+
+@router.get("/jobs/{job_id}", response_model=BatchJobResponse)
+async def get_job(job_id: UUID, include_items: bool = True, current_user: dict = Depends(get_current_active_user)):
+    """Poll job progress, optionally with per-item status and results"""
+    job = await _get_owned_job(job_id, current_user)
+    items = None
+    if include_items:
+        rows = await BatchJobItem.filter(job_id=job.id).order_by("position").values(*ITEM_FIELDS)
+        items = [BatchJobItemResponse(**row) for row in rows]
+
+    return BatchJobResponse(
+        job_id=job.id,
+        status=job.status,
+        analysis_type=job.analysis_type,
+        total_items=job.total_items,
+        counts=await _status_counts(job.id),
+        created_at=job.created_at,
+        completed_at=job.completed_at,
+        items=items
+    )
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: UUID, request: Request, current_user: dict = Depends(get_current_active_user)):
+    """Stream per-item results and progress as Server-Sent Events (item, progress, done)"""
+    job = await _get_owned_job(job_id, current_user)
+
+    async def event_stream():
+        reported = set()
+        while not await request.is_disconnected():
+            # Read job status first so items finished before completion are still reported below
+            current = await BatchJob.filter(id=job.id).values_list("status", flat=True)
+            completed = bool(current) and current[0] == "completed"
+
+            # Finished rows not yet sent, by id rather than by update time: a row stamped
+            # before the last poll can commit after it (jobs are capped at BATCH_MAX_ITEMS)
+            query = BatchJobItem.filter(job_id=job.id, status__in=["done", "failed"])
+            if reported:
+                query = query.exclude(id__in=list(reported))
+            finished = await query.order_by("updated_at").values(*ITEM_FIELDS)
+            for row in finished:
+                reported.add(row["id"])
+                yield f"event: item\ndata: {json.dumps(row)}\n\n"
+
+            counts = await _status_counts(job.id)
+            yield f"event: progress\ndata: {json.dumps(counts)}\n\n"
+
+            if completed:
+                yield f"event: done\ndata: {json.dumps({'job_id': str(job.id)})}\n\n"
+                return
+            await asyncio.sleep(settings.BATCH_POLL_INTERVAL_SECONDS)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/stats")
+async def get_batch_stats(current_user: dict = Depends(get_current_active_user)):
+    """Get batch worker pool counters for this worker"""
+    return batch_worker_pool.get_stats()
@@ -1,14 +1,27 @@
 """
 Bedrock API endpoints with authentication
 """
-from fastapi import APIRouter, HTTPException, UploadFile, File, Depends
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends, Header, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from dataclasses import asdict
 from typing import List, Dict, Optional
-import PyPDF2
-import docx
-import io
+from datetime import timedelta
+import json
 
+from tortoise import timezone
+from tortoise.functions import Count, Sum
+
+from app.core.config import settings
 from app.services.bedrock_service import bedrock_service
+from app.services.bedrock_executor import BedrockOverloadedError
+from app.services.document_extractor import UnsupportedDocumentError, DocumentLimitError
+from app.services.document_index import document_index_cache, select_excerpts
+from app.services.extraction_cache import extraction_cache
+from app.services.page_selection import PageSelection, PageSelectionError
+from app.services.pdf_extractor import pdf_extraction_pool
+from app.services.preflight import RequestTooLargeError, estimate_analysis, estimate_question
+from app.models.usage import BedrockUsage
 from app.middleware.auth_middleware import get_current_active_user, get_current_user_optional
 
 router = APIRouter()
@@ -27,66 +40,301 @@ class DocumentAnalysisRequest(BaseModel):
 class DocumentAnalysisResponse(BaseModel):
     analysis: str
 
+class EstimateRequest(BaseModel):
+    text: Optional[str] = None
+    analysis_type: str = "summary"
+    message: Optional[str] = None
+    conversation_history: Optional[List[Dict]] = None
+
+class DocumentExcerpt(BaseModel):
+    chunk: int
+    score: float
+    text: str
+
+class DocumentQuestionResponse(BaseModel):
+    answer: str
+    total_chunks: int
+    excerpts: List[DocumentExcerpt]
+
+def _cache_bypass_requested(cache_control: Optional[str], x_cache_bypass: Optional[str]) -> bool:
+    """True if the client asked to skip the response cache for this request"""
+    if x_cache_bypass and x_cache_bypass.strip().lower() in ("1", "true", "yes"):
+        return True
+    return bool(cache_control and "no-cache" in cache_control.lower())
+
 @router.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest, current_user: dict = Depends(get_current_active_user)):
-    """Simple chat endpoint"""
+async def chat(request: ChatRequest, response: Response, current_user: dict = Depends(get_current_active_user)):
+    """Simple chat endpoint (estimated token usage is returned in X-Estimated-* headers)"""
+    try:
+        estimate = bedrock_service.estimate_chat(request.message, request.conversation_history)
+    except RequestTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    response.headers.update(estimate.headers())
     try:
-        response = await bedrock_service.chat(
+        reply = await bedrock_service.chat(
             message=request.message,
-            conversation_history=request.conversation_history
+            conversation_history=request.conversation_history,
+            user_id=current_user["id"]
         )
-        return ChatResponse(response=response)
+        return ChatResponse(response=reply)
+    except RequestTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except BedrockOverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _sse_event(event: str, data: dict) -> str:
+    """Format a Server-Sent Event frame"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest, current_user: dict = Depends(get_current_active_user)):
+    """Streaming chat endpoint (Server-Sent Events: token, done, error)"""
+    try:
+        estimate = bedrock_service.estimate_chat(request.message, request.conversation_history)
+    except RequestTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    async def event_stream():
+        try:
+            async for delta in bedrock_service.chat_stream(
+                message=request.message,
+                conversation_history=request.conversation_history,
+                user_id=current_user["id"]
+            ):
+                yield _sse_event("token", {"text": delta})
+            yield _sse_event("done", {})
+        except RequestTooLargeError as e:
+            yield _sse_event("error", {"status": 413, "detail": str(e)})
+        except BedrockOverloadedError as e:
+            yield _sse_event("error", {"status": 503, "detail": str(e)})
+        except Exception as e:
+            yield _sse_event("error", {"status": 500, "detail": str(e)})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", **estimate.headers()}
+    )
+
 @router.post("/analyze-text", response_model=DocumentAnalysisResponse)
-async def analyze_text(request: DocumentAnalysisRequest, current_user: dict = Depends(get_current_active_user)):
-    """Analyze text document"""
+async def analyze_text(
+    request: DocumentAnalysisRequest,
+    response: Response,
+    cache_control: Optional[str] = Header(None),
+    x_cache_bypass: Optional[str] = Header(None),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Analyze text document (send X-Cache-Bypass: true to skip the response cache)"""
+    try:
+        estimate = estimate_analysis(request.text, request.analysis_type)
+    except RequestTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    response.headers.update(estimate.headers())
     try:
         analysis = await bedrock_service.analyze_document(
             text=request.text,
-            analysis_type=request.analysis_type
+            analysis_type=request.analysis_type,
+            use_cache=not _cache_bypass_requested(cache_control, x_cache_bypass),
+            user_id=current_user["id"],
+            estimate=estimate
         )
         return DocumentAnalysisResponse(analysis=analysis)
+    except BedrockOverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/analyze-document", response_model=DocumentAnalysisResponse)
 async def analyze_document(
+    response: Response,
     file: UploadFile = File(...),
     analysis_type: str = "summary",
+    pages: Optional[str] = None,
+    sample: Optional[str] = None,
+    cache_control: Optional[str] = Header(None),
+    x_cache_bypass: Optional[str] = Header(None),
     current_user: dict = Depends(get_current_active_user)
 ):
-    """Analyze uploaded document"""
+    """
+    Analyze uploaded document (send X-Cache-Bypass: true to skip the response cache)
+
+    For a quick look at a long PDF, pass pages ("1-5,12") or sample (first:N,
+    every:K or toc[:N]) and only those pages are extracted and analyzed.
+    """
     try:
-        # Read file content
-        content = await file.read()
-        text = ""
-        
-        # Extract text based on file type
-        if file.filename.endswith('.pdf'):
-            pdf_reader = PyPDF2.PdfReader(io.BytesIO(content))
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-        elif file.filename.endswith('.docx'):
-            doc = docx.Document(io.BytesIO(content))
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-        elif file.filename.endswith('.txt'):
-            text = content.decode('utf-8')
-        else:
-            raise HTTPException(status_code=400, detail="Unsupported file type")
+        try:
+            selection = PageSelection.parse(pages, sample)
+        except PageSelectionError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        # Extract text straight from the spooled upload, off the event loop; known files skip parsing
+        try:
+            document = await extraction_cache.extract(file.file, file.filename, selection)
+        except UnsupportedDocumentError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except DocumentLimitError as e:
+            raise HTTPException(status_code=413, detail=str(e))
         
-        if not text.strip():
+        if not document.text.strip():
             raise HTTPException(status_code=400, detail="No text found in document")
+
+        try:
+            estimate = estimate_analysis(document.text, analysis_type)
+        except RequestTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        response.headers.update(estimate.headers())
         
         # Analyze document
         analysis = await bedrock_service.analyze_document(
-            text=text,
-            analysis_type=analysis_type
+            text=document.text,
+            analysis_type=analysis_type,
+            use_cache=not _cache_bypass_requested(cache_control, x_cache_bypass),
+            user_id=current_user["id"],
+            estimate=estimate
         )
         
         return DocumentAnalysisResponse(analysis=analysis)
         
+    except HTTPException:
+        raise
+    except BedrockOverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/ask-document", response_model=DocumentQuestionResponse)
+async def ask_document(
+    response: Response,
+    file: UploadFile = File(...),
+    question: str = Form(...),
+    top_k: Optional[int] = Form(None),
+    cache_control: Optional[str] = Header(None),
+    x_cache_bypass: Optional[str] = Header(None),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Ask a question about an uploaded document
+
+    The document is split into small chunks and indexed with BM25 (cached per
+    document); only the top_k chunks most relevant to the question are sent to
+    the model, so prompt size stays flat however long the document is.
+    """
+    if not question.strip():
+        raise HTTPException(status_code=400, detail="Question is required")
+    top_k = max(1, min(top_k or settings.RETRIEVAL_TOP_K, settings.RETRIEVAL_MAX_TOP_K))
+    try:
+        try:
+            document = await extraction_cache.extract(file.file, file.filename)
+        except UnsupportedDocumentError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except DocumentLimitError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+
+        if not document.text.strip():
+            raise HTTPException(status_code=400, detail="No text found in document")
+
+        index = await document_index_cache.get(document.text, document.sha256)
+        ranked = select_excerpts(index, question, top_k)
+        excerpts = [index.chunks[i] for i, _ in ranked]
+        try:
+            estimate = estimate_question(question, excerpts)
+        except RequestTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        response.headers.update(estimate.headers())
+
+        answer = await bedrock_service.ask_document(
+            question=question,
+            excerpts=excerpts,
+            use_cache=not _cache_bypass_requested(cache_control, x_cache_bypass),
+            user_id=current_user["id"],
+            estimate=estimate
+        )
+
+        return DocumentQuestionResponse(
+            answer=answer,
+            total_chunks=index.size,
+            excerpts=[DocumentExcerpt(chunk=i, score=round(score, 3), text=index.chunks[i]) for i, score in ranked]
+        )
+
+    except HTTPException:
+        raise
+    except BedrockOverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/estimate")
+async def estimate_request(request: EstimateRequest, current_user: dict = Depends(get_current_active_user)):
+    """
+    Estimate the tokens and Bedrock calls of an analysis (text) or chat turn
+    (message) without sending it; 413 when it would be rejected
+    """
+    try:
+        if request.text is not None:
+            estimate = estimate_analysis(request.text, request.analysis_type)
+        elif request.message is not None:
+            estimate = bedrock_service.estimate_chat(request.message, request.conversation_history)
+        else:
+            raise HTTPException(status_code=400, detail="Provide text or message to estimate")
+    except RequestTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    return asdict(estimate)
+
+@router.post("/estimate-document")
+async def estimate_document(
+    file: UploadFile = File(...),
+    analysis_type: str = "summary",
+    pages: Optional[str] = None,
+    sample: Optional[str] = None,
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Estimate analyzing an uploaded document without sending it; the extracted
+    text is cached, so the analysis that follows does not parse it again
+    """
+    try:
+        selection = PageSelection.parse(pages, sample)
+        document = await extraction_cache.extract(file.file, file.filename, selection)
+    except (UnsupportedDocumentError, PageSelectionError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except DocumentLimitError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    try:
+        estimate = estimate_analysis(document.text, analysis_type)
+    except RequestTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    return {**asdict(estimate), "characters": len(document.text), "pages": document.page_count}
+
+@router.get("/stats")
+async def get_bedrock_stats(current_user: dict = Depends(get_current_active_user)):
+    """Get Bedrock concurrency, queue-depth and cache metrics for this worker"""
+    return {
+        **bedrock_service.get_stats(),
+        "pdf_extraction": pdf_extraction_pool.get_stats(),
+        "extraction_cache": extraction_cache.get_stats(),
+        "document_index": document_index_cache.get_stats(),
+    }
+
+@router.get("/usage")
+async def get_my_usage(days: int = 30, current_user: dict = Depends(get_current_active_user)):
+    """Get the current user's Bedrock calls and tokens per model over the last days"""
+    since = timezone.now() - timedelta(days=days)
+    rows = await BedrockUsage.filter(user_id=current_user["id"], created_at__gte=since) \
+        .annotate(calls=Count("id"), total_input_tokens=Sum("input_tokens"), total_output_tokens=Sum("output_tokens")) \
+        .group_by("model_id") \
+        .values("model_id", "calls", "total_input_tokens", "total_output_tokens")
+    return {
+        "days": days,
+        "models": [
+            {
+                "model_id": row["model_id"],
+                "calls": row["calls"],
+                "input_tokens": row["total_input_tokens"] or 0,
+                "output_tokens": row["total_output_tokens"] or 0,
+            }
+            for row in rows
+        ],
+    }
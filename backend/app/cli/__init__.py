@@ -0,0 +1,3 @@
+"""
+Command-line tools, run from the backend directory with python -m app.cli.<tool>
+"""
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Bulk user provisioning from the command line
+
+Same pipeline as POST /api/v1/admin/users/provision, straight against the
+database (DATABASE_URL). Prints a summary, writes the per-row report as JSONL
+when --report is given and exits non-zero if any row was not created. Run from
+the backend directory:
+
+    python -m app.cli.provision_users users.csv --report report.jsonl
+    python -m app.cli.provision_users users.jsonl --dry-run --workers 8
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+from tortoise import Tortoise
+
+from app.database import TORTOISE_ORM
+from app.services.user_provisioning import CREATED, VALID, ProvisioningError, parse_rows, user_provisioner
+
+
+async def main_async(args) -> int:
+    with open(args.file, "rb") as f:
+        data = f.read()
+    if args.workers:
+        user_provisioner.max_workers = args.workers
+    if args.chunk_size:
+        user_provisioner.chunk_size = args.chunk_size
+
+    await Tortoise.init(config=TORTOISE_ORM)
+    try:
+        report = await user_provisioner.provision(parse_rows(data, args.file), dry_run=args.dry_run)
+    except ProvisioningError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    finally:
+        user_provisioner.shutdown()
+        await Tortoise.close_connections()
+
+    counts = ", ".join(f"{status}: {count}" for status, count in sorted(report["counts"].items()))
+    print(f"✅ {report['total_rows']} rows in {report['elapsed_seconds']:.1f}s ({counts})")
+    if args.report:
+        with open(args.report, "w") as f:
+            for row in report["rows"]:
+                f.write(json.dumps(row) + "\n")
+        print(f"📄 Per-row report written to {args.report}")
+    else:
+        for row in report["rows"]:
+            if row["status"] not in (CREATED, VALID):
+                print(f"  row {row['row']}: {row['status']} {row['username'] or ''} {row['error'] or ''}")
+
+    ok = VALID if args.dry_run else CREATED
+    return 0 if report["counts"].get(ok, 0) == report["total_rows"] else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create users in bulk from CSV or JSONL")
+    parser.add_argument("file", help="CSV with a name,email,username,password header, or JSONL")
+    parser.add_argument("--dry-run", action="store_true", help="Validate and check for existing users only")
+    parser.add_argument("--report", help="Write the per-row report to this JSONL file")
+    parser.add_argument("--workers", type=int, default=0, help="Hashing processes (default PROVISION_HASH_WORKERS)")
+    parser.add_argument("--chunk-size", type=int, default=0, help="Rows per bulk insert (default PROVISION_CHUNK_SIZE)")
+    sys.exit(asyncio.run(main_async(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
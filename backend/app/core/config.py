@@ -1,4 +1,5 @@
 import os
+import json
 from typing import Optional
 
 class Settings:
@@ -9,11 +10,135 @@ class Settings:
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "your-super-secret-jwt-key-change-in-production")
     JWT_ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("JWT_ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+    JWT_REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("JWT_REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+    # Revoked token ids live in Postgres and are mirrored into each worker every AUTH_DENYLIST_SYNC_SECONDS
+    AUTH_DENYLIST_SYNC_SECONDS: float = float(os.getenv("AUTH_DENYLIST_SYNC_SECONDS", "2"))
+    # Resolved users are cached per worker; the TTL bounds staleness across workers (0 entries disables)
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS: float = float(os.getenv("AUTH_PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+    AUTH_PRINCIPAL_CACHE_MAX_ENTRIES: int = int(os.getenv("AUTH_PRINCIPAL_CACHE_MAX_ENTRIES", "10000"))
+    # Stateless tokens carry the user's claims and token_version, so requests skip the users table;
+    # only users changed recently (synced from Postgres every AUTH_STATE_SYNC_SECONDS) are looked up
+    AUTH_STATELESS_TOKENS: bool = os.getenv("AUTH_STATELESS_TOKENS", "false").lower() == "true"
+    AUTH_STATE_SYNC_SECONDS: float = float(os.getenv("AUTH_STATE_SYNC_SECONDS", "5"))
+
+    # Password Hashing Settings (bcrypt on a dedicated thread pool per worker; changing the cost rehashes on login)
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_MAX_QUEUE: int = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "32"))
+
+    # Login Throttle Settings (sliding window per username and client IP, checked before any bcrypt work)
+    LOGIN_THROTTLE_ENABLED: bool = os.getenv("LOGIN_THROTTLE_ENABLED", "true").lower() == "true"
+    # "memory" counts per uvicorn worker (limits apply per worker); "postgres" shares counts across workers
+    LOGIN_THROTTLE_BACKEND: str = os.getenv("LOGIN_THROTTLE_BACKEND", "memory").lower()
+    LOGIN_THROTTLE_WINDOW_SECONDS: int = int(os.getenv("LOGIN_THROTTLE_WINDOW_SECONDS", "300"))
+    LOGIN_THROTTLE_MAX_PER_USERNAME: int = int(os.getenv("LOGIN_THROTTLE_MAX_PER_USERNAME", "10"))
+    LOGIN_THROTTLE_MAX_PER_IP: int = int(os.getenv("LOGIN_THROTTLE_MAX_PER_IP", "50"))
+    LOGIN_THROTTLE_MAX_KEYS: int = int(os.getenv("LOGIN_THROTTLE_MAX_KEYS", "100000"))  # memory backend
+    # Use the first X-Forwarded-For address as the client IP (only behind a trusted proxy)
+    LOGIN_THROTTLE_TRUST_FORWARDED: bool = os.getenv("LOGIN_THROTTLE_TRUST_FORWARDED", "false").lower() == "true"
+
+    # Admin Settings (comma-separated usernames allowed to use the /admin endpoints)
+    ADMIN_USERNAMES: list = [u.strip().lower() for u in os.getenv("ADMIN_USERNAMES", "").split(",") if u.strip()]
+
+    # Bulk User Provisioning Settings (bcrypt across a process pool, rows inserted in chunks)
+    PROVISION_HASH_WORKERS: int = int(os.getenv("PROVISION_HASH_WORKERS", str(os.cpu_count() or 1)))
+    # bcrypt cost for provisioned passwords; a lower cost than BCRYPT_ROUNDS is upgraded on first login
+    PROVISION_BCRYPT_ROUNDS: int = int(os.getenv("PROVISION_BCRYPT_ROUNDS", os.getenv("BCRYPT_ROUNDS", "12")))
+    PROVISION_CHUNK_SIZE: int = int(os.getenv("PROVISION_CHUNK_SIZE", "1000"))
+    PROVISION_MAX_ROWS: int = int(os.getenv("PROVISION_MAX_ROWS", "50000"))
     
     # App Settings
     APP_NAME: str = "Co-Intelligence GenAI Universe"
     DEBUG: bool = os.getenv("DEBUG", "true").lower() == "true"
-    
+
+    # Bedrock Settings
+    AWS_REGION: str = os.getenv("AWS_DEFAULT_REGION", "us-east-1")
+    BEDROCK_MAX_CONCURRENCY: int = int(os.getenv("BEDROCK_MAX_CONCURRENCY", "16"))
+    BEDROCK_MAX_QUEUE: int = int(os.getenv("BEDROCK_MAX_QUEUE", "64"))
+    # "aws" for the real bedrock-runtime client, "fake" for the local stand-in (FAKE_BEDROCK_* env vars)
+    BEDROCK_CLIENT: str = os.getenv("BEDROCK_CLIENT", "aws").lower()
+    # Preflight sizing: requests that cannot fit the context window are rejected before sending
+    BEDROCK_CONTEXT_TOKENS: int = int(os.getenv("BEDROCK_CONTEXT_TOKENS", "200000"))
+    BEDROCK_MAX_OUTPUT_TOKENS: int = int(os.getenv("BEDROCK_MAX_OUTPUT_TOKENS", "4000"))
+
+    # Adaptive Throttling Settings (per model; the limit adapts between MIN and BEDROCK_MAX_CONCURRENCY)
+    BEDROCK_LIMIT_INITIAL: int = int(os.getenv("BEDROCK_LIMIT_INITIAL", "8"))
+    BEDROCK_LIMIT_MIN: int = int(os.getenv("BEDROCK_LIMIT_MIN", "1"))
+    BEDROCK_LIMIT_ACQUIRE_TIMEOUT: float = float(os.getenv("BEDROCK_LIMIT_ACQUIRE_TIMEOUT", "30"))
+    BEDROCK_RPM_LIMIT: int = int(os.getenv("BEDROCK_RPM_LIMIT", "0"))  # 0 disables the request-rate bucket
+    BEDROCK_MAX_RETRIES: int = int(os.getenv("BEDROCK_MAX_RETRIES", "3"))
+    BEDROCK_RETRY_BASE_DELAY: float = float(os.getenv("BEDROCK_RETRY_BASE_DELAY", "0.5"))
+    BEDROCK_RETRY_MAX_DELAY: float = float(os.getenv("BEDROCK_RETRY_MAX_DELAY", "8"))
+
+    # Model Routing Settings
+    BEDROCK_PRIMARY_MODEL: str = os.getenv("BEDROCK_PRIMARY_MODEL", "anthropic.claude-3-haiku-20240307-v1:0")
+    BEDROCK_FALLBACK_MODEL: str = os.getenv("BEDROCK_FALLBACK_MODEL", "anthropic.claude-3-haiku-20240307-v1:0")
+    BEDROCK_FAST_MODEL: str = os.getenv("BEDROCK_FAST_MODEL", "")  # Used for chats shorter than BEDROCK_SHORT_CHAT_CHARS
+    BEDROCK_SHORT_CHAT_CHARS: int = int(os.getenv("BEDROCK_SHORT_CHAT_CHARS", "500"))
+    # JSON mapping of analysis_type or operation ("chat", "analyze") to model id
+    BEDROCK_ROUTING_RULES: dict = json.loads(os.getenv("BEDROCK_ROUTING_RULES") or "{}")
+    BEDROCK_LATENCY_AWARE_ROUTING: bool = os.getenv("BEDROCK_LATENCY_AWARE_ROUTING", "true").lower() == "true"
+    BEDROCK_BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("BEDROCK_BREAKER_FAILURE_THRESHOLD", "5"))
+    BEDROCK_BREAKER_COOLDOWN_SECONDS: float = float(os.getenv("BEDROCK_BREAKER_COOLDOWN_SECONDS", "30"))
+
+    # Chat History Settings (estimated input tokens per chat turn)
+    CHAT_HISTORY_TOKEN_BUDGET: int = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "6000"))
+    # JSON mapping of model id to its own history budget
+    CHAT_HISTORY_MODEL_BUDGETS: dict = json.loads(os.getenv("CHAT_HISTORY_MODEL_BUDGETS") or "{}")
+
+    # Response Cache Settings ("memory", "postgres" or "none")
+    RESPONSE_CACHE_BACKEND: str = os.getenv("RESPONSE_CACHE_BACKEND", "memory").lower()
+    RESPONSE_CACHE_MAX_ENTRIES: int = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+    RESPONSE_CACHE_TTL_SECONDS: int = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "86400"))
+    # Serialize identical analyses across workers with a Postgres advisory lock (postgres cache only)
+    BEDROCK_COALESCE_ACROSS_WORKERS: bool = os.getenv("BEDROCK_COALESCE_ACROSS_WORKERS", "false").lower() == "true"
+    BEDROCK_COALESCE_LOCK_CONNECTIONS: int = int(os.getenv("BEDROCK_COALESCE_LOCK_CONNECTIONS", "8"))  # per uvicorn worker
+    BEDROCK_COALESCE_LOCK_TIMEOUT_SECONDS: float = float(os.getenv("BEDROCK_COALESCE_LOCK_TIMEOUT_SECONDS", "300"))
+
+    # Long Document Analysis (map-reduce) Settings, sizes in characters
+    DOC_CHUNK_SIZE: int = int(os.getenv("DOC_CHUNK_SIZE", "12000"))
+    DOC_CHUNK_OVERLAP: int = int(os.getenv("DOC_CHUNK_OVERLAP", "500"))
+    DOC_MAP_PARALLELISM: int = int(os.getenv("DOC_MAP_PARALLELISM", "4"))
+    DOC_MAX_INPUT_TOKENS: int = int(os.getenv("DOC_MAX_INPUT_TOKENS", "1000000"))  # estimated, per analysis
+
+    # Document Q&A Settings (BM25 retrieval; only the top-k chunks are sent to the model)
+    RETRIEVAL_CHUNK_SIZE: int = int(os.getenv("RETRIEVAL_CHUNK_SIZE", "1500"))
+    RETRIEVAL_CHUNK_OVERLAP: int = int(os.getenv("RETRIEVAL_CHUNK_OVERLAP", "200"))
+    RETRIEVAL_TOP_K: int = int(os.getenv("RETRIEVAL_TOP_K", "6"))
+    RETRIEVAL_MAX_TOP_K: int = int(os.getenv("RETRIEVAL_MAX_TOP_K", "20"))
+    DOC_INDEX_CACHE_ENTRIES: int = int(os.getenv("DOC_INDEX_CACHE_ENTRIES", "32"))
+
+    # Upload Settings (request bodies over the limit get 413 while they are still streaming in)
+    MAX_UPLOAD_SIZE_MB: int = int(os.getenv("MAX_UPLOAD_SIZE_MB", "50"))
+
+    # PDF Extraction Settings (page-parallel, in a process pool)
+    PDF_EXTRACT_WORKERS: int = int(os.getenv("PDF_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+    PDF_EXTRACT_TIMEOUT_SECONDS: float = float(os.getenv("PDF_EXTRACT_TIMEOUT_SECONDS", "120"))
+    PDF_MAX_PAGES: int = int(os.getenv("PDF_MAX_PAGES", "2000"))
+    PDF_MIN_PAGES_PER_TASK: int = int(os.getenv("PDF_MIN_PAGES_PER_TASK", "16"))
+
+    # Extraction Cache Settings (extracted text by SHA-256 of the upload, zlib-compressed on disk)
+    EXTRACTION_CACHE_ENABLED: bool = os.getenv("EXTRACTION_CACHE_ENABLED", "true").lower() == "true"
+    EXTRACTION_CACHE_DIR: str = os.getenv("EXTRACTION_CACHE_DIR", "/tmp/cointelligence/extraction-cache")
+    EXTRACTION_CACHE_MAX_MB: int = int(os.getenv("EXTRACTION_CACHE_MAX_MB", "512"))
+
+    # Batch Analysis Settings
+    BATCH_WORKERS_ENABLED: bool = os.getenv("BATCH_WORKERS_ENABLED", "true").lower() == "true"
+    BATCH_WORKER_CONCURRENCY: int = int(os.getenv("BATCH_WORKER_CONCURRENCY", "4"))  # per uvicorn worker
+    BATCH_POLL_INTERVAL_SECONDS: float = float(os.getenv("BATCH_POLL_INTERVAL_SECONDS", "1.0"))
+    BATCH_LEASE_SECONDS: int = int(os.getenv("BATCH_LEASE_SECONDS", "300"))
+    BATCH_MAX_ATTEMPTS: int = int(os.getenv("BATCH_MAX_ATTEMPTS", "3"))
+    BATCH_MAX_ITEMS: int = int(os.getenv("BATCH_MAX_ITEMS", "500"))
+    # Uploaded batch files wait here until a worker extracts them; must be shared by every worker process
+    BATCH_SPOOL_DIR: str = os.getenv("BATCH_SPOOL_DIR", "/tmp/cointelligence/batch-spool")
+
+    # Usage Accounting and Metrics Settings
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"  # Prometheus text at /metrics
+    USAGE_TRACKING_ENABLED: bool = os.getenv("USAGE_TRACKING_ENABLED", "true").lower() == "true"  # bedrock_usage rows
+    USAGE_FLUSH_INTERVAL_SECONDS: float = float(os.getenv("USAGE_FLUSH_INTERVAL_SECONDS", "5"))
+    USAGE_FLUSH_BATCH_SIZE: int = int(os.getenv("USAGE_FLUSH_BATCH_SIZE", "500"))
+    USAGE_BUFFER_MAX_ROWS: int = int(os.getenv("USAGE_BUFFER_MAX_ROWS", "10000"))
+
     # CORS Settings
     ALLOWED_ORIGINS: list = [
         "http://localhost:3000",
@@ -4,7 +4,7 @@ Environment-aware backend with AWS Bedrock integration, authentication, and dyna
 """
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 import os
 import json
 from pathlib import Path
@@ -13,8 +13,22 @@ from dotenv import load_dotenv
 from app.api.v1.bedrock import router as bedrock_router
 from app.api.v1.auth import router as auth_router
 from app.api.v1.system import router as system_router
+from app.api.v1.batch import router as batch_router
+from app.api.v1.admin import router as admin_router
 from app.services.app_manager import AppManager
-from app.database import register_db
+from app.services.bedrock_service import bedrock_service
+from app.services.batch_worker import batch_worker_pool
+from app.services.metrics import metrics_registry
+from app.services.usage_tracker import usage_tracker
+from app.services.pdf_extractor import pdf_extraction_pool
+from app.services.single_flight import advisory_locks
+from app.services.password_hasher import password_hasher
+from app.services.preflight import ESTIMATE_HEADERS
+from app.services.token_denylist import token_denylist
+from app.services.user_state import user_state
+from app.services.user_provisioning import user_provisioner
+from app.middleware.upload_limit import UploadSizeLimitMiddleware
+from app.database import close_db, init_db, register_db
 from app.core.config import settings
 
 # Load environment variables
@@ -44,9 +58,12 @@ app = FastAPI(
     debug=settings.DEBUG
 )
 
-# Register Tortoise ORM with FastAPI
+# Register Tortoise ORM exception handlers; the startup/shutdown hooks below open and close the database
 register_db(app)
 
+# Cap request bodies (document uploads) while they stream in; added before CORS so 413s get CORS headers
+app.add_middleware(UploadSizeLimitMiddleware, max_bytes=settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024)
+
 # Configure CORS with settings
 app.add_middleware(
     CORSMiddleware,
@@ -54,6 +71,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=ESTIMATE_HEADERS,
 )
 
 # Initialize app manager
@@ -63,6 +81,45 @@ app_manager = AppManager()
 app.include_router(auth_router, prefix="/api/v1", tags=["authentication"])
 app.include_router(bedrock_router, prefix="/api/v1/bedrock", tags=["bedrock"])
 app.include_router(system_router, prefix="/api/v1/system", tags=["system"])
+app.include_router(batch_router, prefix="/api/v1", tags=["batch"])
+app.include_router(admin_router, prefix="/api/v1", tags=["admin"])
+
+@app.on_event("startup")
+async def start_batch_workers():
+    """Connect and patch the schema, then start draining the batch analysis queue"""
+    await init_db()
+    token_denylist.start()
+    if settings.AUTH_STATELESS_TOKENS:
+        user_state.start()
+    if settings.BATCH_WORKERS_ENABLED:
+        batch_worker_pool.start()
+    if settings.USAGE_TRACKING_ENABLED:
+        usage_tracker.start()
+
+@app.on_event("shutdown")
+async def shutdown_bedrock_executor():
+    """
+    Stop batch workers, flush buffered usage rows and release the Bedrock, extraction,
+    hashing and provisioning workers, then close the database last: the workers and
+    the usage flush still write to it
+    """
+    await batch_worker_pool.stop()
+    await usage_tracker.stop()
+    await user_state.stop()
+    await token_denylist.stop()
+    bedrock_service.executor.shutdown()
+    pdf_extraction_pool.shutdown()
+    password_hasher.shutdown()
+    user_provisioner.shutdown()
+    await advisory_locks.close()
+    await close_db()
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Prometheus metrics for this worker"""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
 
 @app.get("/")
 async def root():
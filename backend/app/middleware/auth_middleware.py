@@ -2,11 +2,49 @@ from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
 from app.services.auth_service import AuthService
+from app.core.config import settings
+from app.services.principal_cache import Principal, principal_cache
+from app.services.token_denylist import token_denylist
+from app.services.user_state import user_state
 
 # Security scheme
 security = HTTPBearer()
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+async def resolve_user(username: str, use_cache: bool = True) -> Optional[Principal]:
+    """Active user without the password hash, from the principal cache or the database"""
+    principal = principal_cache.get(username) if use_cache else None
+    if principal is None:
+        user = await AuthService.get_user_by_username(username)
+        if user is None:
+            return None
+        # Principal is read-only, so the cached entry can be shared with callers
+        principal = Principal.from_user(user)
+        principal_cache.set(username, principal)
+    return principal
+
+async def principal_from_token(token: str) -> Optional[Principal]:
+    """
+    User for a bearer token, or None if it is invalid or revoked. Stateless tokens
+    are trusted as-is unless user_state has seen the user change since they were issued.
+    """
+    payload = AuthService.verify_token(token)
+    if payload is None or payload.get("sub") is None or payload.get("typ", "access") != "access":
+        return None
+    if token_denylist.is_revoked(payload.get("jti")):
+        return None
+
+    stateless = settings.AUTH_STATELESS_TOKENS and "uid" in payload
+    token_version = payload.get("ver", 0)
+    if stateless and not user_state.needs_lookup(payload["uid"], token_version, payload.get("iat", 0)):
+        return Principal.from_claims(payload)
+
+    # A flagged user is re-read from the database rather than the possibly stale cache
+    principal = await resolve_user(payload["sub"], use_cache=not stateless)
+    if principal is None or token_version < principal.token_version:
+        return None
+    return principal
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Principal:
     """Get current authenticated user from JWT token"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -15,26 +53,13 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     )
     
     try:
-        # Verify token
-        payload = AuthService.verify_token(credentials.credentials)
-        if payload is None:
-            raise credentials_exception
-        
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-            
+        principal = await principal_from_token(credentials.credentials)
     except Exception:
         raise credentials_exception
     
-    # Get user from database
-    user = await AuthService.get_user_by_username(username)
-    if user is None:
+    if principal is None:
         raise credentials_exception
-    
-    # Remove sensitive data
-    user_data = {k: v for k, v in user.items() if k != "hashed_password"}
-    return user_data
+    return principal
 
 async def get_current_active_user(current_user: dict = Depends(get_current_user)) -> dict:
     """Get current active user"""
@@ -42,6 +67,12 @@ async def get_current_active_user(current_user: dict = Depends(get_current_user)
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
+async def get_current_admin_user(current_user: dict = Depends(get_current_active_user)) -> dict:
+    """Get current user if they are listed in ADMIN_USERNAMES"""
+    if current_user["username"].lower() not in settings.ADMIN_USERNAMES:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
+    return current_user
+
 # Optional authentication - doesn't raise error if no token
 async def get_current_user_optional(credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False))) -> Optional[dict]:
     """Get current user if token is provided, otherwise return None"""
@@ -49,20 +80,6 @@ async def get_current_user_optional(credentials: Optional[HTTPAuthorizationCrede
         return None
     
     try:
-        payload = AuthService.verify_token(credentials.credentials)
-        if payload is None:
-            return None
-        
-        username: str = payload.get("sub")
-        if username is None:
-            return None
-            
-        user = await AuthService.get_user_by_username(username)
-        if user is None:
-            return None
-        
-        user_data = {k: v for k, v in user.items() if k != "hashed_password"}
-        return user_data
-        
+        return await principal_from_token(credentials.credentials)
     except Exception:
         return None
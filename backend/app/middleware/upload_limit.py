@@ -0,0 +1,86 @@
+"""
+Request body size limit
+Rejects bodies over the configured size with 413, checking Content-Length up
+front and counting bytes while the body is streamed in
+"""
+import json
+from typing import Iterable, Optional
+
+from fastapi import HTTPException, status
+
+
+class RequestBodyTooLargeError(HTTPException):
+    """Raised from receive() once a streamed body passes the limit"""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Request body exceeds the {max_bytes // (1024 * 1024)} MB limit"
+        )
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Pure ASGI middleware, so the body is never buffered here. Uploads are parsed
+    into spooled temp files by Starlette; this caps how much can be spooled.
+    """
+
+    def __init__(self, app, max_bytes: int, methods: Iterable[str] = ("POST", "PUT", "PATCH")):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.methods = set(methods)
+
+    async def _reject(self, send, error: RequestBodyTooLargeError):
+        body = json.dumps({"detail": error.detail}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": error.status_code,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()),
+                        (b"connection", b"close")],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in self.methods or self.max_bytes <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        error = RequestBodyTooLargeError(self.max_bytes)
+        content_length: Optional[int] = None
+        for name, value in scope.get("headers", []):
+            if name == b"content-length":
+                try:
+                    content_length = int(value)
+                except ValueError:
+                    pass
+                break
+        if content_length is not None and content_length > self.max_bytes:
+            await self._reject(send, error)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # FastAPI re-raises HTTPException from body parsing, so this becomes a 413
+                    raise error
+            return message
+
+        response_started = False
+
+        async def tracking_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except RequestBodyTooLargeError:
+            if response_started:
+                raise
+            await self._reject(send, error)
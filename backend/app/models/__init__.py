@@ -1,3 +1,8 @@
 from .user import User
+from .response_cache import ResponseCacheEntry
+from .batch import BatchJob, BatchJobItem
+from .usage import BedrockUsage
+from .token import RevokedToken
+from .login_attempt import LoginAttempt
 
-__all__ = ["User"]
+__all__ = ["User", "ResponseCacheEntry", "BatchJob", "BatchJobItem", "BedrockUsage", "RevokedToken", "LoginAttempt"]
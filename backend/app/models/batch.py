@@ -0,0 +1,43 @@
+from tortoise.models import Model
+from tortoise import fields
+
+class BatchJob(Model):
+    """Batch analysis job owning many queued items"""
+
+    id = fields.UUIDField(pk=True)
+    owner = fields.ForeignKeyField("models.User", related_name="batch_jobs", on_delete=fields.CASCADE)
+    analysis_type = fields.CharField(max_length=50, default="summary")
+    status = fields.CharField(max_length=20, default="queued", index=True)  # queued, running, completed
+    total_items = fields.IntField(default=0)
+    created_at = fields.DatetimeField(auto_now_add=True)
+    updated_at = fields.DatetimeField(auto_now=True)
+    completed_at = fields.DatetimeField(null=True)
+
+    class Meta:
+        table = "batch_jobs"
+
+    def __str__(self):
+        return f"BatchJob(id={self.id}, status='{self.status}', total_items={self.total_items})"
+
+
+class BatchJobItem(Model):
+    """One document or text in a batch job; rows double as the durable work queue"""
+
+    id = fields.BigIntField(pk=True)
+    job = fields.ForeignKeyField("models.BatchJob", related_name="items", on_delete=fields.CASCADE)
+    position = fields.IntField()
+    source_name = fields.CharField(max_length=255)
+    text = fields.TextField()  # empty until a worker extracts source_path
+    source_path = fields.CharField(max_length=1024, null=True)  # spooled upload, for file items
+    status = fields.CharField(max_length=20, default="pending", index=True)  # pending, running, done, failed
+    result = fields.TextField(null=True)
+    error = fields.TextField(null=True)
+    attempts = fields.IntField(default=0)
+    locked_at = fields.DatetimeField(null=True)
+    updated_at = fields.DatetimeField(auto_now=True)
+
+    class Meta:
+        table = "batch_job_items"
+
+    def __str__(self):
+        return f"BatchJobItem(id={self.id}, job_id={self.job_id}, status='{self.status}')"
@@ -0,0 +1,17 @@
+from tortoise.models import Model
+from tortoise import fields
+
+class LoginAttempt(Model):
+    """Login attempts per throttle key (username or client IP) in one fixed window, shared by all workers"""
+
+    id = fields.BigIntField(pk=True)
+    key = fields.CharField(max_length=320)
+    window_start = fields.BigIntField(index=True)  # epoch seconds, a multiple of the window length
+    attempts = fields.IntField(default=0)
+
+    class Meta:
+        table = "login_attempts"
+        unique_together = (("key", "window_start"),)
+
+    def __str__(self):
+        return f"LoginAttempt(key='{self.key}', window_start={self.window_start}, attempts={self.attempts})"
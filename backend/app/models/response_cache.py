@@ -0,0 +1,20 @@
+from tortoise.models import Model
+from tortoise import fields
+
+class ResponseCacheEntry(Model):
+    """Cached Bedrock analysis response shared across workers"""
+
+    key = fields.CharField(max_length=64, pk=True)
+    response = fields.TextField()
+    model_id = fields.CharField(max_length=255)
+    analysis_type = fields.CharField(max_length=50)
+    created_at = fields.DatetimeField(auto_now_add=True)
+    expires_at = fields.DatetimeField(index=True)
+    last_accessed_at = fields.DatetimeField(index=True)
+    hits = fields.IntField(default=0)
+
+    class Meta:
+        table = "response_cache"
+
+    def __str__(self):
+        return f"ResponseCacheEntry(key='{self.key}', analysis_type='{self.analysis_type}')"
@@ -0,0 +1,18 @@
+from tortoise.models import Model
+from tortoise import fields
+
+class RevokedToken(Model):
+    """A revoked access or refresh token, kept until the token would have expired anyway"""
+
+    jti = fields.CharField(max_length=36, pk=True)
+    user_id = fields.IntField(null=True)
+    token_type = fields.CharField(max_length=10)  # access, refresh
+    reason = fields.CharField(max_length=20)  # logout, rotated
+    expires_at = fields.DatetimeField(index=True)
+    revoked_at = fields.DatetimeField(auto_now_add=True, index=True)
+
+    class Meta:
+        table = "revoked_tokens"
+
+    def __str__(self):
+        return f"RevokedToken(jti='{self.jti}', token_type='{self.token_type}', reason='{self.reason}')"
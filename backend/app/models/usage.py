@@ -0,0 +1,23 @@
+from tortoise.models import Model
+from tortoise import fields
+
+class BedrockUsage(Model):
+    """One Bedrock call with its token counts and latency, attributed to a user when known"""
+
+    id = fields.BigIntField(pk=True)
+    user = fields.ForeignKeyField("models.User", related_name="bedrock_usage", null=True, on_delete=fields.SET_NULL)
+    model_id = fields.CharField(max_length=255)
+    operation = fields.CharField(max_length=50)  # chat, chat_stream, analyze, summarize
+    outcome = fields.CharField(max_length=20)  # success, throttled, error
+    input_tokens = fields.IntField(default=0)
+    output_tokens = fields.IntField(default=0)
+    server_latency_ms = fields.IntField(null=True)
+    client_latency_ms = fields.IntField()
+    created_at = fields.DatetimeField(index=True)  # Call time; rows are written later in batches
+
+    class Meta:
+        table = "bedrock_usage"
+        indexes = (("user_id", "created_at"),)
+
+    def __str__(self):
+        return f"BedrockUsage(id={self.id}, user_id={self.user_id}, model_id='{self.model_id}')"
@@ -3,6 +3,12 @@ from tortoise import fields
 from datetime import datetime
 from typing import Optional
 
+# Columns returned by user lookups; the password hash is only read when logging in
+PUBLIC_FIELDS = (
+    "id", "name", "email", "username", "created_at", "updated_at",
+    "is_active", "email_verified", "token_version",
+)
+
 class User(Model):
     """User model for authentication system"""
     
@@ -15,10 +21,12 @@ class User(Model):
     updated_at = fields.DatetimeField(auto_now=True)
     is_active = fields.BooleanField(default=True)
     email_verified = fields.BooleanField(default=False)
+    # Bumped to revoke every token issued so far (password change, deactivation)
+    token_version = fields.IntField(default=0)
 
+    # No Meta.ordering: it would add ORDER BY created_at to every single-row lookup
     class Meta:
         table = "users"
-        ordering = ["-created_at"]
 
     def __str__(self):
         return f"User(id={self.id}, username='{self.username}', email='{self.email}')"
@@ -38,6 +46,11 @@ class User(Model):
         """Get user by ID"""
         return await cls.filter(id=user_id, is_active=True).first()
 
+    @classmethod
+    async def find_active(cls, *fields: str, **filters) -> Optional[dict]:
+        """One active user as a dict of just the given columns (PUBLIC_FIELDS by default), or None"""
+        return await cls.filter(is_active=True, **filters).first().values(*(fields or PUBLIC_FIELDS))
+
     async def to_dict(self, exclude_password: bool = True) -> dict:
         """Convert user to dictionary"""
         data = {
@@ -49,6 +62,7 @@ class User(Model):
             "updated_at": self.updated_at,
             "is_active": self.is_active,
             "email_verified": self.email_verified,
+            "token_version": self.token_version,
         }
         
         if not exclude_password:
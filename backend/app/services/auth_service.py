@@ -1,22 +1,61 @@
+import re
+import time
+import uuid
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Mapping, Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
+from tortoise import timezone
+from tortoise.exceptions import IntegrityError
+from tortoise.expressions import F
+from tortoise.signals import post_delete, post_save
 from app.core.config import settings
-from app.models.user import User
+from app.models.user import PUBLIC_FIELDS, User
+from app.services.password_hasher import password_hasher
+from app.services.principal_cache import Principal, principal_cache
+from app.services.token_denylist import token_denylist
+from app.services.user_state import epoch, user_state
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing (bcrypt at BCRYPT_ROUNDS); async code goes through password_hasher
+pwd_context = password_hasher.context
+
+# Unique column named in a duplicate-key error (Postgres detail, constraint name, or SQLite message)
+_DUPLICATE_COLUMN = re.compile(r"Key \((\w+)\)=|users_(\w+)_key|users\.(\w+)")
+
+
+class DuplicateUserError(ValueError):
+    """Registration hit the unique constraint on username or email"""
+
+    def __init__(self, field: str):
+        self.field = field
+        super().__init__(f"{field.capitalize()} already registered")
+
+
+def _duplicate_field(error: IntegrityError) -> str:
+    match = _DUPLICATE_COLUMN.search(str(error))
+    column = next((group for group in match.groups() if group), None) if match else None
+    return "email" if column == "email" else "username"
+
+# Any saved or deleted User drops out of this worker's principal cache and is
+# flagged for stateless tokens right away (other workers see it on their next sync)
+@post_save(User)
+async def _invalidate_saved_user(sender, instance, created, using_db, update_fields):
+    principal_cache.invalidate(instance.username)
+    if not created:
+        user_state.record(instance.id, instance.token_version, instance.is_active, time.time())
+
+@post_delete(User)
+async def _invalidate_deleted_user(sender, instance, using_db):
+    principal_cache.invalidate(instance.username)
 
 class AuthService:
     @staticmethod
     def verify_password(plain_password: str, hashed_password: str) -> bool:
-        """Verify a password against its hash"""
+        """Verify a password against its hash (blocking; use password_hasher on the event loop)"""
         return pwd_context.verify(plain_password, hashed_password)
 
     @staticmethod
     def get_password_hash(password: str) -> str:
-        """Hash a password"""
+        """Hash a password (blocking; use password_hasher on the event loop)"""
         return pwd_context.hash(password)
 
     @staticmethod
@@ -28,10 +67,33 @@ class AuthService:
         else:
             expire = datetime.utcnow() + timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
         
-        to_encode.update({"exp": expire})
+        to_encode.update({"exp": expire, "iat": int(time.time()), "jti": uuid.uuid4().hex})
         encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
         return encoded_jwt
 
+    @staticmethod
+    def create_user_token(user: Mapping, expires_delta: Optional[timedelta] = None) -> str:
+        """Access token for a user; in stateless mode it also carries the user's claims"""
+        # ver is always set: the middleware rejects tokens older than the user's token_version
+        data = {"sub": user["username"], "ver": user.get("token_version", 0)}
+        if settings.AUTH_STATELESS_TOKENS:
+            data.update(Principal.from_user(user).claims())
+        return AuthService.create_access_token(data, expires_delta)
+
+    @staticmethod
+    def create_refresh_token(user: Mapping) -> str:
+        """Long-lived, single-use token that can only be exchanged at /auth/refresh"""
+        data = {"sub": user["username"], "uid": user["id"], "ver": user.get("token_version", 0), "typ": "refresh"}
+        return AuthService.create_access_token(data, timedelta(days=settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS))
+
+    @staticmethod
+    def create_token_pair(user: Mapping) -> dict:
+        """Access and refresh token for a user that just authenticated"""
+        return {
+            "access_token": AuthService.create_user_token(user),
+            "refresh_token": AuthService.create_refresh_token(user),
+        }
+
     @staticmethod
     def verify_token(token: str) -> Optional[dict]:
         """Verify and decode JWT token"""
@@ -44,47 +106,121 @@ class AuthService:
     @staticmethod
     async def get_user_by_username(username: str) -> Optional[dict]:
         """Get user by username"""
-        user = await User.get_by_username(username)
-        return await user.to_dict() if user else None
+        return await User.find_active(username=username)
 
     @staticmethod
     async def get_user_by_email(email: str) -> Optional[dict]:
         """Get user by email"""
-        user = await User.get_by_email(email)
-        return await user.to_dict() if user else None
+        return await User.find_active(email=email)
 
     @staticmethod
     async def get_user_by_id(user_id: int) -> Optional[dict]:
         """Get user by ID"""
-        user = await User.get_by_id(user_id)
-        return await user.to_dict() if user else None
+        return await User.find_active(id=user_id)
 
     @staticmethod
     async def create_user(name: str, email: str, username: str, password: str) -> dict:
-        """Create a new user"""
-        hashed_password = AuthService.get_password_hash(password)
+        """Create a new user with a single INSERT; raises DuplicateUserError if the username or email is taken"""
+        hashed_password = await password_hasher.hash(password)
         
-        user = await User.create(
-            name=name,
-            email=email,
-            username=username,
-            hashed_password=hashed_password,
-            is_active=True,
-            email_verified=False
-        )
+        try:
+            user = await User.create(
+                name=name,
+                email=email,
+                username=username,
+                hashed_password=hashed_password,
+                is_active=True,
+                email_verified=False
+            )
+        except IntegrityError as e:
+            raise DuplicateUserError(_duplicate_field(e))
         
         return await user.to_dict()
 
+    @staticmethod
+    async def update_user(username: str, **fields) -> Optional[dict]:
+        """Update user fields and drop the cached principal"""
+        user = await User.filter(username=username).first()
+        if user is None:
+            return None
+        if "password" in fields:
+            fields["hashed_password"] = await password_hasher.hash(fields.pop("password"))
+            # A new password revokes every token issued with the old one
+            user.token_version += 1
+        user.update_from_dict(fields)
+        await user.save()
+        # post_save drops the new username; drop the old one too in case it changed
+        principal_cache.invalidate(username)
+        return await user.to_dict()
+
+    @staticmethod
+    async def revoke_user_tokens(username: str, **fields) -> bool:
+        """Bump a user's token_version (plus any other fields), revoking every token issued so far"""
+        now = timezone.now()
+        updated = await User.filter(username=username).update(
+            token_version=F("token_version") + 1, updated_at=now, **fields
+        )
+        # Queryset updates do not send post_save (nor set auto_now fields)
+        principal_cache.invalidate(username)
+        user = await User.filter(username=username).first().values("id", "token_version", "is_active")
+        if user is not None:
+            user_state.record(user["id"], user["token_version"], user["is_active"], epoch(now))
+        return updated > 0
+
+    @staticmethod
+    async def deactivate_user(username: str) -> bool:
+        """Deactivate a user and revoke their tokens"""
+        return await AuthService.revoke_user_tokens(username, is_active=False)
+
+    @staticmethod
+    async def rotate_refresh_token(refresh_token: str) -> Optional[dict]:
+        """
+        Spend a refresh token and return its user, or None if it is invalid. Each
+        refresh token works once; presenting a spent one again means it leaked, so
+        every token of that user is revoked.
+        """
+        payload = AuthService.verify_token(refresh_token)
+        if payload is None or payload.get("typ") != "refresh" or "jti" not in payload:
+            return None
+        spent = token_denylist.is_revoked(payload["jti"]) or not await token_denylist.revoke(
+            payload["jti"], payload["exp"], "refresh", "rotated", payload.get("uid")
+        )
+        if spent:
+            await AuthService.revoke_user_tokens(payload["sub"])
+            return None
+
+        user = await AuthService.get_user_by_username(payload["sub"])
+        if user is None or payload.get("ver", 0) < user["token_version"]:
+            return None
+        return user
+
+    @staticmethod
+    async def logout(access_payload: dict, refresh_token: Optional[str] = None):
+        """Revoke the presented access token and, if given, the session's refresh token"""
+        if "jti" in access_payload:
+            await token_denylist.revoke(
+                access_payload["jti"], access_payload["exp"], "access", "logout", access_payload.get("uid")
+            )
+        if refresh_token:
+            payload = AuthService.verify_token(refresh_token)
+            if payload and payload.get("typ") == "refresh" and "jti" in payload \
+                    and payload.get("sub") == access_payload["sub"]:
+                await token_denylist.revoke(payload["jti"], payload["exp"], "refresh", "logout", payload.get("uid"))
+
     @staticmethod
     async def authenticate_user(username: str, password: str) -> Optional[dict]:
         """Authenticate user with username and password"""
-        user = await User.get_by_username(username)
+        user = await User.find_active(*PUBLIC_FIELDS, "hashed_password", username=username)
         if not user:
             return None
         
-        user_dict = await user.to_dict(exclude_password=False)
-        if not AuthService.verify_password(password, user_dict["hashed_password"]):
+        hashed_password = user.pop("hashed_password")
+        verified, new_hash = await password_hasher.verify_and_update(password, hashed_password)
+        if not verified:
             return None
+        if new_hash:
+            # Hashed at an older BCRYPT_ROUNDS; store it at the current cost now that we have the password
+            await User.filter(id=user["id"]).update(hashed_password=new_hash)
         
-        # Return user data without password
-        return await user.to_dict(exclude_password=True)
+        # User data without password
+        return user
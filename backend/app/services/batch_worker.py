@@ -0,0 +1,259 @@
+"""
+Batch Analysis Worker Pool
+Drains the batch_job_items queue in Postgres with FOR UPDATE SKIP LOCKED;
+uploaded files are spooled at submit time and extracted by the worker
+"""
+import asyncio
+import logging
+import os
+import shutil
+import tempfile
+from typing import Any, BinaryIO, Dict, List, Optional
+
+from tortoise import connections
+
+from app.core.config import settings
+from app.services.bedrock_service import bedrock_service
+from app.services.bedrock_executor import BedrockOverloadedError
+from app.services.document_extractor import UnsupportedDocumentError, DocumentLimitError
+from app.services.extraction_cache import extraction_cache
+from app.services.preflight import RequestTooLargeError
+
+logger = logging.getLogger(__name__)
+
+# Claim the next pending item, or one whose lease expired because its worker died
+CLAIM_ITEM_SQL = """
+UPDATE batch_job_items AS item
+SET status = 'running', locked_at = NOW(), attempts = item.attempts + 1, updated_at = NOW()
+FROM batch_jobs AS job
+WHERE item.job_id = job.id AND item.id = (
+    SELECT id FROM batch_job_items
+    WHERE status = 'pending'
+       OR (status = 'running' AND locked_at < NOW() - make_interval(secs => $1))
+    ORDER BY id
+    FOR UPDATE SKIP LOCKED
+    LIMIT 1
+)
+RETURNING item.id, item.job_id, item.source_name, item.source_path, item.text, item.attempts,
+          job.analysis_type, job.owner_id
+"""
+
+MARK_JOB_RUNNING_SQL = """
+UPDATE batch_jobs SET status = 'running', updated_at = NOW()
+WHERE id = $1 AND status = 'queued'
+"""
+
+# Keep the extracted text so a retry skips extraction; the spooled file is deleted next
+STORE_TEXT_SQL = """
+UPDATE batch_job_items SET text = $2, source_path = NULL, updated_at = NOW() WHERE id = $1
+"""
+
+HEARTBEAT_SQL = """
+UPDATE batch_job_items SET locked_at = NOW() WHERE id = $1 AND status = 'running'
+"""
+
+FINISH_ITEM_SQL = """
+UPDATE batch_job_items
+SET status = $2, result = $3, error = $4, locked_at = NULL, updated_at = NOW()
+WHERE id = $1
+"""
+
+# Hand an item back without charging an attempt (local overload, not the item's fault)
+RELEASE_ITEM_SQL = """
+UPDATE batch_job_items
+SET status = 'pending', locked_at = NULL, attempts = GREATEST(attempts - 1, 0), updated_at = NOW()
+WHERE id = $1
+"""
+
+COMPLETE_JOB_SQL = """
+UPDATE batch_jobs SET status = 'completed', completed_at = NOW(), updated_at = NOW()
+WHERE id = $1 AND status <> 'completed' AND NOT EXISTS (
+    SELECT 1 FROM batch_job_items WHERE job_id = $1 AND status IN ('pending', 'running')
+)
+"""
+
+
+class UnprocessableItemError(ValueError):
+    """Raised when an item can never succeed, so it fails without further attempts"""
+
+
+def spool_upload(file: BinaryIO, filename: str) -> str:
+    """Copy an upload into BATCH_SPOOL_DIR, keeping its extension for the extractor, and return the path"""
+    os.makedirs(settings.BATCH_SPOOL_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(dir=settings.BATCH_SPOOL_DIR, suffix=os.path.splitext(filename)[1].lower())
+    try:
+        with os.fdopen(fd, "wb") as spooled:
+            file.seek(0)
+            shutil.copyfileobj(file, spooled, 1024 * 1024)
+    except BaseException:
+        remove_spooled(path)
+        raise
+    return path
+
+
+def remove_spooled(path: Optional[str]):
+    if path:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+class BatchWorkerPool:
+    def __init__(self, concurrency: int = 4, poll_interval: float = 1.0,
+                 lease_seconds: int = 300, max_attempts: int = 3):
+        """Initialize the pool; workers start with start()"""
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = asyncio.Event()
+        self._wakeup: Optional[asyncio.Event] = None
+
+        # Metrics
+        self.busy = 0
+        self.processed = 0
+        self.failed = 0
+        self.retried = 0
+
+    def start(self):
+        """Spawn the worker tasks on the running loop"""
+        self._stopping = asyncio.Event()
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.concurrency)]
+        logger.info(f"Batch worker pool started with {self.concurrency} workers")
+
+    async def stop(self):
+        """Stop workers; items they held are reclaimed by any worker once their lease expires"""
+        self._stopping.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self):
+        """Wake idle workers in this process after new items are queued"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _claim(self) -> Optional[Dict[str, Any]]:
+        conn = connections.get("default")
+        _, rows = await conn.execute_query(CLAIM_ITEM_SQL, [float(self.lease_seconds)])
+        if not rows:
+            return None
+        item = dict(rows[0])
+        await conn.execute_query(MARK_JOB_RUNNING_SQL, [item["job_id"]])
+        return item
+
+    async def _heartbeat(self, item_id: int):
+        """Keep the lease fresh while a long analysis runs"""
+        conn = connections.get("default")
+        while True:
+            await asyncio.sleep(max(1.0, self.lease_seconds / 3))
+            await conn.execute_query(HEARTBEAT_SQL, [item_id])
+
+    async def _extract(self, item: Dict[str, Any]) -> str:
+        """Extract a spooled upload and store its text on the item"""
+        try:
+            with open(item["source_path"], "rb") as source:
+                text = (await extraction_cache.extract(source, item["source_name"])).text
+        except FileNotFoundError:
+            raise UnprocessableItemError("Uploaded file is no longer available")
+        except (UnsupportedDocumentError, DocumentLimitError) as e:
+            raise UnprocessableItemError(str(e))
+        if not text.strip():
+            raise UnprocessableItemError("No text found in document")
+        await connections.get("default").execute_query(STORE_TEXT_SQL, [item["id"], text])
+        remove_spooled(item["source_path"])
+        return text
+
+    async def _process(self, item: Dict[str, Any]):
+        conn = connections.get("default")
+        failed = False
+        if item["attempts"] > self.max_attempts:
+            await conn.execute_query(FINISH_ITEM_SQL, [item["id"], "failed", None, "Exceeded maximum attempts"])
+            self.failed += 1
+            failed = True
+        else:
+            heartbeat = asyncio.create_task(self._heartbeat(item["id"]))
+            try:
+                text = await self._extract(item) if item["source_path"] else item["text"]
+                analysis = await bedrock_service.analyze_document(
+                    text=text,
+                    analysis_type=item["analysis_type"],
+                    raise_errors=True,
+                    user_id=item["owner_id"]
+                )
+                await conn.execute_query(FINISH_ITEM_SQL, [item["id"], "done", analysis, None])
+                self.processed += 1
+            except BedrockOverloadedError:
+                await conn.execute_query(RELEASE_ITEM_SQL, [item["id"]])
+                self.retried += 1
+                await asyncio.sleep(self.poll_interval)
+            except (RequestTooLargeError, UnprocessableItemError) as e:
+                # Retrying cannot make it fit or make the file readable
+                await conn.execute_query(FINISH_ITEM_SQL, [item["id"], "failed", None, str(e)])
+                self.failed += 1
+                failed = True
+            except Exception as e:
+                if item["attempts"] < self.max_attempts:
+                    # Put it back for another attempt
+                    await conn.execute_query(FINISH_ITEM_SQL, [item["id"], "pending", None, str(e)])
+                    self.retried += 1
+                else:
+                    await conn.execute_query(FINISH_ITEM_SQL, [item["id"], "failed", None, str(e)])
+                    self.failed += 1
+                    failed = True
+            finally:
+                heartbeat.cancel()
+
+        if failed:
+            # A file that failed before extraction finished is still spooled
+            remove_spooled(item["source_path"])
+
+        await conn.execute_query(COMPLETE_JOB_SQL, [item["job_id"]])
+
+    async def _worker(self, index: int):
+        while not self._stopping.is_set():
+            try:
+                item = await self._claim()
+            except Exception as e:
+                logger.error(f"Batch worker {index} failed to claim work: {e}")
+                item = None
+
+            if item is None:
+                # Idle: sleep until the next poll or a local notify()
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self.busy += 1
+            try:
+                await self._process(item)
+            except Exception as e:
+                logger.error(f"Batch worker {index} failed on item {item['id']}: {e}")
+            finally:
+                self.busy -= 1
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get worker pool counters for this process"""
+        return {
+            "workers": len(self._tasks),
+            "busy": self.busy,
+            "processed": self.processed,
+            "failed": self.failed,
+            "retried": self.retried,
+        }
+
+
+# Global instance
+batch_worker_pool = BatchWorkerPool(
+    concurrency=settings.BATCH_WORKER_CONCURRENCY,
+    poll_interval=settings.BATCH_POLL_INTERVAL_SECONDS,
+    lease_seconds=settings.BATCH_LEASE_SECONDS,
+    max_attempts=settings.BATCH_MAX_ATTEMPTS,
+)
@@ -0,0 +1,183 @@
+"""
+Bedrock Execution Engine
+Runs blocking boto3 Bedrock calls off the event loop on a bounded thread pool
+"""
+import asyncio
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+import boto3
+from botocore.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class BedrockOverloadedError(Exception):
+    """Raised when the executor queue is full and a call is rejected"""
+
+
+class BedrockExecutor:
+    def __init__(
+        self,
+        region_name: str = "us-east-1",
+        max_concurrency: int = 16,
+        max_queue: int = 64,
+        client_factory: Optional[Callable[[], Any]] = None,
+    ):
+        """Initialize the thread pool and a client sized to match it"""
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+
+        if client_factory is None:
+            # One HTTP connection per worker thread so calls never wait on the botocore pool
+            client_config = Config(
+                max_pool_connections=max_concurrency,
+                read_timeout=120,
+                retries={"max_attempts": 0},
+            )
+            self.client = boto3.client('bedrock-runtime', region_name=region_name, config=client_config)
+        else:
+            self.client = client_factory()
+
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="bedrock")
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        # Metrics
+        self._queued = 0
+        self._in_flight = 0
+        self._peak_queued = 0
+        self._peak_in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._total_wait_seconds = 0.0
+        self._total_call_seconds = 0.0
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Create the semaphore lazily so it binds to the running loop"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def _acquire(self) -> float:
+        """Wait for a free worker slot, rejecting the call if the queue is full"""
+        if self._queued >= self.max_queue:
+            self._rejected += 1
+            raise BedrockOverloadedError(
+                f"Bedrock executor queue is full ({self._queued} waiting, limit {self.max_queue})"
+            )
+
+        enqueued_at = time.perf_counter()
+        self._queued += 1
+        self._peak_queued = max(self._peak_queued, self._queued)
+        try:
+            await self._get_semaphore().acquire()
+        finally:
+            self._queued -= 1
+
+        started_at = time.perf_counter()
+        self._total_wait_seconds += started_at - enqueued_at
+        self._in_flight += 1
+        self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        return started_at
+
+    def _release(self, started_at: float, succeeded: bool):
+        """Return a worker slot and record the outcome"""
+        if succeeded:
+            self._completed += 1
+        else:
+            self._failed += 1
+        self._in_flight -= 1
+        self._total_call_seconds += time.perf_counter() - started_at
+        self._get_semaphore().release()
+
+    async def call(self, operation: str, **kwargs) -> Dict[str, Any]:
+        """
+        Run a bedrock-runtime client operation (e.g. "converse") on the pool
+        """
+        started_at = await self._acquire()
+        succeeded = False
+        try:
+            loop = asyncio.get_running_loop()
+            method = getattr(self.client, operation)
+            result = await loop.run_in_executor(self._pool, functools.partial(method, **kwargs))
+            succeeded = True
+            return result
+        finally:
+            self._release(started_at, succeeded)
+
+    async def stream(self, operation: str, **kwargs) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run a streaming operation (e.g. "converse_stream") on the pool and yield its events
+
+        The blocking event stream is drained on a worker thread, which holds its
+        slot until the stream ends or the consumer stops iterating.
+        """
+        started_at = await self._acquire()
+        succeeded = False
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        cancelled = threading.Event()
+
+        def publish(kind: str, payload: Any):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, (kind, payload))
+            except RuntimeError:
+                # Event loop already closed
+                cancelled.set()
+
+        def pump():
+            try:
+                response = getattr(self.client, operation)(**kwargs)
+                for event in response["stream"]:
+                    if cancelled.is_set():
+                        break
+                    publish("event", event)
+                publish("done", None)
+            except Exception as e:
+                publish("error", e)
+
+        worker = loop.run_in_executor(self._pool, pump)
+        try:
+            while True:
+                kind, payload = await queue.get()
+                if kind == "event":
+                    yield payload
+                elif kind == "error":
+                    raise payload
+                else:
+                    break
+            succeeded = True
+        finally:
+            # The worker keeps its slot until the thread actually stops draining
+            cancelled.set()
+            outcome = succeeded
+            if worker.done():
+                self._release(started_at, outcome)
+            else:
+                worker.add_done_callback(lambda _: self._release(started_at, outcome))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get concurrency and queue-depth metrics"""
+        finished = self._completed + self._failed
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "queued": self._queued,
+            "peak_in_flight": self._peak_in_flight,
+            "peak_queued": self._peak_queued,
+            "completed": self._completed,
+            "failed": self._failed,
+            "rejected": self._rejected,
+            "avg_queue_wait_ms": round(self._total_wait_seconds / finished * 1000, 2) if finished else 0.0,
+            "avg_call_ms": round(self._total_call_seconds / finished * 1000, 2) if finished else 0.0,
+        }
+
+    def shutdown(self):
+        """Stop accepting work and release the worker threads"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
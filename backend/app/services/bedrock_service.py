@@ -2,91 +2,547 @@
 AWS Bedrock Converse API Service
 Simple service for AI chat and document analysis
 """
-import boto3
+import asyncio
 import json
 import logging
-from typing import Dict, Any, List, Optional
+import time
+from typing import Dict, Any, AsyncIterator, List, Optional, Set
 from botocore.exceptions import ClientError
 
+from app.core.config import settings
+from app.services.bedrock_executor import BedrockExecutor, BedrockOverloadedError
+from app.services.fake_bedrock import FakeBedrockClient
+from app.services.metrics import MetricsRegistry
+from app.services.response_cache import ResponseCache, create_response_cache
+from app.services.document_chunker import split_document
+from app.services.model_router import ModelRouter, is_failover_error
+from app.services.history_manager import HistoryManager, TrimResult
+from app.services.preflight import (
+    RequestEstimate, RequestTooLargeError, choose_max_tokens, estimate_analysis, estimate_chat, estimate_question
+)
+from app.services.single_flight import SingleFlight, advisory_locks, postgres_advisory_lock
+from app.services.rate_limiter import AdaptiveLimiter, backoff_delay, is_throttling_error
+from app.services.token_estimator import estimate_messages_tokens, estimate_tokens, get_cache_stats
+from app.services.usage_tracker import UsageTracker, current_user_id, usage_tracker
+
 logger = logging.getLogger(__name__)
 
+# Question answering over retrieved excerpts
+ASK_PROMPT = (
+    "Answer the question using only the excerpts from a document below. "
+    "If the excerpts do not contain the answer, say so."
+)
+
+# Analysis prompts by type, for documents that fit in a single call
+ANALYSIS_PROMPTS = {
+    "summary": "Please provide a concise summary of the following document",
+    "key_points": "Extract the key points from the following document",
+    "questions": "Generate important questions that this document answers",
+    "analysis": "Provide a detailed analysis of the following document"
+}
+
+# Map step: per-chunk instructions for long documents
+MAP_INSTRUCTIONS = {
+    "summary": "Summarize this part concisely, keeping the facts needed for an overall summary",
+    "key_points": "Extract the key points from this part",
+    "questions": "Generate important questions that this part of the document answers",
+    "analysis": "Write analysis notes for this part: main themes, arguments, evidence and notable details"
+}
+
+# Reduce step: how partial results are combined
+REDUCE_INSTRUCTIONS = {
+    "summary": "Combine them into a single concise summary of the whole document",
+    "key_points": "Merge them into one deduplicated list of the key points of the whole document",
+    "questions": "Merge them into one deduplicated list of the most important questions the document answers",
+    "analysis": "Combine them into a single detailed analysis of the whole document"
+}
+
 class BedrockService:
-    def __init__(self, region_name: str = "us-east-1"):
-        """Initialize Bedrock client"""
-        self.client = boto3.client('bedrock-runtime', region_name=region_name)
-        self.model_id = "anthropic.claude-3-haiku-20240307-v1:0"
-        
-    async def chat(self, message: str, conversation_history: List[Dict] = None) -> str:
+    def __init__(
+        self,
+        region_name: str = "us-east-1",
+        executor: Optional[BedrockExecutor] = None,
+        cache: Optional[ResponseCache] = None,
+        router: Optional[ModelRouter] = None,
+        history: Optional[HistoryManager] = None,
+        coalesce_across_workers: bool = False,
+        usage: Optional[UsageTracker] = None,
+        limit_initial: Optional[int] = None,
+        limit_max: Optional[int] = None,
+    ):
+        """
+        Initialize Bedrock client. Per-model adaptive limits start at limit_initial
+        (BEDROCK_LIMIT_INITIAL) and grow up to limit_max, which defaults to the
+        executor's pool size so an injected executor is never capped below it.
+        """
+        self.executor = executor or BedrockExecutor(
+            region_name=region_name,
+            max_concurrency=settings.BEDROCK_MAX_CONCURRENCY,
+            max_queue=settings.BEDROCK_MAX_QUEUE,
+            client_factory=FakeBedrockClient.from_env if settings.BEDROCK_CLIENT == "fake" else None,
+        )
+        self.cache = cache or ResponseCache(None)
+        self.client = self.executor.client
+        self.router = router or ModelRouter(primary_model="anthropic.claude-3-haiku-20240307-v1:0")
+        self.history = history or HistoryManager()
+        self.single_flight = SingleFlight()
+        self.usage = usage or UsageTracker(MetricsRegistry())
+        self._limiters: Dict[str, AdaptiveLimiter] = {}
+        self.limit_max = limit_max or self.executor.max_concurrency
+        self.limit_initial = min(limit_initial or settings.BEDROCK_LIMIT_INITIAL, self.limit_max)
+        self.retries = 0
+        # Needs a cache backend shared by all workers (postgres)
+        self.coalesce_across_workers = coalesce_across_workers
+
+    @property
+    def model_id(self) -> str:
+        """Primary model used when no routing rule applies"""
+        return self.router.primary_model
+
+    def limiter(self, model_id: str) -> AdaptiveLimiter:
+        """Adaptive limiter for a model (Bedrock quotas are per model)"""
+        if model_id not in self._limiters:
+            self._limiters[model_id] = AdaptiveLimiter(
+                initial_limit=self.limit_initial,
+                min_limit=min(settings.BEDROCK_LIMIT_MIN, self.limit_initial),
+                max_limit=self.limit_max,
+                acquire_timeout=settings.BEDROCK_LIMIT_ACQUIRE_TIMEOUT,
+                requests_per_minute=settings.BEDROCK_RPM_LIMIT,
+            )
+        return self._limiters[model_id]
+
+    def _record_failure(self, model_id: str, operation: str, started: float, error: Exception):
+        """Record a failed or locally rejected call in the usage metrics"""
+        if isinstance(error, BedrockOverloadedError):
+            self.usage.record_rejection(model_id, operation)
+        else:
+            outcome = "throttled" if is_throttling_error(error) else "error"
+            self.usage.record(model_id, operation, outcome, time.perf_counter() - started)
+
+    async def _call_with_retry(self, route: str, model_id: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Call one model under its limiter, retrying throttled calls with jittered backoff"""
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                async with self.limiter(model_id).slot():
+                    response = await self.executor.call("converse", modelId=model_id, **params)
+                self.usage.record(model_id, route, "success", time.perf_counter() - started,
+                                  response.get("usage"), response.get("metrics", {}).get("latencyMs"))
+                return response
+            except Exception as e:
+                self._record_failure(model_id, route, started, e)
+                if not is_throttling_error(e) or attempt >= settings.BEDROCK_MAX_RETRIES:
+                    raise
+                await asyncio.sleep(backoff_delay(attempt, settings.BEDROCK_RETRY_BASE_DELAY,
+                                                  settings.BEDROCK_RETRY_MAX_DELAY))
+                attempt += 1
+                self.retries += 1
+
+    async def _invoke(self, route: str, params: Dict[str, Any], analysis_type: Optional[str] = None,
+                      input_chars: int = 0, models_used: Optional[Set[str]] = None) -> Dict[str, Any]:
+        """
+        Call Converse on the routed model, failing over to the next candidate on
+        throttling or 5xx errors once retries are exhausted. The model that
+        answered is added to models_used when given.
+        """
+        candidates = self.router.candidates(route, analysis_type, input_chars)
+        for i, model_id in enumerate(candidates):
+            self.router.begin_attempt(model_id)
+            started = time.perf_counter()
+            try:
+                response = await self._call_with_retry(route, model_id, params)
+            except BedrockOverloadedError:
+                raise
+            except Exception as e:
+                self.router.record_failure(model_id, time.perf_counter() - started, e)
+                if not is_failover_error(e) or i == len(candidates) - 1:
+                    raise
+                self.router.record_failover(model_id, candidates[i + 1])
+                continue
+            self.router.record_success(model_id, time.perf_counter() - started)
+            if models_used is not None:
+                models_used.add(model_id)
+            return response
+
+    async def _invoke_stream(self, route: str, params: Dict[str, Any],
+                             input_chars: int = 0) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream Converse events from the routed model; failover is only possible
+        before the first event has been yielded
+        """
+        candidates = self.router.candidates(route, input_chars=input_chars)
+        operation = f"{route}_stream"
+        for i, model_id in enumerate(candidates):
+            self.router.begin_attempt(model_id)
+            started = time.perf_counter()
+            yielded = False
+            metadata: Dict[str, Any] = {}
+            try:
+                async with self.limiter(model_id).slot():
+                    async for event in self.executor.stream("converse_stream", modelId=model_id, **params):
+                        if "metadata" in event:
+                            metadata = event["metadata"]
+                        yielded = True
+                        yield event
+            except BedrockOverloadedError as e:
+                self._record_failure(model_id, operation, started, e)
+                raise
+            except Exception as e:
+                self._record_failure(model_id, operation, started, e)
+                self.router.record_failure(model_id, time.perf_counter() - started, e)
+                if yielded or not is_failover_error(e) or i == len(candidates) - 1:
+                    raise
+                self.router.record_failover(model_id, candidates[i + 1])
+                continue
+            self.usage.record(model_id, operation, "success", time.perf_counter() - started,
+                              metadata.get("usage"), metadata.get("metrics", {}).get("latencyMs"))
+            self.router.record_success(model_id, time.perf_counter() - started)
+            return
+
+    def _build_chat_messages(self, message: str, conversation_history: List[Dict] = None) -> List[Dict]:
+        """Prepare Converse messages from history plus the current message"""
+        messages = []
+
+        # Add conversation history if provided
+        if conversation_history:
+            messages.extend(conversation_history)
+
+        # Add current message
+        messages.append({
+            "role": "user",
+            "content": [{"text": message}]
+        })
+        return messages
+
+    async def _summarize_history(self, previous_summary: Optional[str], messages: List[Dict]) -> str:
+        """Fold older conversation turns into a running summary"""
+        transcript = "\n".join(
+            f"{m.get('role', 'user').capitalize()}: "
+            + " ".join(block.get("text", "") for block in m.get("content", []))
+            for m in messages
+        )
+        prompt = (
+            "Summarize the following conversation between a user and an assistant so the assistant "
+            "can continue it. Keep names, facts, decisions, preferences and open questions. "
+            "Reply with the summary only.\n\n"
+        )
+        if previous_summary:
+            prompt += f"Summary of the conversation so far:\n{previous_summary}\n\nNew messages:\n"
+        response = await self._invoke(
+            "summarize",
+            {
+                "messages": [{"role": "user", "content": [{"text": prompt + transcript}]}],
+                "inferenceConfig": {"maxTokens": 500, "temperature": 0.2}
+            },
+            input_chars=len(transcript)
+        )
+        return response['output']['message']['content'][0]['text']
+
+    def estimate_chat(self, message: str, conversation_history: List[Dict] = None) -> RequestEstimate:
+        """Estimate a chat turn against the history budget of the model it would be routed to"""
+        model_id = self.router.preferred_model("chat", input_chars=len(message))
+        return estimate_chat(message, conversation_history, self.history.budget_for(model_id))
+
+    async def _prepare_chat(self, message: str, conversation_history: List[Dict] = None) -> Dict[str, Any]:
+        """Trim history to the model's token budget and build Converse parameters"""
+        model_id = self.router.preferred_model("chat", input_chars=len(message))
+        trim: TrimResult = await self.history.prepare(
+            conversation_history, message, model_id, self._summarize_history
+        )
+        messages = self._build_chat_messages(message, trim.messages)
+        input_tokens = estimate_messages_tokens(messages)
+        if trim.system_prompt:
+            input_tokens += estimate_tokens(trim.system_prompt[0]["text"])
+        params = {
+            "messages": messages,
+            "inferenceConfig": {
+                "maxTokens": choose_max_tokens(input_tokens),
+                "temperature": 0.7
+            }
+        }
+        if trim.system_prompt:
+            params["system"] = trim.system_prompt
+        return params
+
+    async def chat(self, message: str, conversation_history: List[Dict] = None,
+                   user_id: Optional[int] = None) -> str:
         """
         Simple chat using Bedrock Converse API
         """
+        if user_id is not None:
+            current_user_id.set(user_id)
         try:
-            # Prepare messages
-            messages = []
-            
-            # Add conversation history if provided
-            if conversation_history:
-                messages.extend(conversation_history)
-            
-            # Add current message
-            messages.append({
-                "role": "user",
-                "content": [{"text": message}]
-            })
-            
-            # Call Bedrock Converse API
-            response = self.client.converse(
-                modelId=self.model_id,
-                messages=messages,
-                inferenceConfig={
-                    "maxTokens": 4000,
-                    "temperature": 0.7
-                }
-            )
-            
+            params = await self._prepare_chat(message, conversation_history)
+
+            # Call Bedrock Converse API off the event loop
+            response = await self._invoke("chat", params, input_chars=len(message))
+
             # Extract response text
             return response['output']['message']['content'][0]['text']
-            
+
+        except (BedrockOverloadedError, RequestTooLargeError):
+            raise
         except ClientError as e:
             logger.error(f"Bedrock API error: {e}")
             return f"Error: {str(e)}"
         except Exception as e:
             logger.error(f"Unexpected error: {e}")
             return f"Error: {str(e)}"
-    
-    async def analyze_document(self, text: str, analysis_type: str = "summary") -> str:
+
+    async def chat_stream(self, message: str, conversation_history: List[Dict] = None,
+                          user_id: Optional[int] = None) -> AsyncIterator[str]:
         """
-        Analyze document text using Bedrock
+        Stream a chat reply using Bedrock Converse Stream API, yielding text deltas
+
+        Errors are raised to the caller, since a partial reply has already been sent.
         """
-        try:
-            # Create analysis prompt based on type
-            prompts = {
-                "summary": f"Please provide a concise summary of the following document:\n\n{text}",
-                "key_points": f"Extract the key points from the following document:\n\n{text}",
-                "questions": f"Generate important questions that this document answers:\n\n{text}",
-                "analysis": f"Provide a detailed analysis of the following document:\n\n{text}"
-            }
-            
-            prompt = prompts.get(analysis_type, prompts["summary"])
-            
-            # Call Bedrock
-            response = self.client.converse(
-                modelId=self.model_id,
-                messages=[{
+        if user_id is not None:
+            current_user_id.set(user_id)
+        params = await self._prepare_chat(message, conversation_history)
+
+        async for event in self._invoke_stream("chat", params, input_chars=len(message)):
+            delta = event.get("contentBlockDelta", {}).get("delta", {}).get("text")
+            if delta:
+                yield delta
+
+    async def _converse_text(self, prompt: str, inference_config: Dict[str, Any],
+                             analysis_type: Optional[str] = None, models_used: Optional[Set[str]] = None) -> str:
+        """Send a single-turn prompt and return the reply text"""
+        response = await self._invoke(
+            "analyze",
+            {
+                "messages": [{
                     "role": "user",
                     "content": [{"text": prompt}]
                 }],
-                inferenceConfig={
-                    "maxTokens": 4000,
-                    "temperature": 0.3
-                }
+                "inferenceConfig": inference_config
+            },
+            analysis_type=analysis_type,
+            input_chars=len(prompt),
+            models_used=models_used
+        )
+        return response['output']['message']['content'][0]['text']
+
+    async def _map_reduce(self, text: str, analysis_type: str, inference_config: Dict[str, Any],
+                          models_used: Optional[Set[str]] = None) -> str:
+        """
+        Analyze a long document chunk by chunk with bounded concurrency, then reduce
+        the partial results into one answer
+        """
+        chunks = split_document(text, settings.DOC_CHUNK_SIZE, settings.DOC_CHUNK_OVERLAP)
+        semaphore = asyncio.Semaphore(settings.DOC_MAP_PARALLELISM)
+
+        async def bounded(prompt: str) -> str:
+            async with semaphore:
+                return await self._converse_text(prompt, inference_config, analysis_type, models_used)
+
+        total = len(chunks)
+        partials = await asyncio.gather(*(
+            bounded(
+                f"The following is part {i} of {total} of a longer document. "
+                f"{MAP_INSTRUCTIONS[analysis_type]}:\n\n{chunk}"
             )
-            
-            return response['output']['message']['content'][0]['text']
-            
+            for i, chunk in enumerate(chunks, 1)
+        ))
+
+        # Reduce in rounds until the partials fit into a single prompt
+        while True:
+            batches: List[List[str]] = [[]]
+            batch_len = 0
+            for partial in partials:
+                # At least two partials per batch so every round shrinks the list
+                if len(batches[-1]) >= 2 and batch_len + len(partial) > settings.DOC_CHUNK_SIZE:
+                    batches.append([])
+                    batch_len = 0
+                batches[-1].append(partial)
+                batch_len += len(partial)
+
+            reduced = await asyncio.gather(*(
+                bounded(
+                    f"The following are partial results extracted from {len(batch)} consecutive parts "
+                    f"of one document. {REDUCE_INSTRUCTIONS[analysis_type]}:\n\n"
+                    + "\n\n".join(f"### Part {i}\n{partial}" for i, partial in enumerate(batch, 1))
+                )
+                for batch in batches
+            ))
+            if len(reduced) == 1:
+                return reduced[0]
+            partials = list(reduced)
+
+    async def _run_analysis(self, text: str, analysis_type: str, inference_config: Dict[str, Any],
+                            chunked: bool, request_key: str, store: bool) -> str:
+        """
+        Call Bedrock for an analysis and optionally store the result in the cache,
+        tagged with the model(s) that answered: the key names the routed model,
+        but a failover may have served some or all of the calls
+        """
+        models_used: Set[str] = set()
+        if chunked:
+            analysis = await self._map_reduce(text, analysis_type, inference_config, models_used)
+        else:
+            prompt = f"{ANALYSIS_PROMPTS[analysis_type]}:\n\n{text}"
+            analysis = await self._converse_text(prompt, inference_config, analysis_type, models_used)
+
+        if store:
+            await self.cache.set(request_key, analysis, model_id=",".join(sorted(models_used)),
+                                 analysis_type=analysis_type)
+        return analysis
+
+    async def _run_analysis_shared(self, text: str, analysis_type: str, inference_config: Dict[str, Any],
+                                   chunked: bool, request_key: str, store: bool) -> str:
+        """Run an analysis under the cross-worker lock for its key, reusing a result another worker stored"""
+        async with postgres_advisory_lock(request_key):
+            cached = await self.cache.get(request_key)
+            if cached is not None:
+                self.single_flight.record_cross_worker_hit()
+                return cached
+            return await self._run_analysis(text, analysis_type, inference_config, chunked,
+                                            request_key, store)
+
+    async def analyze_document(self, text: str, analysis_type: str = "summary", use_cache: bool = True,
+                               raise_errors: bool = False, user_id: Optional[int] = None,
+                               estimate: Optional[RequestEstimate] = None) -> str:
+        """
+        Analyze document text using Bedrock
+
+        Documents longer than DOC_CHUNK_SIZE are analyzed with map-reduce over
+        page/paragraph chunks. Successful responses are cached by content and
+        identical concurrent requests share one Bedrock call; use_cache=False
+        skips both and forces a fresh call. With raise_errors=True failures are
+        raised instead of returned as an error message. Bedrock usage is
+        attributed to user_id; coalesced callers share the first caller's call.
+        maxTokens comes from the preflight estimate (computed here unless the
+        caller already has it); RequestTooLargeError is always raised.
+        """
+        if user_id is not None:
+            current_user_id.set(user_id)
+        try:
+            if analysis_type not in ANALYSIS_PROMPTS:
+                analysis_type = "summary"
+            estimate = estimate or estimate_analysis(text, analysis_type)
+            inference_config = {
+                "maxTokens": estimate.max_output_tokens,
+                "temperature": 0.3
+            }
+            chunked = estimate.chunked
+
+            model_id = self.router.preferred_model("analyze", analysis_type, len(text))
+            key_params = dict(inference_config)
+            if chunked:
+                key_params.update(chunk_size=settings.DOC_CHUNK_SIZE, chunk_overlap=settings.DOC_CHUNK_OVERLAP)
+            request_key = ResponseCache.make_key(text, analysis_type, model_id, key_params)
+            args = (text, analysis_type, inference_config, chunked, request_key, self.cache.enabled)
+
+            if not use_cache:
+                if self.cache.enabled:
+                    self.cache.record_bypass()
+                return await self._run_analysis(*args)
+
+            if self.cache.enabled:
+                cached = await self.cache.get(request_key)
+                if cached is not None:
+                    return cached
+
+            # Call Bedrock off the event loop, once per key across concurrent callers
+            run = self._run_analysis_shared if self.cache.enabled and self.coalesce_across_workers \
+                else self._run_analysis
+            return await self.single_flight.do(request_key, lambda: run(*args))
+
+        except (BedrockOverloadedError, RequestTooLargeError):
+            raise
         except Exception as e:
             logger.error(f"Document analysis error: {e}")
+            if raise_errors:
+                raise
             return f"Error analyzing document: {str(e)}"
 
+    async def ask_document(self, question: str, excerpts: List[str], use_cache: bool = True,
+                           user_id: Optional[int] = None, estimate: Optional[RequestEstimate] = None) -> str:
+        """
+        Answer a question from retrieved document excerpts in a single call
+
+        The prompt holds only the excerpts, so its size does not grow with the
+        document. Answers are cached and coalesced like analyses.
+        """
+        if user_id is not None:
+            current_user_id.set(user_id)
+        try:
+            estimate = estimate or estimate_question(question, excerpts)
+            inference_config = {
+                "maxTokens": estimate.max_output_tokens,
+                "temperature": 0.2
+            }
+            prompt = (
+                f"{ASK_PROMPT}\n\n"
+                + "\n\n".join(f"### Excerpt {i}\n{excerpt}" for i, excerpt in enumerate(excerpts, 1))
+                + f"\n\nQuestion: {question}"
+            )
+            model_id = self.router.preferred_model("analyze", "ask", len(prompt))
+            request_key = ResponseCache.make_key(prompt, "ask", model_id, inference_config)
+
+            async def answer() -> str:
+                models_used: Set[str] = set()
+                text = await self._converse_text(prompt, inference_config, "ask", models_used)
+                if self.cache.enabled:
+                    await self.cache.set(request_key, text, model_id=",".join(sorted(models_used)),
+                                         analysis_type="ask")
+                return text
+
+            if not use_cache:
+                if self.cache.enabled:
+                    self.cache.record_bypass()
+                return await answer()
+            if self.cache.enabled:
+                cached = await self.cache.get(request_key)
+                if cached is not None:
+                    return cached
+            return await self.single_flight.do(request_key, answer)
+
+        except (BedrockOverloadedError, RequestTooLargeError):
+            raise
+        except Exception as e:
+            logger.error(f"Document question error: {e}")
+            return f"Error answering question: {str(e)}"
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get Bedrock execution statistics"""
+        return {
+            "routing": self.router.get_stats(),
+            "executor": self.executor.get_stats(),
+            "cache": self.cache.get_stats(),
+            "history": self.history.get_stats(),
+            "coalescing": {**self.single_flight.get_stats(), "cross_worker_locks": advisory_locks.get_stats()},
+            "usage": self.usage.get_stats(),
+            "token_estimator": get_cache_stats(),
+            "throttling": {
+                "retries": self.retries,
+                "limiters": {model_id: limiter.get_stats() for model_id, limiter in self._limiters.items()},
+            },
+        }
+
 # Global instance
-bedrock_service = BedrockService()
+bedrock_service = BedrockService(
+    region_name=settings.AWS_REGION,
+    router=ModelRouter(
+        primary_model=settings.BEDROCK_PRIMARY_MODEL,
+        fallback_model=settings.BEDROCK_FALLBACK_MODEL,
+        fast_model=settings.BEDROCK_FAST_MODEL,
+        short_input_chars=settings.BEDROCK_SHORT_CHAT_CHARS,
+        rules=settings.BEDROCK_ROUTING_RULES,
+        latency_aware=settings.BEDROCK_LATENCY_AWARE_ROUTING,
+        failure_threshold=settings.BEDROCK_BREAKER_FAILURE_THRESHOLD,
+        cooldown_seconds=settings.BEDROCK_BREAKER_COOLDOWN_SECONDS,
+    ),
+    history=HistoryManager(
+        default_budget=settings.CHAT_HISTORY_TOKEN_BUDGET,
+        model_budgets=settings.CHAT_HISTORY_MODEL_BUDGETS,
+    ),
+    cache=create_response_cache(
+        settings.RESPONSE_CACHE_BACKEND,
+        settings.RESPONSE_CACHE_MAX_ENTRIES,
+        settings.RESPONSE_CACHE_TTL_SECONDS,
+    ),
+    coalesce_across_workers=settings.BEDROCK_COALESCE_ACROSS_WORKERS and settings.RESPONSE_CACHE_BACKEND == "postgres",
+    usage=usage_tracker,
+)
@@ -0,0 +1,87 @@
+"""
+Document Chunker
+Splits extracted document text on page and paragraph boundaries for map-reduce analysis
+"""
+import re
+from typing import List
+
+# Page separator written by the PDF extractor
+PAGE_BREAK = "\f"
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+def _split_oversized(unit: str, chunk_size: int) -> List[str]:
+    """Split a unit larger than chunk_size on line boundaries, then hard-slice"""
+    pieces: List[str] = []
+    current = ""
+    for line in unit.split("\n"):
+        while len(line) > chunk_size:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(line[:chunk_size])
+            line = line[chunk_size:]
+        if current and len(current) + len(line) + 1 > chunk_size:
+            pieces.append(current)
+            current = line
+        else:
+            current = f"{current}\n{line}" if current else line
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def _split_units(text: str, chunk_size: int) -> List[str]:
+    """Break text into pages, then paragraphs, each no larger than chunk_size"""
+    units: List[str] = []
+    for page in text.split(PAGE_BREAK):
+        for paragraph in _PARAGRAPH_BREAK.split(page):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            if len(paragraph) > chunk_size:
+                units.extend(_split_oversized(paragraph, chunk_size))
+            else:
+                units.append(paragraph)
+    return units
+
+
+def split_document(text: str, chunk_size: int = 12000, overlap: int = 500) -> List[str]:
+    """
+    Pack page/paragraph units greedily into chunks of at most chunk_size characters
+
+    Each chunk after the first starts with trailing units of the previous chunk,
+    up to overlap characters, so context is not lost at the boundaries.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    overlap = max(0, min(overlap, chunk_size // 2))
+
+    chunks: List[str] = []
+    current: List[str] = []
+    current_len = 0
+
+    for unit in _split_units(text, chunk_size):
+        unit_len = len(unit) + 2
+        if current and current_len + unit_len > chunk_size:
+            chunks.append("\n\n".join(current))
+
+            # Carry trailing units forward as overlap
+            carried: List[str] = []
+            carried_len = 0
+            for previous in reversed(current):
+                if carried_len + len(previous) + 2 > overlap:
+                    break
+                carried.insert(0, previous)
+                carried_len += len(previous) + 2
+            if carried_len + unit_len > chunk_size:
+                carried, carried_len = [], 0
+            current, current_len = carried, carried_len
+
+        current.append(unit)
+        current_len += unit_len
+
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
@@ -0,0 +1,96 @@
+"""
+Document Extractor
+Extracts plain text from uploaded PDF, DOCX and TXT files
+"""
+import asyncio
+import io
+import mmap
+import os
+import shutil
+import tempfile
+from typing import BinaryIO, Optional, Union
+
+import PyPDF2
+
+from app.services.document_chunker import PAGE_BREAK
+from app.services.docx_extractor import extract_docx_text
+from app.services.pdf_extractor import DocumentLimitError, pdf_extraction_pool
+from app.services.page_selection import PageSelection
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx", ".txt")
+
+# Starlette spools uploads to disk past 1 MB; from there a text file is decoded from a memory map
+MMAP_MIN_BYTES = 1024 * 1024
+
+
+class UnsupportedDocumentError(ValueError):
+    """Raised for file types the extractor cannot read"""
+
+
+def _file_size(file: BinaryIO) -> int:
+    file.seek(0, os.SEEK_END)
+    size = file.tell()
+    file.seek(0)
+    return size
+
+
+def _read_text(file: BinaryIO) -> str:
+    """Decode a UTF-8 file, straight from a memory map when it is on disk"""
+    if _file_size(file) >= MMAP_MIN_BYTES:
+        try:
+            fileno = file.fileno()
+        except (AttributeError, io.UnsupportedOperation):
+            fileno = None
+        if fileno is not None:
+            with mmap.mmap(fileno, 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+                return str(view, "utf-8")
+    return file.read().decode("utf-8")
+
+
+def extract_text(source: Union[bytes, BinaryIO], filename: str) -> str:
+    """
+    Extract text based on the filename extension
+
+    source is raw bytes or a seekable binary file such as UploadFile.file; files
+    are parsed in place rather than read into memory first.
+    """
+    file = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+    file.seek(0)
+    if filename.endswith('.pdf'):
+        pdf_reader = PyPDF2.PdfReader(file)
+        # Separate pages with a form feed so long documents chunk on page boundaries
+        return PAGE_BREAK.join(page.extract_text() + "\n" for page in pdf_reader.pages)
+    if filename.endswith('.docx'):
+        # Streamed from the zip: tables, headers and notes included, no object model built
+        return extract_docx_text(file)
+    if filename.endswith('.txt'):
+        return _read_text(file)
+    raise UnsupportedDocumentError("Unsupported file type")
+
+
+def _copy_to(source: BinaryIO, destination: BinaryIO):
+    source.seek(0)
+    shutil.copyfileobj(source, destination, 1024 * 1024)
+    destination.flush()
+
+
+async def extract_text_async(source: Union[bytes, BinaryIO], filename: str,
+                             selection: Optional[PageSelection] = None) -> str:
+    """
+    Extract text without blocking the event loop
+
+    PDFs are split across the extraction process pool, which needs a path, so
+    uploads without one are copied to a named temp file first; a page selection
+    limits parsing to those pages. Other types have no pages and are parsed
+    whole in a thread. Raises DocumentLimitError for PDFs over the page or time limit.
+    """
+    if not filename.endswith('.pdf'):
+        return await asyncio.to_thread(extract_text, source, filename)
+
+    file = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+    path = getattr(file, "name", None)
+    if isinstance(path, str) and os.path.isfile(path):
+        return await pdf_extraction_pool.extract(path, selection)
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as copy:
+        await asyncio.to_thread(_copy_to, file, copy)
+        return await pdf_extraction_pool.extract(copy.name, selection)
@@ -0,0 +1,141 @@
+"""
+Document Index
+In-process BM25 index over the chunks of an extracted document, cached per
+document SHA-256, for answering questions from the most relevant excerpts only
+"""
+import asyncio
+import heapq
+import math
+import re
+from collections import Counter, OrderedDict
+from typing import Dict, List, Tuple
+
+from app.core.config import settings
+from app.services.document_chunker import split_document
+from app.services.single_flight import SingleFlight
+
+_TOKEN = re.compile(r"\w+")
+
+# Very common English words carry no signal for ranking
+STOPWORDS = frozenset(
+    "a an and are as at be but by can do does for from has have how i in is it its of on or "
+    "that the their there these this to was were what when where which who why will with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords and single characters"""
+    return [t for t in _TOKEN.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+class BM25Index:
+    def __init__(self, chunks: List[str], k1: float = 1.5, b: float = 0.75):
+        """Build postings (term -> [(chunk, term frequency)]) for the chunks"""
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.lengths: List[int] = []
+        for i, chunk in enumerate(chunks):
+            counts = Counter(tokenize(chunk))
+            self.lengths.append(sum(counts.values()))
+            for term, frequency in counts.items():
+                self.postings.setdefault(term, []).append((i, frequency))
+        self.average_length = (sum(self.lengths) / len(chunks)) if chunks else 0.0
+
+    @property
+    def size(self) -> int:
+        return len(self.chunks)
+
+    def idf(self, term: str) -> float:
+        frequency = len(self.postings.get(term, ()))
+        return math.log(1 + (len(self.chunks) - frequency + 0.5) / (frequency + 0.5))
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """Top k (chunk index, score) pairs for the query, best first; only chunks sharing a term score"""
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            for i, frequency in postings:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[i] / (self.average_length or 1))
+                scores[i] = scores.get(i, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+
+class DocumentIndexCache:
+    def __init__(self, max_entries: int = 32, chunk_size: int = 1500, chunk_overlap: int = 200):
+        """LRU of BM25 indexes keyed by document SHA-256; max_entries=0 disables caching"""
+        self.max_entries = max_entries
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.single_flight = SingleFlight()
+        self._indexes: "OrderedDict[str, BM25Index]" = OrderedDict()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def build(self, text: str) -> BM25Index:
+        return BM25Index(split_document(text, self.chunk_size, self.chunk_overlap))
+
+    async def get(self, text: str, sha256: str) -> BM25Index:
+        """
+        Index for a document, built off the event loop on a miss; documents
+        without a hash (extraction cache disabled) are indexed every time
+        """
+        if not sha256 or self.max_entries <= 0:
+            self.misses += 1
+            return await asyncio.to_thread(self.build, text)
+
+        index = self._indexes.get(sha256)
+        if index is not None:
+            self.hits += 1
+            self._indexes.move_to_end(sha256)
+            return index
+        self.misses += 1
+
+        async def build() -> BM25Index:
+            index = await asyncio.to_thread(self.build, text)
+            self._indexes[sha256] = index
+            while len(self._indexes) > self.max_entries:
+                self._indexes.popitem(last=False)
+                self.evictions += 1
+            return index
+
+        return await self.single_flight.do(sha256, build)
+
+    def get_stats(self) -> Dict[str, float]:
+        """Get index cache hit ratio and size"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._indexes),
+            "max_entries": self.max_entries,
+            "chunks": sum(index.size for index in self._indexes.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+def select_excerpts(index: BM25Index, question: str, k: int) -> List[Tuple[int, float]]:
+    """
+    Top k chunks for the question in document order, so excerpts read in
+    sequence; falls back to the opening chunks when no term matches
+    """
+    ranked = index.search(question, k)
+    if not ranked:
+        ranked = [(i, 0.0) for i in range(min(k, index.size))]
+    return sorted(ranked)
+
+
+# Global instance
+document_index_cache = DocumentIndexCache(
+    max_entries=settings.DOC_INDEX_CACHE_ENTRIES,
+    chunk_size=settings.RETRIEVAL_CHUNK_SIZE,
+    chunk_overlap=settings.RETRIEVAL_CHUNK_OVERLAP,
+)
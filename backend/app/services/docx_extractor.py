@@ -0,0 +1,119 @@
+"""
+DOCX Extractor
+Streams text out of a .docx with zipfile and incremental XML parsing, without
+building a document object model; covers body paragraphs, tables, headers,
+footers, footnotes and endnotes
+"""
+import re
+import zipfile
+from typing import BinaryIO, Iterator, List
+from xml.etree.ElementTree import Element, iterparse
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+_PARAGRAPH = f"{W}p"
+_TABLE = f"{W}tbl"
+_ROW = f"{W}tr"
+_CELL = f"{W}tc"
+_TEXT = f"{W}t"
+_TAB = f"{W}tab"
+_BREAKS = (f"{W}br", f"{W}cr")
+# Containers whose direct children are the blocks we emit and then discard
+_CONTAINERS = {f"{W}body", f"{W}hdr", f"{W}ftr", f"{W}footnote", f"{W}endnote"}
+
+_HEADER_FOOTER = re.compile(r"^word/(header|footer)\d*\.xml$")
+_NOTES = ("word/footnotes.xml", "word/endnotes.xml")
+
+
+def _paragraph_text(paragraph: Element) -> str:
+    """Visible text of a paragraph; deleted text and field codes live in other tags and are skipped"""
+    parts = []
+    for node in paragraph.iter():
+        if node.tag == _TEXT:
+            parts.append(node.text or "")
+        elif node.tag == _TAB:
+            parts.append("\t")
+        elif node.tag in _BREAKS:
+            parts.append("\n")
+    return "".join(parts)
+
+
+def iter_part_blocks(stream: BinaryIO) -> Iterator[str]:
+    """
+    Yield one string per paragraph, and one per table row (cells joined by " | "),
+    from a WordprocessingML part; finished blocks are removed from the tree as
+    they are yielded so memory stays bounded by the largest block
+    """
+    stack: List[Element] = []
+    cells: List[List[str]] = []  # one list of cell texts per open table row
+    cell_paragraphs: List[List[str]] = []  # paragraphs of each open cell
+
+    for event, element in iterparse(stream, events=("start", "end")):
+        if event == "start":
+            stack.append(element)
+            if element.tag == _ROW:
+                cells.append([])
+            elif element.tag == _CELL:
+                cell_paragraphs.append([])
+            continue
+
+        stack.pop()
+        tag = element.tag
+        if tag == _PARAGRAPH:
+            text = _paragraph_text(element)
+            if cell_paragraphs:
+                cell_paragraphs[-1].append(text)
+            else:
+                yield text
+            element.clear()
+        elif tag == _CELL:
+            text = " ".join(p for p in cell_paragraphs.pop() if p)
+            if cells:
+                cells[-1].append(text)
+            element.clear()
+        elif tag == _ROW:
+            row = " | ".join(cells.pop())
+            # A nested table's rows become part of the enclosing cell
+            if cell_paragraphs:
+                cell_paragraphs[-1].append(row)
+            else:
+                yield row
+            element.clear()
+
+        if stack and stack[-1].tag in _CONTAINERS:
+            stack[-1].remove(element)
+
+
+def iter_docx_blocks(file: BinaryIO) -> Iterator[str]:
+    """
+    Yield text blocks of a .docx in reading order: headers, body, footers,
+    then footnotes and endnotes; header and footer lines repeated across
+    sections are yielded once
+    """
+    with zipfile.ZipFile(file) as archive:
+        names = set(archive.namelist())
+        headers = sorted(n for n in names if _HEADER_FOOTER.match(n) and "header" in n)
+        footers = sorted(n for n in names if _HEADER_FOOTER.match(n) and "footer" in n)
+
+        def repeated_parts(parts: List[str]) -> Iterator[str]:
+            seen = set()
+            for name in parts:
+                with archive.open(name) as stream:
+                    for block in iter_part_blocks(stream):
+                        if block.strip() and block not in seen:
+                            seen.add(block)
+                            yield block
+
+        yield from repeated_parts(headers)
+        with archive.open("word/document.xml") as stream:
+            yield from iter_part_blocks(stream)
+        yield from repeated_parts(footers)
+        for name in _NOTES:
+            if name in names:
+                with archive.open(name) as stream:
+                    yield from (block for block in iter_part_blocks(stream) if block.strip())
+
+
+def extract_docx_text(file: BinaryIO) -> str:
+    """Extract all text of a .docx, one block per line"""
+    return "".join(block + "\n" for block in iter_docx_blocks(file))
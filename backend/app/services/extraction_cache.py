@@ -0,0 +1,247 @@
+"""
+Extraction Cache
+Content-addressed on-disk store of extracted document text, keyed by the
+SHA-256 of the uploaded bytes, zlib-compressed with LRU eviction by total size
+"""
+import asyncio
+import hashlib
+import io
+import json
+import logging
+import os
+import tempfile
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
+
+from app.core.config import settings
+from app.services.document_chunker import PAGE_BREAK
+from app.services.document_extractor import extract_text_async
+from app.services.page_selection import PageSelection, render_pages
+from app.services.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Bump when extraction output changes so stale entries stop matching
+EXTRACTOR_VERSION = 2
+
+
+@dataclass
+class ExtractedDocument:
+    """Extracted text plus the character offset where each page starts"""
+
+    text: str
+    sha256: str
+    page_offsets: List[int] = field(default_factory=lambda: [0])
+    cached: bool = False
+
+    @classmethod
+    def from_text(cls, text: str, sha256: str) -> "ExtractedDocument":
+        offsets = [0]
+        position = text.find(PAGE_BREAK)
+        while position != -1:
+            offsets.append(position + 1)
+            position = text.find(PAGE_BREAK, position + 1)
+        return cls(text=text, sha256=sha256, page_offsets=offsets)
+
+    @property
+    def page_count(self) -> int:
+        return len(self.page_offsets)
+
+    def page_text(self, index: int) -> str:
+        """Text of one 0-based page, without its page separator"""
+        start = self.page_offsets[index]
+        if index + 1 < len(self.page_offsets):
+            return self.text[start:self.page_offsets[index + 1] - len(PAGE_BREAK)]
+        return self.text[start:]
+
+    def select(self, selection: PageSelection) -> "ExtractedDocument":
+        """Selected pages of an already extracted document, rendered like a fresh selective extraction"""
+        indexes = selection.resolve(self.page_count)
+        document = ExtractedDocument.from_text(
+            render_pages((i, self.page_text(i)) for i in indexes), self.sha256
+        )
+        document.cached = self.cached
+        return document
+
+
+def hash_file(file: BinaryIO) -> str:
+    """SHA-256 of a seekable file, read in 1 MB blocks"""
+    digest = hashlib.sha256()
+    file.seek(0)
+    for block in iter(lambda: file.read(1024 * 1024), b""):
+        digest.update(block)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    def __init__(self, directory: str, max_bytes: int, compression_level: int = 6):
+        """Index existing entries, least recently used first (by file mtime); max_bytes=0 disables"""
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.compression_level = compression_level
+        self.single_flight = SingleFlight()
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self.total_bytes = 0
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.errors = 0
+
+        self.enabled = max_bytes > 0
+        entries = []
+        if self.enabled:
+            try:
+                os.makedirs(directory, exist_ok=True)
+                for name in os.listdir(directory):
+                    if name.endswith(".z"):
+                        stat = os.stat(os.path.join(directory, name))
+                        entries.append((stat.st_mtime, name[:-2], stat.st_size))
+            except OSError as e:
+                logger.error(f"Extraction cache disabled, cannot use {directory}: {e}")
+                self.enabled = False
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self.total_bytes += size
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.z")
+
+    @staticmethod
+    def make_key(sha256: str, filename: str) -> str:
+        """Same bytes under another extension parse differently, so the extension is part of the key"""
+        extension = os.path.splitext(filename)[1].lower().lstrip(".") or "bin"
+        return f"{sha256}-{extension}-v{EXTRACTOR_VERSION}"
+
+    def _read(self, key: str) -> Optional[Tuple[str, List[int]]]:
+        """Load and decompress an entry; the first line is a JSON header"""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                payload = zlib.decompress(f.read()).decode("utf-8")
+            os.utime(path)
+        except FileNotFoundError:
+            # Never stored, or evicted by another worker sharing the directory
+            return None
+        header, _, text = payload.partition("\n")
+        return text, json.loads(header)["page_offsets"]
+
+    def _write(self, key: str, document: ExtractedDocument) -> int:
+        header = json.dumps({"page_offsets": document.page_offsets})
+        payload = zlib.compress(f"{header}\n{document.text}".encode("utf-8"), self.compression_level)
+        # Write then rename so readers never see a partial entry
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            os.replace(temp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+        return len(payload)
+
+    def _forget(self, key: str):
+        size = self._index.pop(key, None)
+        if size is not None:
+            self.total_bytes -= size
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and len(self._index) > 1:
+            key, _ = next(iter(self._index.items()))
+            self._forget(key)
+            try:
+                os.unlink(self._path(key))
+            except FileNotFoundError:
+                pass
+            self.evictions += 1
+
+    async def get(self, key: str) -> Optional[ExtractedDocument]:
+        try:
+            entry = await asyncio.to_thread(self._read, key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Extraction cache read failed for {key}: {e}")
+            self._forget(key)
+            return None
+        if entry is None:
+            self._forget(key)
+            return None
+        self._index.move_to_end(key)
+        text, offsets = entry
+        return ExtractedDocument(text=text, sha256=key.split("-", 1)[0], page_offsets=offsets, cached=True)
+
+    async def set(self, key: str, document: ExtractedDocument):
+        try:
+            size = await asyncio.to_thread(self._write, key, document)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Extraction cache write failed for {key}: {e}")
+            return
+        self._forget(key)
+        self._index[key] = size
+        self.total_bytes += size
+        self._evict()
+
+    async def extract(self, source: Union[bytes, BinaryIO], filename: str,
+                      selection: Optional[PageSelection] = None) -> ExtractedDocument:
+        """
+        Return the extracted document for these bytes, parsing only on a miss
+
+        Concurrent uploads of the same file share one parse. A page selection on
+        a PDF is served from a cached full extraction when there is one (except
+        toc, which needs the PDF outline); otherwise only the selected pages are
+        parsed and the partial result is not stored.
+        """
+        file = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+        if not filename.endswith(".pdf"):
+            # Only PDFs have pages to select
+            selection = None
+        if not self.enabled:
+            return ExtractedDocument.from_text(await extract_text_async(file, filename, selection), "")
+
+        sha256 = await asyncio.to_thread(hash_file, file)
+        key = self.make_key(sha256, filename)
+
+        cached = await self.get(key)
+        if cached is not None and (selection is None or not selection.needs_outline):
+            self.hits += 1
+            return cached.select(selection) if selection else cached
+        self.misses += 1
+
+        if selection is not None:
+            return ExtractedDocument.from_text(await extract_text_async(file, filename, selection), sha256)
+
+        async def parse() -> ExtractedDocument:
+            document = ExtractedDocument.from_text(await extract_text_async(file, filename), sha256)
+            if document.text.strip():
+                await self.set(key, document)
+            return document
+
+        return await self.single_flight.do(key, parse)
+
+    def get_stats(self) -> Dict[str, float]:
+        """Get hit ratio and disk usage for this worker's view of the store"""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._index),
+            "total_bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "errors": self.errors,
+        }
+
+
+# Global instance
+extraction_cache = ExtractionCache(
+    directory=settings.EXTRACTION_CACHE_DIR,
+    max_bytes=settings.EXTRACTION_CACHE_MAX_MB * 1024 * 1024 if settings.EXTRACTION_CACHE_ENABLED else 0,
+)
@@ -0,0 +1,149 @@
+"""
+Fake Bedrock Runtime Client
+Local stand-in for the bedrock-runtime client with configurable latency,
+token rates, throttling and streaming, for load tests and benchmarks
+"""
+import math
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from botocore.exceptions import ClientError
+
+
+class FakeBedrockClient:
+    def __init__(
+        self,
+        latency_ms: float = 300.0,
+        latency_jitter_ms: float = 0.0,
+        latency_distribution: str = "fixed",
+        tokens_per_second: float = 80.0,
+        output_tokens: int = 200,
+        throttle_rate: float = 0.0,
+        error_rate: float = 0.0,
+        max_concurrency: int = 0,
+        seed: Optional[int] = None,
+    ):
+        """
+        latency_ms is the time to first token; generation then runs at
+        tokens_per_second. max_concurrency > 0 throttles calls beyond that many
+        in flight, like an account quota.
+        """
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.latency_distribution = latency_distribution
+        self.tokens_per_second = tokens_per_second
+        self.output_tokens = output_tokens
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.max_concurrency = max_concurrency
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.calls = 0
+
+    @classmethod
+    def from_env(cls) -> "FakeBedrockClient":
+        """Build a client from FAKE_BEDROCK_* environment variables"""
+        seed = os.getenv("FAKE_BEDROCK_SEED")
+        return cls(
+            latency_ms=float(os.getenv("FAKE_BEDROCK_LATENCY_MS", "300")),
+            latency_jitter_ms=float(os.getenv("FAKE_BEDROCK_LATENCY_JITTER_MS", "0")),
+            latency_distribution=os.getenv("FAKE_BEDROCK_LATENCY_DISTRIBUTION", "fixed"),
+            tokens_per_second=float(os.getenv("FAKE_BEDROCK_TOKENS_PER_SECOND", "80")),
+            output_tokens=int(os.getenv("FAKE_BEDROCK_OUTPUT_TOKENS", "200")),
+            throttle_rate=float(os.getenv("FAKE_BEDROCK_THROTTLE_RATE", "0")),
+            error_rate=float(os.getenv("FAKE_BEDROCK_ERROR_RATE", "0")),
+            max_concurrency=int(os.getenv("FAKE_BEDROCK_MAX_CONCURRENCY", "0")),
+            seed=int(seed) if seed else None,
+        )
+
+    def _first_token_delay(self) -> float:
+        """Sample time to first token in seconds from the configured distribution"""
+        mean, jitter = self.latency_ms, self.latency_jitter_ms
+        if self.latency_distribution == "uniform":
+            value = self._random.uniform(mean - jitter, mean + jitter)
+        elif self.latency_distribution == "lognormal" and mean > 0:
+            sigma = math.sqrt(math.log(1 + (jitter / mean) ** 2)) if jitter else 0.0
+            value = self._random.lognormvariate(math.log(mean) - sigma ** 2 / 2, sigma)
+        else:
+            value = mean
+        return max(0.0, value) / 1000.0
+
+    @staticmethod
+    def _client_error(code: str, status: int, operation: str) -> ClientError:
+        return ClientError(
+            {"Error": {"Code": code, "Message": f"Fake {code}"}, "ResponseMetadata": {"HTTPStatusCode": status}},
+            operation,
+        )
+
+    def _admit(self, operation: str):
+        """Apply simulated throttling and server errors"""
+        with self._lock:
+            self.calls += 1
+            over_quota = self.max_concurrency and self._in_flight >= self.max_concurrency
+            if over_quota or self._random.random() < self.throttle_rate:
+                raise self._client_error("ThrottlingException", 429, operation)
+            if self._random.random() < self.error_rate:
+                raise self._client_error("ServiceUnavailableException", 503, operation)
+            self._in_flight += 1
+
+    def _leave(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    @staticmethod
+    def _input_tokens(messages: List[Dict], system: Optional[List[Dict]]) -> int:
+        chars = sum(len(block.get("text", "")) for m in messages for block in m.get("content", []))
+        chars += sum(len(block.get("text", "")) for block in system or [])
+        return max(1, chars // 4)
+
+    def _output_tokens(self, inference_config: Optional[Dict]) -> int:
+        max_tokens = (inference_config or {}).get("maxTokens", self.output_tokens)
+        return max(1, min(self.output_tokens, max_tokens))
+
+    def converse(self, modelId: str, messages: List[Dict], inferenceConfig: Optional[Dict] = None,
+                 system: Optional[List[Dict]] = None, **kwargs) -> Dict[str, Any]:
+        self._admit("Converse")
+        try:
+            started = time.perf_counter()
+            tokens = self._output_tokens(inferenceConfig)
+            time.sleep(self._first_token_delay() + tokens / self.tokens_per_second)
+            input_tokens = self._input_tokens(messages, system)
+            return {
+                "output": {"message": {"role": "assistant", "content": [{"text": "lorem " * tokens}]}},
+                "stopReason": "end_turn",
+                "usage": {"inputTokens": input_tokens, "outputTokens": tokens,
+                          "totalTokens": input_tokens + tokens},
+                "metrics": {"latencyMs": int((time.perf_counter() - started) * 1000)},
+            }
+        finally:
+            self._leave()
+
+    def _stream_events(self, tokens: int, input_tokens: int) -> Iterator[Dict[str, Any]]:
+        try:
+            started = time.perf_counter()
+            yield {"messageStart": {"role": "assistant"}}
+            time.sleep(self._first_token_delay())
+            interval = 1.0 / self.tokens_per_second
+            for i in range(tokens):
+                if i:
+                    time.sleep(interval)
+                yield {"contentBlockDelta": {"delta": {"text": "lorem "}, "contentBlockIndex": 0}}
+            yield {"contentBlockStop": {"contentBlockIndex": 0}}
+            yield {"messageStop": {"stopReason": "end_turn"}}
+            yield {"metadata": {
+                "usage": {"inputTokens": input_tokens, "outputTokens": tokens,
+                          "totalTokens": input_tokens + tokens},
+                "metrics": {"latencyMs": int((time.perf_counter() - started) * 1000)},
+            }}
+        finally:
+            self._leave()
+
+    def converse_stream(self, modelId: str, messages: List[Dict], inferenceConfig: Optional[Dict] = None,
+                        system: Optional[List[Dict]] = None, **kwargs) -> Dict[str, Any]:
+        self._admit("ConverseStream")
+        return {"stream": self._stream_events(self._output_tokens(inferenceConfig),
+                                              self._input_tokens(messages, system))}
@@ -0,0 +1,169 @@
+"""
+Conversation History Manager
+Keeps chat history within a per-model token budget using a sliding window
+plus a cached rolling summary of older turns
+"""
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from app.services.token_estimator import estimate_messages_tokens, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# summarize(previous_summary, messages_to_fold_in) -> new summary
+Summarizer = Callable[[Optional[str], List[Dict]], Awaitable[str]]
+
+
+@dataclass
+class TrimResult:
+    messages: List[Dict]
+    summary: Optional[str] = None
+    original_tokens: int = 0
+    kept_tokens: int = 0
+    summarized_messages: int = 0
+    dropped_messages: List[Dict] = field(default_factory=list)
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(0, self.original_tokens - self.kept_tokens)
+
+    @property
+    def system_prompt(self) -> Optional[List[Dict]]:
+        """Converse system blocks carrying the summary, if any"""
+        if not self.summary:
+            return None
+        return [{"text": f"Summary of the earlier conversation with this user:\n{self.summary}"}]
+
+
+class HistoryManager:
+    # Tokens held back from the window for the summary itself
+    SUMMARY_RESERVE_TOKENS = 600
+
+    def __init__(self, default_budget: int = 6000, model_budgets: Optional[Dict[str, int]] = None,
+                 summary_cache_size: int = 512):
+        """Initialize budgets and the summary cache"""
+        self.default_budget = default_budget
+        self.model_budgets = model_budgets or {}
+        self.summary_cache_size = summary_cache_size
+        self._summaries: "OrderedDict[str, str]" = OrderedDict()
+
+        # Metrics
+        self.trims = 0
+        self.tokens_saved_total = 0
+        self.last_tokens_saved = 0
+        self.summary_cache_hits = 0
+        self.summary_calls = 0
+        self.summary_failures = 0
+
+    def budget_for(self, model_id: str) -> int:
+        return self.model_budgets.get(model_id, self.default_budget)
+
+    @staticmethod
+    def _turn_starts(history: List[Dict]) -> List[int]:
+        """Indexes where a user turn begins"""
+        return [i for i, m in enumerate(history) if m.get("role") == "user"]
+
+    def _remember(self, digest: str, summary: str):
+        self._summaries[digest] = summary
+        self._summaries.move_to_end(digest)
+        while len(self._summaries) > self.summary_cache_size:
+            self._summaries.popitem(last=False)
+
+    async def _summarize_rolled(self, rolled: List[Dict], summarize: Summarizer) -> str:
+        """
+        Summarize the rolled-off prefix, extending the longest cached summary of
+        a shorter prefix so each turn only folds in the newly rolled messages
+        """
+        boundaries = self._turn_starts(rolled)[1:] + [len(rolled)]
+        running = hashlib.sha256()
+        digests: Dict[int, str] = {}
+        position = 0
+        for boundary in boundaries:
+            for message in rolled[position:boundary]:
+                running.update(json.dumps(message, sort_keys=True).encode("utf-8"))
+            digests[boundary] = running.hexdigest()
+            position = boundary
+
+        full_digest = digests[len(rolled)]
+        if full_digest in self._summaries:
+            self.summary_cache_hits += 1
+            self._summaries.move_to_end(full_digest)
+            return self._summaries[full_digest]
+
+        previous_summary, start = None, 0
+        for boundary in reversed(boundaries[:-1]):
+            if digests[boundary] in self._summaries:
+                previous_summary, start = self._summaries[digests[boundary]], boundary
+                self.summary_cache_hits += 1
+                break
+
+        self.summary_calls += 1
+        summary = await summarize(previous_summary, rolled[start:])
+        self._remember(full_digest, summary)
+        return summary
+
+    async def prepare(self, history: Optional[List[Dict]], message: str, model_id: str,
+                      summarize: Summarizer) -> TrimResult:
+        """
+        Fit history into the model's budget, keeping the most recent whole turns
+        and rolling older ones into a summary
+        """
+        history = history or []
+        original_tokens = estimate_messages_tokens(history)
+        available = self.budget_for(model_id) - estimate_tokens(message)
+        if original_tokens <= available:
+            return TrimResult(messages=list(history), original_tokens=original_tokens, kept_tokens=original_tokens)
+
+        # Slide the window back over whole turns while they fit
+        available -= self.SUMMARY_RESERVE_TOKENS
+        kept_start, used = len(history), 0
+        for start in reversed(self._turn_starts(history)):
+            turn_tokens = estimate_messages_tokens(history[start:kept_start])
+            if used + turn_tokens > available:
+                break
+            kept_start, used = start, used + turn_tokens
+
+        kept, rolled = list(history[kept_start:]), list(history[:kept_start])
+        summary = None
+        try:
+            summary = await self._summarize_rolled(rolled, summarize)
+        except Exception as e:
+            # Fall back to a plain sliding window
+            self.summary_failures += 1
+            logger.warning(f"History summarization failed, dropping {len(rolled)} messages: {e}")
+
+        result = TrimResult(
+            messages=kept,
+            summary=summary,
+            original_tokens=original_tokens,
+            kept_tokens=used + estimate_tokens(summary or ""),
+            summarized_messages=len(rolled) if summary else 0,
+            dropped_messages=rolled,
+        )
+
+        self.trims += 1
+        self.last_tokens_saved = result.tokens_saved
+        self.tokens_saved_total += result.tokens_saved
+        logger.info(
+            f"Trimmed chat history for {model_id}: {original_tokens} -> {result.kept_tokens} tokens "
+            f"(saved {result.tokens_saved}, rolled {len(rolled)} messages)"
+        )
+        return result
+
+    def get_stats(self) -> Dict:
+        """Get trim and summary counters"""
+        return {
+            "default_budget": self.default_budget,
+            "model_budgets": self.model_budgets,
+            "trims": self.trims,
+            "tokens_saved_total": self.tokens_saved_total,
+            "last_tokens_saved": self.last_tokens_saved,
+            "summary_calls": self.summary_calls,
+            "summary_cache_hits": self.summary_cache_hits,
+            "summary_failures": self.summary_failures,
+            "cached_summaries": len(self._summaries),
+        }
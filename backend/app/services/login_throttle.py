@@ -0,0 +1,223 @@
+"""
+Login Throttle
+Sliding-window attempt limits per username and per client IP, checked before
+a login reaches bcrypt, with in-process or Postgres-shared counters
+"""
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from tortoise import connections
+
+from app.core.config import settings
+from app.services.metrics import MetricsRegistry, metrics_registry
+
+logger = logging.getLogger(__name__)
+
+# (attempts in the previous window, attempts in the current window)
+WindowCounts = Tuple[int, int]
+
+
+class LoginThrottledError(Exception):
+    """Raised when a login attempt is over the username or IP limit"""
+
+    def __init__(self, scope: str, retry_after: int):
+        self.scope = scope
+        self.retry_after = retry_after
+        super().__init__(f"Too many login attempts for this {scope}, try again in {retry_after}s")
+
+
+class ThrottleBackend:
+    """Storage interface for per-key attempt counts in fixed windows"""
+
+    name = "base"
+
+    async def hit(self, keys: Sequence[str], window_start: int, window_seconds: int) -> Dict[str, WindowCounts]:
+        """Count one attempt for each key and return its previous and current window counts"""
+        raise NotImplementedError
+
+    async def reset(self, key: str):
+        raise NotImplementedError
+
+    def size(self) -> Optional[int]:
+        return None
+
+
+class MemoryThrottleBackend(ThrottleBackend):
+    """Per-process counters, bounded to max_keys by dropping the least recently hit"""
+
+    name = "memory"
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        # key -> [window_start, current, previous]
+        self._windows: "OrderedDict[str, List[int]]" = OrderedDict()
+        self.evictions = 0
+
+    async def hit(self, keys: Sequence[str], window_start: int, window_seconds: int) -> Dict[str, WindowCounts]:
+        counts = {}
+        for key in keys:
+            window = self._windows.get(key)
+            if window is None or window[0] < window_start - window_seconds:
+                window = self._windows[key] = [window_start, 0, 0]
+            elif window[0] < window_start:
+                # The current window just ended; it becomes the previous one
+                window[:] = [window_start, 0, window[1]]
+            window[1] += 1
+            self._windows.move_to_end(key)
+            counts[key] = (window[2], window[1])
+        while len(self._windows) > self.max_keys:
+            self._windows.popitem(last=False)
+            self.evictions += 1
+        return counts
+
+    async def reset(self, key: str):
+        self._windows.pop(key, None)
+
+    def size(self) -> Optional[int]:
+        return len(self._windows)
+
+
+class PostgresThrottleBackend(ThrottleBackend):
+    """login_attempts table shared by all uvicorn workers; one round-trip per attempt"""
+
+    name = "postgres"
+
+    # Delete finished windows every N hits rather than on each one
+    PURGE_EVERY = 200
+
+    HIT_SQL = """
+        WITH hit AS (
+            INSERT INTO login_attempts (key, window_start, attempts)
+            SELECT key, $2, 1 FROM unnest($1::text[]) AS key
+            ON CONFLICT (key, window_start) DO UPDATE SET attempts = login_attempts.attempts + 1
+            RETURNING key, attempts
+        )
+        SELECT hit.key, hit.attempts, COALESCE(previous.attempts, 0)
+        FROM hit
+        LEFT JOIN login_attempts previous ON previous.key = hit.key AND previous.window_start = $3
+    """
+
+    def __init__(self):
+        self._hits = 0
+
+    async def hit(self, keys: Sequence[str], window_start: int, window_seconds: int) -> Dict[str, WindowCounts]:
+        conn = connections.get("default")
+        _, rows = await conn.execute_query(self.HIT_SQL, [list(keys), window_start, window_start - window_seconds])
+        self._hits += 1
+        if self._hits % self.PURGE_EVERY == 0:
+            await conn.execute_query(
+                "DELETE FROM login_attempts WHERE window_start < $1", [window_start - window_seconds]
+            )
+        return {row[0]: (row[2], row[1]) for row in rows}
+
+    async def reset(self, key: str):
+        await connections.get("default").execute_query("DELETE FROM login_attempts WHERE key = $1", [key])
+
+
+def create_throttle_backend(name: str, max_keys: int) -> ThrottleBackend:
+    """Build the throttle backend named by LOGIN_THROTTLE_BACKEND"""
+    if name == "postgres":
+        return PostgresThrottleBackend()
+    if name != "memory":
+        logger.warning(f"Unknown login throttle backend '{name}', using memory")
+    return MemoryThrottleBackend(max_keys=max_keys)
+
+
+class LoginThrottle:
+    def __init__(self, backend: ThrottleBackend, registry: MetricsRegistry, enabled: bool = True,
+                 window_seconds: int = 300, max_per_username: int = 10, max_per_ip: int = 50):
+        """
+        Attempts are counted when they arrive, blocked ones included, so a client
+        that keeps hammering stays blocked until it slows down
+        """
+        self.backend = backend
+        self.enabled = enabled
+        self.window_seconds = window_seconds
+        self.limits = {"username": max_per_username, "ip": max_per_ip}
+
+        self.attempts = registry.counter(
+            "auth_login_attempts_total", "Login attempts by outcome (success, failure, blocked)", ("outcome",))
+        self.blocked = registry.counter(
+            "auth_login_blocked_total", "Login attempts rejected by the throttle before hashing", ("scope",))
+        self.backend_errors = 0
+
+    @staticmethod
+    def client_ip(host: Optional[str], forwarded_for: Optional[str] = None) -> str:
+        """Client address; the first X-Forwarded-For hop only when LOGIN_THROTTLE_TRUST_FORWARDED is on"""
+        if forwarded_for and settings.LOGIN_THROTTLE_TRUST_FORWARDED:
+            return forwarded_for.split(",")[0].strip()
+        return host or "unknown"
+
+    def _retry_after(self, limit: int, counts: WindowCounts, elapsed: float) -> int:
+        """Seconds until the sliding estimate drops below the limit (a lower bound while attempts continue)"""
+        previous, current = counts
+        if current >= limit or not previous:
+            wait = self.window_seconds - elapsed
+        else:
+            wait = self.window_seconds * (1 - (limit - current) / previous) - elapsed
+        return max(1, math.ceil(wait))
+
+    async def check(self, username: str, ip: str):
+        """Count this attempt and raise LoginThrottledError if either key is over its limit"""
+        if not self.enabled:
+            return
+        now = time.time()
+        window_start = int(now // self.window_seconds) * self.window_seconds
+        elapsed = now - window_start
+        keys = {"username": f"user:{username.strip().lower()}", "ip": f"ip:{ip}"}
+        try:
+            counts = await self.backend.hit(list(keys.values()), window_start, self.window_seconds)
+        except Exception as e:
+            # Fail open: a throttle outage must not lock everyone out
+            self.backend_errors += 1
+            logger.error(f"Login throttle backend failed: {e}")
+            return
+
+        weight = 1 - elapsed / self.window_seconds
+        for scope, key in keys.items():
+            previous, current = counts.get(key, (0, 0))
+            if previous * weight + current > self.limits[scope]:
+                self.attempts.inc("blocked")
+                self.blocked.inc(scope)
+                raise LoginThrottledError(scope, self._retry_after(self.limits[scope], (previous, current), elapsed))
+
+    async def record(self, username: str, success: bool):
+        """Count the outcome; a successful login clears the username's window"""
+        self.attempts.inc("success" if success else "failure")
+        if success and self.enabled:
+            try:
+                await self.backend.reset(f"user:{username.strip().lower()}")
+            except Exception as e:
+                self.backend_errors += 1
+                logger.error(f"Login throttle backend failed: {e}")
+
+    def get_stats(self) -> Dict[str, object]:
+        """Get login outcomes and blocked attempts for this worker"""
+        return {
+            "enabled": self.enabled,
+            "backend": self.backend.name,
+            "window_seconds": self.window_seconds,
+            "max_per_username": self.limits["username"],
+            "max_per_ip": self.limits["ip"],
+            "tracked_keys": self.backend.size(),
+            "successes": int(self.attempts.value("success")),
+            "failures": int(self.attempts.value("failure")),
+            "blocked": int(self.attempts.value("blocked")),
+            "blocked_by_username": int(self.blocked.value("username")),
+            "blocked_by_ip": int(self.blocked.value("ip")),
+            "backend_errors": self.backend_errors,
+        }
+
+
+# Global instance
+login_throttle = LoginThrottle(
+    create_throttle_backend(settings.LOGIN_THROTTLE_BACKEND, settings.LOGIN_THROTTLE_MAX_KEYS),
+    metrics_registry,
+    enabled=settings.LOGIN_THROTTLE_ENABLED,
+    window_seconds=settings.LOGIN_THROTTLE_WINDOW_SECONDS,
+    max_per_username=settings.LOGIN_THROTTLE_MAX_PER_USERNAME,
+    max_per_ip=settings.LOGIN_THROTTLE_MAX_PER_IP,
+)
@@ -0,0 +1,244 @@
+"""
+Model Router
+Chooses a Bedrock model per call from routing rules, rolling health and circuit breakers
+"""
+import logging
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger(__name__)
+
+# Error codes that mean "this model is overloaded or broken right now"
+FAILOVER_ERROR_CODES = {
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceUnavailableException",
+    "ModelNotReadyException",
+    "ModelTimeoutException",
+    "InternalServerException",
+}
+
+
+def is_failover_error(error: Exception) -> bool:
+    """True for throttling and 5xx errors, which should trip breakers and fail over"""
+    if isinstance(error, ClientError):
+        code = error.response.get("Error", {}).get("Code", "")
+        status = error.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0)
+        return code in FAILOVER_ERROR_CODES or status >= 500
+    # Connection resets and read timeouts from botocore
+    return error.__class__.__module__.startswith(("botocore", "urllib3"))
+
+
+class CircuitBreaker:
+    """Closed -> open after repeated failures -> half-open probe after a cooldown"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, cooldown_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self._probe_in_flight = False
+        self._probe_started_at = 0.0
+
+    def available(self) -> bool:
+        """Whether allow_request would grant a call now, without changing state or claiming a probe"""
+        if self.state == self.CLOSED:
+            return True
+        now = time.monotonic()
+        if self.state == self.OPEN:
+            return now - self.opened_at >= self.cooldown_seconds
+        return not self._probe_in_flight or now - self._probe_started_at >= self.cooldown_seconds
+
+    def allow_request(self) -> bool:
+        """Grant a call, moving an expired open breaker to half-open and claiming its probe"""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.cooldown_seconds:
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+        if self.state == self.HALF_OPEN:
+            # Grant one probe; re-grant if the previous probe was never reported
+            now = time.monotonic()
+            if not self._probe_in_flight or now - self._probe_started_at >= self.cooldown_seconds:
+                self._probe_in_flight = True
+                self._probe_started_at = now
+                return True
+        return False
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.trip()
+
+    def trip(self):
+        if self.state != self.OPEN:
+            self.trips += 1
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self._probe_in_flight = False
+
+
+class ModelHealth:
+    """Rolling latency and error-rate window for one model"""
+
+    def __init__(self, window: int = 100, failure_threshold: int = 5, cooldown_seconds: float = 30.0):
+        self.samples: deque = deque(maxlen=window)
+        self.breaker = CircuitBreaker(failure_threshold, cooldown_seconds)
+        self.calls = 0
+        self.failures = 0
+
+    def record(self, latency: float, ok: bool):
+        self.samples.append((latency, ok))
+        self.calls += 1
+        if not ok:
+            self.failures += 1
+
+    @property
+    def error_rate(self) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(1 for _, ok in self.samples if not ok) / len(self.samples)
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        latencies = sorted(latency for latency, ok in self.samples if ok)
+        if not latencies:
+            return None
+        index = min(len(latencies) - 1, int(round(percentile / 100 * (len(latencies) - 1))))
+        return latencies[index]
+
+
+class ModelRouter:
+    # Minimum samples before the window error rate can trip a breaker
+    MIN_SAMPLES = 10
+    # Error rate in the window that trips a breaker
+    ERROR_RATE_THRESHOLD = 0.5
+    # A healthy model is preferred over another when its p95 is this much lower
+    LATENCY_ADVANTAGE = 1.5
+
+    def __init__(
+        self,
+        primary_model: str,
+        fallback_model: Optional[str] = None,
+        fast_model: Optional[str] = None,
+        short_input_chars: int = 500,
+        rules: Optional[Dict[str, str]] = None,
+        latency_aware: bool = True,
+        window: int = 100,
+        failure_threshold: int = 5,
+        cooldown_seconds: float = 30.0,
+    ):
+        """Initialize routing rules and per-model health tracking"""
+        self.primary_model = primary_model
+        self.fallback_model = fallback_model or primary_model
+        self.fast_model = fast_model or None
+        self.short_input_chars = short_input_chars
+        self.rules = rules or {}
+        self.latency_aware = latency_aware
+        self._window = window
+        self._failure_threshold = failure_threshold
+        self._cooldown_seconds = cooldown_seconds
+        self._health: Dict[str, ModelHealth] = {}
+        self.failovers = 0
+
+    def health(self, model_id: str) -> ModelHealth:
+        if model_id not in self._health:
+            self._health[model_id] = ModelHealth(self._window, self._failure_threshold, self._cooldown_seconds)
+        return self._health[model_id]
+
+    def preferred_model(self, operation: str, analysis_type: Optional[str] = None, input_chars: int = 0) -> str:
+        """Model chosen by the routing rules, before health is considered"""
+        if analysis_type and analysis_type in self.rules:
+            return self.rules[analysis_type]
+        if operation in self.rules:
+            return self.rules[operation]
+        if operation == "chat" and self.fast_model and input_chars < self.short_input_chars:
+            return self.fast_model
+        return self.primary_model
+
+    def candidates(self, operation: str, analysis_type: Optional[str] = None, input_chars: int = 0) -> List[str]:
+        """
+        Ordered models to try for a call; models with open breakers go last.
+        Breakers are only inspected here: a half-open probe is claimed by
+        begin_attempt when a model is actually called, not for fallbacks that
+        may never be reached.
+        """
+        ordered: List[str] = []
+        for model_id in (self.preferred_model(operation, analysis_type, input_chars),
+                         self.primary_model, self.fallback_model):
+            if model_id not in ordered:
+                ordered.append(model_id)
+
+        available = [m for m in ordered if self.health(m).breaker.available()]
+        unavailable = [m for m in ordered if m not in available]
+
+        if self.latency_aware and len(available) >= 2:
+            first, second = self.health(available[0]), self.health(available[1])
+            first_p95, second_p95 = first.latency_percentile(95), second.latency_percentile(95)
+            if first_p95 and second_p95 and first_p95 > second_p95 * self.LATENCY_ADVANTAGE:
+                available[0], available[1] = available[1], available[0]
+
+        # With every breaker open, still try in order rather than fail outright
+        return available + unavailable
+
+    def begin_attempt(self, model_id: str):
+        """Mark a call to this model as starting; takes the probe slot of a half-open breaker"""
+        self.health(model_id).breaker.allow_request()
+
+    def record_success(self, model_id: str, latency: float):
+        health = self.health(model_id)
+        health.record(latency, ok=True)
+        health.breaker.record_success()
+
+    def record_failure(self, model_id: str, latency: float, error: Exception):
+        """Record a failed call; only throttling/5xx errors count toward the breaker"""
+        health = self.health(model_id)
+        health.record(latency, ok=False)
+        if not is_failover_error(error):
+            return
+        health.breaker.record_failure()
+        if len(health.samples) >= self.MIN_SAMPLES and health.error_rate >= self.ERROR_RATE_THRESHOLD:
+            health.breaker.trip()
+        if health.breaker.state == CircuitBreaker.OPEN:
+            logger.warning(f"Circuit breaker open for {model_id}: {error}")
+
+    def record_failover(self, from_model: str, to_model: str):
+        self.failovers += 1
+        logger.info(f"Failing over from {from_model} to {to_model}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get routing configuration and rolling health per model"""
+        models = {}
+        for model_id, health in self._health.items():
+            p50, p95, p99 = (health.latency_percentile(p) for p in (50, 95, 99))
+            models[model_id] = {
+                "breaker": health.breaker.state,
+                "breaker_trips": health.breaker.trips,
+                "calls": health.calls,
+                "failures": health.failures,
+                "window_error_rate": round(health.error_rate, 4),
+                "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+                "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+                "p99_ms": round(p99 * 1000, 1) if p99 is not None else None,
+            }
+        return {
+            "primary_model": self.primary_model,
+            "fallback_model": self.fallback_model,
+            "fast_model": self.fast_model,
+            "rules": self.rules,
+            "failovers": self.failovers,
+            "models": models,
+        }
@@ -0,0 +1,90 @@
+"""
+Page Selection
+Page ranges and sampling strategies for analyzing part of a long PDF
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from app.services.document_chunker import PAGE_BREAK
+
+_RANGE = re.compile(r"^\s*(\d+)\s*(?:-\s*(\d+)\s*)?$")
+
+# Leading pages taken by "toc" (where a table of contents usually is) unless given as toc:N
+DEFAULT_TOC_PAGES = 3
+
+
+class PageSelectionError(ValueError):
+    """Raised for malformed page ranges or sampling strategies"""
+
+
+@dataclass
+class PageSelection:
+    """
+    Either explicit 1-based page ranges ("1-5,9,20-22") or a sampling strategy:
+    first:N, every:K, or toc[:N] (the first N pages plus every outline section start)
+    """
+
+    ranges: List[Tuple[int, int]] = field(default_factory=list)
+    strategy: Optional[str] = None
+    value: int = 0
+
+    @classmethod
+    def parse(cls, pages: Optional[str] = None, sample: Optional[str] = None) -> Optional["PageSelection"]:
+        """Build a selection from request parameters; None when neither is given"""
+        pages = (pages or "").strip()
+        sample = (sample or "").strip().lower()
+        if not pages and not sample:
+            return None
+        if pages and sample:
+            raise PageSelectionError("Use either pages or sample, not both")
+
+        if pages:
+            ranges = []
+            for part in pages.split(","):
+                match = _RANGE.match(part)
+                if not match:
+                    raise PageSelectionError(f"Invalid page range '{part.strip()}'")
+                start = int(match.group(1))
+                end = int(match.group(2) or start)
+                if start < 1 or end < start:
+                    raise PageSelectionError(f"Invalid page range '{part.strip()}'")
+                ranges.append((start, end))
+            return cls(ranges=ranges)
+
+        strategy, _, value = sample.partition(":")
+        if strategy not in ("first", "every", "toc"):
+            raise PageSelectionError(f"Unknown sampling strategy '{strategy}' (use first:N, every:K or toc)")
+        if not value:
+            if strategy != "toc":
+                raise PageSelectionError(f"Sampling strategy '{strategy}' needs a number, e.g. {strategy}:10")
+            value = str(DEFAULT_TOC_PAGES)
+        if not value.isdigit() or int(value) < 1:
+            raise PageSelectionError(f"Invalid sampling value '{value}'")
+        return cls(strategy=strategy, value=int(value))
+
+    @property
+    def needs_outline(self) -> bool:
+        return self.strategy == "toc"
+
+    def resolve(self, page_count: int, outline_pages: Sequence[int] = ()) -> List[int]:
+        """Sorted 0-based page indexes to extract for a document with page_count pages"""
+        if self.ranges:
+            selected = {
+                page - 1
+                for start, end in self.ranges
+                for page in range(start, min(end, page_count) + 1)
+            }
+        elif self.strategy == "first":
+            selected = set(range(min(self.value, page_count)))
+        elif self.strategy == "every":
+            selected = set(range(0, page_count, self.value))
+        else:
+            selected = set(range(min(self.value, page_count)))
+            selected.update(page for page in outline_pages if 0 <= page < page_count)
+        return sorted(selected)
+
+
+def render_pages(pages: Iterable[Tuple[int, str]]) -> str:
+    """Join selected pages, labelled with their page numbers since they may not be contiguous"""
+    return PAGE_BREAK.join(f"[Page {index + 1}]\n{text}" for index, text in pages)
@@ -0,0 +1,116 @@
+"""
+Password Hasher
+Runs bcrypt off the event loop on a small dedicated thread pool (bcrypt
+releases the GIL), with a queue limit so a login burst is refused instead of
+piling up
+"""
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from passlib.context import CryptContext
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHasherBusyError(Exception):
+    """Raised when the password hashing queue is full"""
+
+
+def make_crypt_context(rounds: int) -> CryptContext:
+    """bcrypt at exactly this cost; hashes with any other cost are flagged for rehash"""
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+
+class PasswordHasher:
+    def __init__(self, rounds: int = 12, max_workers: int = 2, max_queue: int = 64):
+        """Initialize the bcrypt context; threads start on first use"""
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.context = make_crypt_context(rounds)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._pending = 0
+
+        # Metrics
+        self.hashes = 0
+        self.verifications = 0
+        self.rehashes = 0
+        self.rejected = 0
+        self.busy_seconds = 0.0
+
+    async def _run(self, fn: Callable, *args) -> Any:
+        # Running plus queued operations; past the limit the caller gets an error right away
+        if self._pending >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise PasswordHasherBusyError("Too many password operations in progress, try again shortly")
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, self._timed, fn, *args)
+        finally:
+            self._pending -= 1
+
+    def _timed(self, fn: Callable, *args) -> Any:
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self.busy_seconds += time.perf_counter() - started
+
+    async def hash(self, password: str) -> str:
+        """bcrypt hash at the configured cost"""
+        hashed = await self._run(self.context.hash, password)
+        self.hashes += 1
+        return hashed
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        verified = await self._run(self.context.verify, password, hashed_password)
+        self.verifications += 1
+        return verified
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password; when it matches but was hashed at another cost, also
+        return a new hash at the configured cost for the caller to store
+        """
+        verified, new_hash = await self._run(self.context.verify_and_update, password, hashed_password)
+        self.verifications += 1
+        if new_hash:
+            self.rehashes += 1
+        return verified, new_hash
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get password hashing throughput and queue metrics"""
+        operations = self.hashes + self.verifications
+        return {
+            "rounds": self.rounds,
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "pending": self._pending,
+            "hashes": self.hashes,
+            "verifications": self.verifications,
+            "rehashes": self.rehashes,
+            "rejected": self.rejected,
+            "avg_ms": round(self.busy_seconds / operations * 1000, 1) if operations else 0.0,
+        }
+
+
+# Global instance
+password_hasher = PasswordHasher(
+    rounds=settings.BCRYPT_ROUNDS,
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
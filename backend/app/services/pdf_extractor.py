@@ -0,0 +1,182 @@
+"""
+PDF Extraction Pool
+Extracts PDF text off the event loop, splitting page ranges across a process pool
+"""
+import asyncio
+import logging
+import math
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import PyPDF2
+
+from app.core.config import settings
+from app.services.document_chunker import PAGE_BREAK
+from app.services.page_selection import PageSelection, render_pages
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentLimitError(ValueError):
+    """Raised when a document is over the page limit or takes too long to extract"""
+
+
+def _outline_pages(reader: PyPDF2.PdfReader, outline: list, depth: int = 0, max_depth: int = 2) -> List[int]:
+    """0-based start pages of outline (bookmark) sections, down to max_depth levels"""
+    pages = []
+    for item in outline:
+        if isinstance(item, list):
+            if depth + 1 < max_depth:
+                pages.extend(_outline_pages(reader, item, depth + 1, max_depth))
+            continue
+        try:
+            pages.append(reader.get_destination_page_number(item))
+        except Exception:
+            pass
+    return pages
+
+
+def _pdf_layout(path: str, with_outline: bool = False) -> Tuple[int, List[int]]:
+    """Worker: page count, plus outline section start pages when asked for"""
+    reader = PyPDF2.PdfReader(path)
+    outline = []
+    if with_outline:
+        try:
+            outline = _outline_pages(reader, reader.outline)
+        except Exception as e:
+            logger.warning(f"Could not read PDF outline: {e}")
+    return len(reader.pages), outline
+
+
+def iter_pages(path: str, indexes: Sequence[int]) -> Iterator[Tuple[int, str]]:
+    """Lazily yield (index, text) for the given 0-based pages; other pages are never parsed"""
+    pages = PyPDF2.PdfReader(path).pages
+    for index in indexes:
+        yield index, (pages[index].extract_text() or "") + "\n"
+
+
+def _extract_pages(path: str, indexes: Sequence[int]) -> List[str]:
+    """Worker: extract the given pages of the PDF at path"""
+    return [text for _, text in iter_pages(path, indexes)]
+
+
+def split_pages(indexes: Sequence[int], workers: int, min_pages_per_task: int) -> List[Sequence[int]]:
+    """Split pages into consecutive batches, about two per worker so stragglers even out"""
+    tasks = max(1, min(workers * 2, math.ceil(len(indexes) / max(1, min_pages_per_task))))
+    size = max(1, math.ceil(len(indexes) / tasks))
+    return [indexes[start:start + size] for start in range(0, len(indexes), size)]
+
+
+class PdfExtractionPool:
+    def __init__(self, max_workers: int = 2, timeout: float = 120.0, max_pages: int = 2000,
+                 min_pages_per_task: int = 16):
+        """Initialize limits; worker processes start on first use"""
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.max_pages = max_pages
+        self.min_pages_per_task = min_pages_per_task
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+        # Metrics
+        self.documents = 0
+        self.pages = 0
+        self.busy_seconds = 0.0
+        self.rejected = 0
+        self.timeouts = 0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # forkserver: the server process is single-threaded, so children never
+            # inherit locks held by the Bedrock or asyncio threads of this worker
+            context = multiprocessing.get_context("forkserver")
+            context.set_forkserver_preload([__name__])
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+        return self._pool
+
+    def _reset_pool(self):
+        """Drop a pool whose worker died so the next call starts fresh processes"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def _extract(self, path: str, selection: Optional[PageSelection]) -> str:
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+
+        with_outline = selection is not None and selection.needs_outline
+        page_count, outline = await loop.run_in_executor(pool, _pdf_layout, path, with_outline)
+        indexes = selection.resolve(page_count, outline) if selection else range(page_count)
+        # The limit applies to pages actually extracted, so a sample of a huge PDF is fine
+        if len(indexes) > self.max_pages:
+            self.rejected += 1
+            raise DocumentLimitError(f"PDF selection has {len(indexes)} pages; the limit is {self.max_pages}")
+
+        futures = [
+            loop.run_in_executor(pool, _extract_pages, path, batch)
+            for batch in split_pages(indexes, self.max_workers, self.min_pages_per_task)
+        ]
+        try:
+            parts = await asyncio.gather(*futures)
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+        self.pages += len(indexes)
+        texts = (text for part in parts for text in part)
+        if selection is not None:
+            return render_pages(zip(indexes, texts))
+        # Join every page once, with the form feed the chunker splits on
+        return PAGE_BREAK.join(texts)
+
+    async def extract(self, path: str, selection: Optional[PageSelection] = None) -> str:
+        """
+        Extract text from the PDF at path within the timeout and page limit
+
+        With a selection only the selected pages are parsed, each labelled with
+        its page number. Batches still queued when the timeout hits are
+        cancelled; batches already running finish in the background and their
+        results are dropped.
+        """
+        started = time.perf_counter()
+        try:
+            return await asyncio.wait_for(self._extract(path, selection), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise DocumentLimitError(f"PDF text extraction took longer than {self.timeout:.0f}s")
+        except BrokenProcessPool:
+            logger.error("PDF extraction worker died; restarting the pool")
+            self._reset_pool()
+            raise
+        finally:
+            self.documents += 1
+            self.busy_seconds += time.perf_counter() - started
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get extraction throughput counters"""
+        return {
+            "workers": self.max_workers,
+            "documents": self.documents,
+            "pages": self.pages,
+            "pages_per_second": round(self.pages / self.busy_seconds, 1) if self.busy_seconds else 0.0,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+        }
+
+
+# Global instance
+pdf_extraction_pool = PdfExtractionPool(
+    max_workers=settings.PDF_EXTRACT_WORKERS,
+    timeout=settings.PDF_EXTRACT_TIMEOUT_SECONDS,
+    max_pages=settings.PDF_MAX_PAGES,
+    min_pages_per_task=settings.PDF_MIN_PAGES_PER_TASK,
+)
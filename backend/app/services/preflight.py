@@ -0,0 +1,120 @@
+"""
+Request Preflight
+Sizes Bedrock requests before they are sent: rejects oversized ones, predicts
+how many calls a long document takes and picks maxTokens per call
+"""
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.services.token_estimator import (
+    CHARS_PER_TOKEN, MESSAGE_OVERHEAD_TOKENS, estimate_messages_tokens, estimate_tokens
+)
+
+# Instructions wrapped around each analysis prompt
+PROMPT_OVERHEAD_TOKENS = 50
+
+# Expected reply length relative to the input of one call, by analysis type
+OUTPUT_RATIOS = {
+    "summary": 0.3,
+    "key_points": 0.3,
+    "questions": 0.3,
+    "analysis": 0.6,
+    "ask": 0.5,
+}
+
+MIN_OUTPUT_TOKENS = 512
+
+
+class RequestTooLargeError(ValueError):
+    """Raised when a request is estimated to exceed the context window or the document token limit"""
+
+
+@dataclass
+class RequestEstimate:
+    """Estimated Bedrock cost of one API request; input_tokens is summed over all calls"""
+
+    input_tokens: int
+    max_output_tokens: int  # maxTokens of each call
+    calls: int = 1
+    chunked: bool = False
+
+    def headers(self) -> Dict[str, str]:
+        """Response headers so clients can warn before spending"""
+        return {
+            "X-Estimated-Input-Tokens": str(self.input_tokens),
+            "X-Estimated-Max-Output-Tokens": str(self.max_output_tokens * self.calls),
+            "X-Estimated-Bedrock-Calls": str(self.calls),
+        }
+
+
+ESTIMATE_HEADERS = list(RequestEstimate(0, 0).headers())
+
+
+def choose_max_tokens(input_tokens: int, ratio: Optional[float] = None) -> int:
+    """
+    maxTokens for one call, proportional to its input when a ratio is given and
+    always within the context window; Bedrock reserves maxTokens against the
+    tokens-per-minute quota up front, so oversized values throttle other callers
+    """
+    room = settings.BEDROCK_CONTEXT_TOKENS - input_tokens
+    if room < MIN_OUTPUT_TOKENS:
+        raise RequestTooLargeError(
+            f"Request is about {input_tokens:,} tokens; the model accepts "
+            f"{settings.BEDROCK_CONTEXT_TOKENS - MIN_OUTPUT_TOKENS:,}"
+        )
+    limit = settings.BEDROCK_MAX_OUTPUT_TOKENS
+    if ratio is not None:
+        limit = min(limit, max(MIN_OUTPUT_TOKENS, math.ceil(input_tokens * ratio)))
+    return min(limit, room)
+
+
+def estimate_analysis(text: str, analysis_type: str = "summary") -> RequestEstimate:
+    """
+    Estimate a document analysis; documents longer than DOC_CHUNK_SIZE go
+    through map-reduce, so calls counts the map calls plus every reduce round
+    """
+    tokens = estimate_tokens(text)
+    if tokens > settings.DOC_MAX_INPUT_TOKENS:
+        raise RequestTooLargeError(
+            f"Document is about {tokens:,} tokens; the limit is {settings.DOC_MAX_INPUT_TOKENS:,}. "
+            f"Analyze selected pages or ask a question about it instead"
+        )
+    ratio = OUTPUT_RATIOS.get(analysis_type, OUTPUT_RATIOS["summary"])
+    if len(text) <= settings.DOC_CHUNK_SIZE:
+        input_tokens = tokens + PROMPT_OVERHEAD_TOKENS
+        return RequestEstimate(input_tokens, choose_max_tokens(input_tokens, ratio))
+
+    # Chunks are sized in characters; scale by this document's characters per token
+    chunk_tokens = math.ceil(tokens * settings.DOC_CHUNK_SIZE / len(text)) + PROMPT_OVERHEAD_TOKENS
+    max_tokens = choose_max_tokens(chunk_tokens, ratio)
+    step = max(1, settings.DOC_CHUNK_SIZE - settings.DOC_CHUNK_OVERLAP)
+    maps = math.ceil(len(text) / step)
+    input_tokens = maps * chunk_tokens
+
+    # Partials are packed into reduce prompts of about DOC_CHUNK_SIZE characters, at least two each
+    per_reduce = max(2, settings.DOC_CHUNK_SIZE // (max_tokens * CHARS_PER_TOKEN))
+    partials, reduces = maps, 0
+    while True:
+        batches = math.ceil(partials / per_reduce)
+        reduces += batches
+        input_tokens += partials * max_tokens + batches * PROMPT_OVERHEAD_TOKENS
+        if batches == 1:
+            break
+        partials = batches
+    return RequestEstimate(input_tokens, max_tokens, calls=maps + reduces, chunked=True)
+
+
+def estimate_chat(message: str, conversation_history: Optional[List[Dict]], history_budget: int) -> RequestEstimate:
+    """Estimate a chat turn; history beyond the budget is trimmed or summarized before sending"""
+    history_tokens = min(estimate_messages_tokens(conversation_history or []), history_budget)
+    input_tokens = estimate_tokens(message) + MESSAGE_OVERHEAD_TOKENS + history_tokens
+    return RequestEstimate(input_tokens, choose_max_tokens(input_tokens))
+
+
+def estimate_question(question: str, excerpts: List[str]) -> RequestEstimate:
+    """Estimate a question answered from retrieved excerpts"""
+    input_tokens = (estimate_tokens(question) + sum(estimate_tokens(e) for e in excerpts)
+                    + PROMPT_OVERHEAD_TOKENS)
+    return RequestEstimate(input_tokens, choose_max_tokens(input_tokens, OUTPUT_RATIOS["ask"]))
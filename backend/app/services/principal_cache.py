@@ -0,0 +1,170 @@
+"""
+Principal Cache
+The authenticated-user object handed to endpoints, and a bounded TTL cache of
+them so protected requests skip the users table while the entry is fresh
+"""
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from app.core.config import settings
+
+
+class Principal(Mapping):
+    """
+    Authenticated user, built from verified token claims or a users row
+
+    A read-only mapping, so endpoints keep using current_user["id"],
+    current_user.get(...) and UserResponse(**current_user).
+    """
+
+    __slots__ = ("id", "username", "name", "email", "is_active", "email_verified", "created_at", "token_version")
+
+    def __init__(self, id: int, username: str, name: str, email: str, is_active: bool = True,
+                 email_verified: bool = False, created_at: Optional[datetime] = None, token_version: int = 0):
+        self.id = id
+        self.username = username
+        self.name = name
+        self.email = email
+        self.is_active = is_active
+        self.email_verified = email_verified
+        self.created_at = created_at
+        self.token_version = token_version
+
+    @classmethod
+    def from_user(cls, user: Mapping) -> "Principal":
+        """From a User.to_dict() result; the password hash is never copied"""
+        return cls(
+            id=user["id"],
+            username=user["username"],
+            name=user["name"],
+            email=user["email"],
+            is_active=user.get("is_active", True),
+            email_verified=user.get("email_verified", False),
+            created_at=user.get("created_at"),
+            token_version=user.get("token_version", 0),
+        )
+
+    @classmethod
+    def from_claims(cls, claims: Mapping) -> "Principal":
+        """From verified JWT claims; only active users are issued tokens"""
+        return cls(
+            id=claims["uid"],
+            username=claims["sub"],
+            name=claims.get("nm", ""),
+            email=claims.get("em", ""),
+            is_active=True,
+            email_verified=bool(claims.get("ev")),
+            created_at=datetime.fromtimestamp(claims.get("ca", 0), tz=timezone.utc),
+            token_version=claims.get("ver", 0),
+        )
+
+    def claims(self) -> Dict[str, Any]:
+        """Compact claim set embedded in stateless tokens (sub is added by the token itself)"""
+        created_at = self.created_at
+        if created_at is not None and created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        return {
+            "uid": self.id,
+            "nm": self.name,
+            "em": self.email,
+            "ev": int(bool(self.email_verified)),
+            "ca": int(created_at.timestamp()) if created_at else 0,
+            "ver": self.token_version,
+        }
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.__slots__:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__slots__)
+
+    def __len__(self) -> int:
+        return len(self.__slots__)
+
+    def __repr__(self) -> str:
+        return f"Principal(id={self.id}, username='{self.username}')"
+
+
+class PrincipalCache:
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 30.0):
+        """
+        Entries live at most ttl_seconds; explicit invalidation only reaches this
+        worker, so the TTL bounds how long other workers can serve a stale user.
+        max_entries=0 disables caching.
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Principal]]" = OrderedDict()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def get(self, username: str) -> Optional[Principal]:
+        """The cached user, or None on a miss or expiry"""
+        entry = self._entries.get(username)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, user = entry
+        if expires_at <= time.monotonic():
+            del self._entries[username]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(username)
+        self.hits += 1
+        return user
+
+    def set(self, username: str, user: Principal):
+        if not self.enabled:
+            return
+        self._entries[username] = (time.monotonic() + self.ttl_seconds, user)
+        self._entries.move_to_end(username)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, username: str):
+        """Drop a user after it is updated or deactivated"""
+        if self._entries.pop(username, None) is not None:
+            self.invalidations += 1
+
+    def clear(self):
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, float]:
+        """Get principal cache hit ratio and size"""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "expirations": self.expirations,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+# Global instance
+principal_cache = PrincipalCache(
+    max_entries=settings.AUTH_PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,171 @@
+"""
+Adaptive Rate Limiter
+AIMD concurrency limit plus optional requests-per-minute token bucket, tuned
+by Bedrock throttling responses
+"""
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+
+from botocore.exceptions import ClientError
+
+from app.services.bedrock_executor import BedrockOverloadedError
+
+THROTTLING_ERROR_CODES = {
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceQuotaExceededException",
+}
+
+
+def is_throttling_error(error: Exception) -> bool:
+    """True if Bedrock rejected the call for exceeding a quota"""
+    if isinstance(error, ClientError):
+        code = error.response.get("Error", {}).get("Code", "")
+        status = error.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0)
+        return code in THROTTLING_ERROR_CODES or status == 429
+    return False
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """Exponential backoff with full jitter for the given retry attempt (0-based)"""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+class AdaptiveLimiter:
+    def __init__(
+        self,
+        initial_limit: float = 8,
+        min_limit: float = 1,
+        max_limit: float = 16,
+        decrease_factor: float = 0.5,
+        acquire_timeout: float = 30.0,
+        requests_per_minute: int = 0,
+    ):
+        """Initialize the concurrency limit and optional request-rate bucket"""
+        self.limit = float(initial_limit)
+        self.min_limit = float(min_limit)
+        self.max_limit = float(max_limit)
+        self.decrease_factor = decrease_factor
+        self.acquire_timeout = acquire_timeout
+        self.requests_per_minute = requests_per_minute
+        self._condition: Optional[asyncio.Condition] = None
+        self._tokens = float(max(1, requests_per_minute // 60)) if requests_per_minute else 0.0
+        self._tokens_updated_at = time.monotonic()
+        self._last_decrease_at = 0.0
+
+        # Metrics
+        self.in_flight = 0
+        self.waiting = 0
+        self.successes = 0
+        self.throttles = 0
+        self.errors = 0
+        self.rejections = 0
+        self.decreases = 0
+
+    def _get_condition(self) -> asyncio.Condition:
+        """Create the condition lazily so it binds to the running loop"""
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def _take_rate_token(self, deadline: float):
+        """Wait for a token from the requests-per-minute bucket"""
+        if not self.requests_per_minute:
+            return
+        rate = self.requests_per_minute / 60.0
+        capacity = max(1.0, rate)
+        while True:
+            now = time.monotonic()
+            self._tokens = min(capacity, self._tokens + (now - self._tokens_updated_at) * rate)
+            self._tokens_updated_at = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            wait = (1 - self._tokens) / rate
+            if now + wait > deadline:
+                raise BedrockOverloadedError("Bedrock request rate limit reached")
+            await asyncio.sleep(wait)
+
+    async def acquire(self):
+        """Wait for a slot under the current limit, rejecting after acquire_timeout"""
+        deadline = time.monotonic() + self.acquire_timeout
+        condition = self._get_condition()
+        async with condition:
+            self.waiting += 1
+            try:
+                while self.in_flight >= max(1, int(self.limit)):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.rejections += 1
+                        raise BedrockOverloadedError(
+                            f"Bedrock concurrency limit reached ({self.in_flight} in flight, limit {int(self.limit)})"
+                        )
+                    try:
+                        await asyncio.wait_for(condition.wait(), remaining)
+                    except asyncio.TimeoutError:
+                        pass
+                self.in_flight += 1
+            finally:
+                self.waiting -= 1
+
+        try:
+            await self._take_rate_token(deadline)
+        except BedrockOverloadedError:
+            self.rejections += 1
+            await self.release("rejected")
+            raise
+
+    async def release(self, outcome: str):
+        """Return a slot and adapt the limit: additive increase, multiplicative decrease"""
+        if outcome == "success":
+            self.successes += 1
+            # Roughly +1 per limit's worth of successful calls
+            self.limit = min(self.max_limit, self.limit + 1.0 / max(self.limit, 1.0))
+        elif outcome == "throttled":
+            self.throttles += 1
+            now = time.monotonic()
+            # Calls already in flight when throttling started only count once
+            if now - self._last_decrease_at >= 1.0:
+                self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+                self._last_decrease_at = now
+                self.decreases += 1
+        elif outcome == "error":
+            self.errors += 1
+
+        condition = self._get_condition()
+        async with condition:
+            self.in_flight -= 1
+            condition.notify_all()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold a slot for one Bedrock call and feed its outcome back into the limit"""
+        await self.acquire()
+        outcome = "error"
+        try:
+            yield
+            outcome = "success"
+        except Exception as e:
+            outcome = "throttled" if is_throttling_error(e) else "error"
+            raise
+        finally:
+            await self.release(outcome)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get limiter state for dashboards"""
+        return {
+            "limit": round(self.limit, 2),
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "successes": self.successes,
+            "throttles": self.throttles,
+            "errors": self.errors,
+            "rejections": self.rejections,
+            "decreases": self.decreases,
+            "requests_per_minute": self.requests_per_minute,
+        }
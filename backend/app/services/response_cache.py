@@ -0,0 +1,216 @@
+"""
+Response Cache Service
+Content-addressed cache for Bedrock analysis responses with pluggable backends
+"""
+import hashlib
+import json
+import logging
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from tortoise import connections
+from tortoise.expressions import F
+
+from app.models.response_cache import ResponseCacheEntry
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class CacheBackend:
+    """Storage interface for cached responses"""
+
+    name = "base"
+
+    async def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: str, metadata: Dict[str, Any]):
+        raise NotImplementedError
+
+    async def clear(self):
+        raise NotImplementedError
+
+    async def size(self) -> int:
+        raise NotImplementedError
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """Per-process LRU cache with TTL expiry"""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: int = 86400):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.evictions = 0
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str, metadata: Dict[str, Any]):
+        self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def clear(self):
+        self._entries.clear()
+
+    async def size(self) -> int:
+        return len(self._entries)
+
+
+class PostgresCacheBackend(CacheBackend):
+    """Cache table in the application database, shared by all uvicorn workers"""
+
+    name = "postgres"
+
+    # Trim the table every N writes rather than on each one
+    TRIM_EVERY = 50
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: int = 86400):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._writes = 0
+        self.evictions = 0
+
+    async def get(self, key: str) -> Optional[str]:
+        now = datetime.now(timezone.utc)
+        entry = await ResponseCacheEntry.filter(key=key, expires_at__gt=now).only("key", "response").first()
+        if entry is None:
+            return None
+        await ResponseCacheEntry.filter(key=key).update(last_accessed_at=now, hits=F("hits") + 1)
+        return entry.response
+
+    async def set(self, key: str, value: str, metadata: Dict[str, Any]):
+        """Store a response; metadata carries model_id (the model(s) that answered) and analysis_type"""
+        now = datetime.now(timezone.utc)
+        await ResponseCacheEntry.update_or_create(
+            key=key,
+            defaults={
+                "response": value,
+                "model_id": metadata.get("model_id", ""),
+                "analysis_type": metadata.get("analysis_type", ""),
+                "expires_at": now + timedelta(seconds=self.ttl_seconds),
+                "last_accessed_at": now,
+                "hits": 0,
+            },
+        )
+        self._writes += 1
+        if self._writes % self.TRIM_EVERY == 0:
+            await self._trim()
+
+    async def _trim(self):
+        """Delete expired rows and the least recently used rows beyond max_entries"""
+        conn = connections.get("default")
+        expired = await ResponseCacheEntry.filter(expires_at__lte=datetime.now(timezone.utc)).delete()
+        _, rows = await conn.execute_query(
+            "DELETE FROM response_cache WHERE key IN ("
+            "SELECT key FROM response_cache ORDER BY last_accessed_at DESC OFFSET $1"
+            ") RETURNING key",
+            [self.max_entries],
+        )
+        self.evictions += expired + len(rows)
+
+    async def clear(self):
+        await ResponseCacheEntry.all().delete()
+
+    async def size(self) -> int:
+        return await ResponseCacheEntry.all().count()
+
+
+class ResponseCache:
+    def __init__(self, backend: Optional[CacheBackend]):
+        """Initialize the cache front with a storage backend (None disables caching)"""
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Collapse whitespace so re-extracted copies of a document share a key"""
+        return _WHITESPACE.sub(" ", text).strip()
+
+    @classmethod
+    def make_key(cls, text: str, analysis_type: str, model_id: str, params: Dict[str, Any]) -> str:
+        """Hash normalized text, analysis type, model and inference params into a cache key"""
+        digest = hashlib.sha256()
+        for part in (
+            cls.normalize_text(text),
+            analysis_type,
+            model_id,
+            json.dumps(params, sort_keys=True),
+        ):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        """Look up a response, counting hits and misses; backend errors count as misses"""
+        try:
+            value = await self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"Response cache lookup failed: {e}")
+            self.errors += 1
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: str, **metadata):
+        """Store a response; backend errors are logged and ignored"""
+        try:
+            await self.backend.set(key, value, metadata)
+        except Exception as e:
+            logger.warning(f"Response cache write failed: {e}")
+            self.errors += 1
+
+    def record_bypass(self):
+        self.bypasses += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters"""
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend.name if self.backend else "none",
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypasses": self.bypasses,
+            "errors": self.errors,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": getattr(self.backend, "evictions", 0),
+        }
+
+
+def create_response_cache(backend: str, max_entries: int, ttl_seconds: int) -> ResponseCache:
+    """Build a ResponseCache for the configured backend name"""
+    if backend == "memory":
+        return ResponseCache(InMemoryCacheBackend(max_entries, ttl_seconds))
+    if backend == "postgres":
+        return ResponseCache(PostgresCacheBackend(max_entries, ttl_seconds))
+    if backend in ("none", "off", ""):
+        return ResponseCache(None)
+    raise ValueError(f"Unknown response cache backend: {backend}")
@@ -0,0 +1,165 @@
+"""
+Single-Flight Request Coalescing
+Concurrent callers with the same key share one in-flight call, within a worker
+and, through a Postgres advisory lock, across workers
+"""
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import asyncpg
+
+from app.core.config import settings
+from app.database import DATABASE_URL
+
+logger = logging.getLogger(__name__)
+
+# How long an analysis waits for a free lock connection before running without the lock
+LOCK_CONNECTION_WAIT_SECONDS = 1.0
+
+
+def advisory_lock_id(key: str) -> int:
+    """Map a hex request key onto the signed 64-bit id space of pg advisory locks"""
+    return int.from_bytes(bytes.fromhex(key[:16]), "big", signed=True)
+
+
+class AdvisoryLockPool:
+    def __init__(self, max_connections: int = 8, lock_timeout: float = 300.0):
+        """
+        Session-level advisory locks on a small asyncpg pool of their own, opened on
+        first use and bounded separately from the Tortoise pool, so a long Bedrock
+        call never holds an ORM connection or an open transaction
+        """
+        self.max_connections = max_connections
+        self.lock_timeout = lock_timeout
+        self._pool: Optional[asyncpg.Pool] = None
+        self._pool_lock: Optional[asyncio.Lock] = None
+
+        # Metrics
+        self.acquired = 0
+        self.lock_timeouts = 0
+        self.unlocked_runs = 0
+
+    async def _get_pool(self) -> asyncpg.Pool:
+        if self._pool is None:
+            if self._pool_lock is None:
+                self._pool_lock = asyncio.Lock()
+            async with self._pool_lock:
+                if self._pool is None:
+                    # lock_timeout bounds how long pg_advisory_lock blocks a waiter
+                    self._pool = await asyncpg.create_pool(
+                        DATABASE_URL, min_size=0, max_size=self.max_connections,
+                        server_settings={"lock_timeout": str(int(self.lock_timeout * 1000))},
+                    )
+        return self._pool
+
+    @asynccontextmanager
+    async def lock(self, key: str):
+        """
+        Hold the advisory lock for the key while the body runs; other workers asking
+        for the same key block in pg_advisory_lock until the holder finishes
+
+        When no lock connection frees up within LOCK_CONNECTION_WAIT_SECONDS, or the
+        wait hits lock_timeout, the body runs without the lock: coalescing is an
+        optimization, not a correctness requirement.
+        """
+        lock_id = advisory_lock_id(key)
+        conn = None
+        try:
+            pool = await self._get_pool()
+            conn = await pool.acquire(timeout=LOCK_CONNECTION_WAIT_SECONDS)
+        except Exception as e:
+            logger.warning(f"No analysis lock connection for {key[:16]}, running without the lock: {e}")
+        if conn is None:
+            self.unlocked_runs += 1
+            yield
+            return
+
+        try:
+            try:
+                await conn.execute("SELECT pg_advisory_lock($1)", lock_id)
+                locked = True
+                self.acquired += 1
+            except asyncpg.PostgresError as e:
+                locked = False
+                self.lock_timeouts += 1
+                self.unlocked_runs += 1
+                logger.warning(f"Timed out waiting for the analysis lock on {key[:16]}; running without it: {e}")
+            try:
+                yield
+            finally:
+                if locked:
+                    await conn.execute("SELECT pg_advisory_unlock($1)", lock_id)
+        finally:
+            # Release also resets the session (pg_advisory_unlock_all) if the unlock never ran
+            await pool.release(conn)
+
+    async def close(self):
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get lock pool counters for this worker"""
+        return {
+            "max_connections": self.max_connections,
+            "open_connections": self._pool.get_size() if self._pool is not None else 0,
+            "acquired": self.acquired,
+            "lock_timeouts": self.lock_timeouts,
+            "unlocked_runs": self.unlocked_runs,
+        }
+
+
+class SingleFlight:
+    def __init__(self):
+        """Initialize the in-flight call table"""
+        self._calls: Dict[str, asyncio.Task] = {}
+
+        # Metrics
+        self.leaders = 0
+        self.coalesced = 0
+        self.cross_worker_coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn once per key at a time; callers arriving while it runs await the same result
+
+        The call runs as its own task, so a caller disconnecting does not cancel
+        it for the others.
+        """
+        task = self._calls.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task)
+
+        self.leaders += 1
+        task = asyncio.ensure_future(fn())
+        self._calls[key] = task
+        task.add_done_callback(lambda _: self._calls.pop(key, None))
+        return await asyncio.shield(task)
+
+    def record_cross_worker_hit(self):
+        """Count a call answered by another worker's result while we waited on its lock"""
+        self.cross_worker_coalesced += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get coalescing counters"""
+        return {
+            "in_flight_keys": len(self._calls),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "cross_worker_coalesced": self.cross_worker_coalesced,
+        }
+
+
+# Global instance
+advisory_locks = AdvisoryLockPool(
+    max_connections=settings.BEDROCK_COALESCE_LOCK_CONNECTIONS,
+    lock_timeout=settings.BEDROCK_COALESCE_LOCK_TIMEOUT_SECONDS,
+)
+
+
+def postgres_advisory_lock(key: str):
+    """Cross-worker lock for a request key on the shared lock pool"""
+    return advisory_locks.lock(key)
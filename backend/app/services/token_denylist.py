@@ -0,0 +1,138 @@
+"""
+Token Denylist
+Revoked token ids (jti) stored in Postgres and mirrored into a per-worker hash
+set, so revocation checks on authenticated requests never query the database
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from typing import Dict, Optional
+
+from tortoise import timezone
+from tortoise.exceptions import IntegrityError
+
+from app.core.config import settings
+from app.models.token import RevokedToken
+from app.services.user_state import SYNC_OVERLAP_SECONDS, epoch
+
+logger = logging.getLogger(__name__)
+
+# Expired rows are deleted from Postgres at most this often (by whichever worker gets there)
+PURGE_INTERVAL_SECONDS = 300
+
+
+class TokenDenylist:
+    def __init__(self, sync_interval: float = 2.0):
+        self.sync_interval = sync_interval
+        # jti -> token expiry (epoch seconds); entries are dropped once the token has expired
+        self._revoked: Dict[str, float] = {}
+        self._watermark: Optional[datetime] = None
+        self._last_purge = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.checks = 0
+        self.denied = 0
+        self.revocations = 0
+        self.already_revoked = 0
+        self.syncs = 0
+        self.sync_failures = 0
+        self.last_sync_at = 0.0
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        """Hot-path check: a dict lookup, no I/O"""
+        self.checks += 1
+        if jti is not None and jti in self._revoked:
+            self.denied += 1
+            return True
+        return False
+
+    def add(self, jti: str, expires_at: float):
+        self._revoked[jti] = expires_at
+
+    async def revoke(self, jti: str, expires_at: int, token_type: str, reason: str,
+                     user_id: Optional[int] = None) -> bool:
+        """
+        Revoke a token by id (expires_at is its exp claim). Returns False if it was
+        already revoked by any worker, which is how refresh-token reuse is detected.
+        """
+        try:
+            await RevokedToken.create(
+                jti=jti,
+                user_id=user_id,
+                token_type=token_type,
+                reason=reason,
+                expires_at=datetime.fromtimestamp(expires_at, tz=dt_timezone.utc),
+            )
+        except IntegrityError:
+            self.add(jti, expires_at)
+            self.already_revoked += 1
+            return False
+        self.add(jti, expires_at)
+        self.revocations += 1
+        return True
+
+    def _prune(self):
+        now = time.time()
+        for jti in [jti for jti, expires_at in self._revoked.items() if expires_at <= now]:
+            del self._revoked[jti]
+
+    async def sync(self):
+        """Load revocations made since the last sync (everything unexpired at startup)"""
+        started = timezone.now()
+        if self._watermark is None:
+            query = RevokedToken.filter(expires_at__gt=started)
+        else:
+            query = RevokedToken.filter(revoked_at__gte=self._watermark - timedelta(seconds=SYNC_OVERLAP_SECONDS))
+        for jti, expires_at in await query.values_list("jti", "expires_at"):
+            self.add(jti, epoch(expires_at))
+        self._watermark = started
+        self._prune()
+
+        if time.time() - self._last_purge >= PURGE_INTERVAL_SECONDS:
+            await RevokedToken.filter(expires_at__lte=started).delete()
+            self._last_purge = time.time()
+
+        self.syncs += 1
+        self.last_sync_at = time.time()
+
+    async def _sync_loop(self):
+        while True:
+            try:
+                await self.sync()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.sync_failures += 1
+                logger.error(f"Token denylist sync failed: {e}")
+            await asyncio.sleep(self.sync_interval)
+
+    def start(self):
+        """Start the periodic sync on the running loop"""
+        self._task = asyncio.create_task(self._sync_loop())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    def get_stats(self) -> Dict[str, float]:
+        """Get denylist size, hit counts and sync freshness"""
+        return {
+            "revoked_tokens": len(self._revoked),
+            "checks": self.checks,
+            "denied": self.denied,
+            "revocations": self.revocations,
+            "already_revoked": self.already_revoked,
+            "syncs": self.syncs,
+            "sync_failures": self.sync_failures,
+            "seconds_since_sync": round(time.time() - self.last_sync_at, 1) if self.last_sync_at else None,
+        }
+
+
+# Global instance
+token_denylist = TokenDenylist(sync_interval=settings.AUTH_DENYLIST_SYNC_SECONDS)
@@ -0,0 +1,80 @@
+"""
+Token Estimator
+Fast heuristic token counts for prompts and Converse messages
+"""
+import math
+import string
+from functools import lru_cache
+from typing import Dict, List
+
+# Claude tokenizers average roughly 4 characters of English text per token
+CHARS_PER_TOKEN = 4
+
+# Digits and punctuation split into much shorter tokens, about 2 characters each
+DENSE_CHARS_PER_TOKEN = 2
+
+# Per-message framing overhead (role markers, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Texts up to this size (chat turns, history, prompts) are memoized; documents are not pinned in memory
+CACHE_MAX_CHARS = 64 * 1024
+
+# Long texts are scanned in slices so the temporaries stay small
+_BLOCK_CHARS = 1024 * 1024
+
+_DENSE_BYTES = (string.digits + string.punctuation).encode()
+
+
+def _estimate(text: str) -> int:
+    """
+    Count character classes with whole-buffer C passes instead of a Python loop:
+    ASCII digits and punctuation by deleting them with bytes.translate,
+    non-ASCII via the UTF-8 byte surplus (a CJK character adds two bytes,
+    about one token)
+    """
+    tokens = 0.0
+    for start in range(0, len(text), _BLOCK_CHARS):
+        block = text[start:start + _BLOCK_CHARS]
+        encoded = block.encode("utf-8", "surrogatepass")
+        dense = len(encoded) - len(encoded.translate(None, _DENSE_BYTES))
+        extra_bytes = len(encoded) - len(block)
+        tokens += (len(block) - dense) / CHARS_PER_TOKEN + dense / DENSE_CHARS_PER_TOKEN + extra_bytes / 2
+    return math.ceil(tokens)
+
+
+_estimate_cached = lru_cache(maxsize=8192)(_estimate)
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of a string"""
+    if not text:
+        return 0
+    if len(text) <= CACHE_MAX_CHARS:
+        return _estimate_cached(text)
+    return _estimate(text)
+
+
+def estimate_message_tokens(message: Dict) -> int:
+    """Estimate the token count of one Converse message"""
+    tokens = MESSAGE_OVERHEAD_TOKENS
+    for block in message.get("content", []):
+        tokens += estimate_tokens(block.get("text", ""))
+    return tokens
+
+
+def estimate_messages_tokens(messages: List[Dict]) -> int:
+    """Estimate the token count of a list of Converse messages"""
+    return sum(estimate_message_tokens(m) for m in messages)
+
+
+def get_cache_stats() -> Dict[str, float]:
+    """Get memoization hit ratio for short texts"""
+    info = _estimate_cached.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "entries": info.currsize,
+        "max_entries": info.maxsize,
+        "hits": info.hits,
+        "misses": info.misses,
+        "hit_ratio": round(info.hits / lookups, 3) if lookups else 0.0,
+    }
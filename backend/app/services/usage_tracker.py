@@ -0,0 +1,177 @@
+"""
+Bedrock Usage Tracker
+Per-call token and latency metrics, exported as counters and histograms and
+written behind to the bedrock_usage table in batches
+"""
+import asyncio
+import logging
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional
+
+from tortoise import timezone
+
+from app.core.config import settings
+from app.models.usage import BedrockUsage
+from app.services.metrics import MetricsRegistry, metrics_registry
+
+logger = logging.getLogger(__name__)
+
+# User the current request's Bedrock calls are attributed to
+current_user_id: ContextVar[Optional[int]] = ContextVar("bedrock_usage_user_id", default=None)
+
+TOKEN_BUCKETS = (16, 64, 256, 1024, 4096, 16384, 65536)
+
+
+class UsageTracker:
+    def __init__(self, registry: MetricsRegistry, flush_interval: float = 5.0,
+                 batch_size: int = 500, max_buffer: int = 10000):
+        """
+        Initialize metrics; rows are only buffered for the database once start() runs.
+        The buffer holds at most max_buffer rows; past that the oldest rows are
+        dropped and counted, whether new rows arrive or a batch is put back.
+        """
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_buffer = max_buffer
+        self._buffer: Deque[BedrockUsage] = deque()
+        self._task: Optional[asyncio.Task] = None
+        self._flush_needed: Optional[asyncio.Event] = None
+
+        self.calls = registry.counter(
+            "bedrock_calls_total", "Bedrock calls by model, operation and outcome",
+            ("model", "operation", "outcome"))
+        self.input_tokens = registry.counter(
+            "bedrock_input_tokens_total", "Input tokens billed by Bedrock", ("model", "operation"))
+        self.output_tokens = registry.counter(
+            "bedrock_output_tokens_total", "Output tokens billed by Bedrock", ("model", "operation"))
+        self.client_latency = registry.histogram(
+            "bedrock_client_latency_seconds", "Call latency observed by the backend, including limiter wait",
+            ("model", "operation"))
+        self.server_latency = registry.histogram(
+            "bedrock_server_latency_seconds", "Call latency reported by Bedrock (metrics.latencyMs)",
+            ("model", "operation"))
+        self.output_token_sizes = registry.histogram(
+            "bedrock_output_tokens", "Output tokens per successful call", ("model", "operation"),
+            buckets=TOKEN_BUCKETS)
+        self.rejections = registry.counter(
+            "bedrock_rejections_total", "Calls rejected locally before reaching Bedrock", ("model", "operation"))
+        self.dropped = registry.counter(
+            "bedrock_usage_rows_dropped_total", "Usage rows never written to the database",
+            ("reason",))
+
+        # Write-behind metrics
+        self.rows_written = 0
+        self.rows_dropped = 0
+        self.flush_failures = 0
+
+    def record(self, model_id: str, operation: str, outcome: str, client_latency: float,
+               usage: Optional[Dict[str, Any]] = None, server_latency_ms: Optional[int] = None):
+        """Record one Bedrock call; never touches the database on the caller's path"""
+        usage = usage or {}
+        input_tokens = int(usage.get("inputTokens", 0))
+        output_tokens = int(usage.get("outputTokens", 0))
+
+        self.calls.inc(model_id, operation, outcome)
+        self.client_latency.observe(client_latency, model_id, operation)
+        if input_tokens or output_tokens:
+            self.input_tokens.inc(model_id, operation, amount=input_tokens)
+            self.output_tokens.inc(model_id, operation, amount=output_tokens)
+        if outcome == "success":
+            self.output_token_sizes.observe(output_tokens, model_id, operation)
+        if server_latency_ms is not None:
+            self.server_latency.observe(server_latency_ms / 1000.0, model_id, operation)
+
+        if self._task is None:
+            return
+        if len(self._buffer) >= self.max_buffer:
+            self._buffer.popleft()
+            self._drop(1, "overflow")
+        self._buffer.append(BedrockUsage(
+            user_id=current_user_id.get(),
+            model_id=model_id,
+            operation=operation,
+            outcome=outcome,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            server_latency_ms=server_latency_ms,
+            client_latency_ms=int(client_latency * 1000),
+            created_at=timezone.now(),
+        ))
+        if len(self._buffer) >= self.batch_size:
+            self._flush_needed.set()
+
+    def _drop(self, rows: int, reason: str):
+        self.rows_dropped += rows
+        self.dropped.inc(reason, amount=rows)
+
+    def _requeue(self, batch: List[BedrockUsage]):
+        """Put an unwritten batch back at the front in its original order, dropping its oldest rows if full"""
+        overflow = len(batch) - (self.max_buffer - len(self._buffer))
+        if overflow > 0:
+            # The batch predates everything buffered, so its head is the oldest data
+            self._drop(overflow, "overflow")
+            batch = batch[overflow:]
+        self._buffer.extendleft(reversed(batch))
+
+    def record_rejection(self, model_id: str, operation: str):
+        """Count a call the local limiter or executor queue refused"""
+        self.rejections.inc(model_id, operation)
+
+    def start(self):
+        """Start the background flusher on the running loop"""
+        self._flush_needed = asyncio.Event()
+        self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """Stop the flusher and write whatever is still buffered"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        await self.flush()
+
+    async def flush(self):
+        """Write buffered rows with one bulk insert per batch"""
+        while self._buffer:
+            batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+            try:
+                await BedrockUsage.bulk_create(batch)
+                self.rows_written += len(batch)
+            except asyncio.CancelledError:
+                # Shutting down mid-insert; stop() flushes these again
+                self._requeue(batch)
+                raise
+            except Exception as e:
+                # Accounting must not take the service down; drop the batch and keep going
+                self.flush_failures += 1
+                self._drop(len(batch), "write_error")
+                logger.error(f"Failed to write {len(batch)} Bedrock usage rows: {e}")
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_needed.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_needed.clear()
+            await self.flush()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get write-behind buffer counters"""
+        return {
+            "buffered": len(self._buffer),
+            "rows_written": self.rows_written,
+            "rows_dropped": self.rows_dropped,
+            "flush_failures": self.flush_failures,
+        }
+
+
+# Global instance
+usage_tracker = UsageTracker(
+    metrics_registry,
+    flush_interval=settings.USAGE_FLUSH_INTERVAL_SECONDS,
+    batch_size=settings.USAGE_FLUSH_BATCH_SIZE,
+    max_buffer=settings.USAGE_BUFFER_MAX_ROWS,
+)
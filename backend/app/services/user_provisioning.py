@@ -0,0 +1,263 @@
+"""
+User Provisioning
+Bulk user creation from CSV or JSONL: rows are validated with UserRegister,
+passwords hashed across a process pool and users inserted with bulk_create
+in chunks, with a per-row report
+"""
+import asyncio
+import csv
+import io
+import json
+import logging
+import math
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from pydantic import ValidationError
+from tortoise.exceptions import IntegrityError
+from tortoise.expressions import Q
+from tortoise.transactions import in_transaction
+
+from app.core.config import settings
+from app.models.user import User
+from app.schemas.auth import UserRegister
+from app.services.password_hasher import make_crypt_context
+
+logger = logging.getLogger(__name__)
+
+# Row outcomes in the report
+CREATED = "created"
+VALID = "valid"  # dry run: would be created
+INVALID = "invalid"
+DUPLICATE = "duplicate"  # repeats an earlier row of the same file
+EXISTS = "exists"
+FAILED = "failed"
+
+
+class ProvisioningError(ValueError):
+    """Raised when an upload cannot be parsed at all"""
+
+
+class TooManyRowsError(ProvisioningError):
+    """Raised when an upload has more than max_rows rows"""
+
+
+def _hash_passwords(passwords: Sequence[str], rounds: int) -> List[str]:
+    """Worker: bcrypt each password at the given cost"""
+    context = make_crypt_context(rounds)
+    return [context.hash(password) for password in passwords]
+
+
+def parse_rows(data: bytes, filename: str = "") -> List[Tuple[int, Any]]:
+    """
+    (row number, record) pairs from a CSV (with a header row) or JSONL upload.
+    A JSONL line that is not a JSON object is kept as its error message, so it
+    shows up in the report instead of failing the whole upload.
+    """
+    try:
+        text = data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise ProvisioningError("File must be UTF-8 encoded")
+
+    if filename.lower().endswith((".jsonl", ".ndjson")) or text.lstrip().startswith("{"):
+        rows = []
+        for number, line in enumerate(text.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                record = f"Invalid JSON: {e.msg}"
+            else:
+                if not isinstance(record, dict):
+                    record = "Each line must be a JSON object"
+            rows.append((number, record))
+        return rows
+
+    reader = csv.DictReader(io.StringIO(text))
+    missing = set(UserRegister.model_fields) - set(reader.fieldnames or [])
+    if missing:
+        raise ProvisioningError(f"CSV header is missing columns: {', '.join(sorted(missing))}")
+    # Row numbers count data rows, so row 1 is the line after the header
+    return list(enumerate(reader, start=1))
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(loc) for loc in e['loc'])}: {e['msg']}" for e in error.errors())
+
+
+class UserProvisioner:
+    def __init__(self, max_workers: int = 2, rounds: int = 12, chunk_size: int = 1000, max_rows: int = 50000):
+        """Initialize limits; worker processes start on first use"""
+        self.max_workers = max_workers
+        self.rounds = rounds
+        self.chunk_size = chunk_size
+        self.max_rows = max_rows
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+        # Metrics
+        self.runs = 0
+        self.rows = 0
+        self.created = 0
+        self.hash_seconds = 0.0
+        self.insert_seconds = 0.0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # forkserver, as for PDF extraction: children never inherit this worker's threads
+            context = multiprocessing.get_context("forkserver")
+            context.set_forkserver_preload([__name__])
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+        return self._pool
+
+    async def _hash_all(self, passwords: List[str]) -> List[str]:
+        """Hash in consecutive batches, about four per worker so stragglers even out"""
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        size = max(1, math.ceil(len(passwords) / (self.max_workers * 4)))
+        batches = [passwords[start:start + size] for start in range(0, len(passwords), size)]
+        try:
+            parts = await asyncio.gather(*(
+                loop.run_in_executor(pool, _hash_passwords, batch, self.rounds) for batch in batches
+            ))
+        except BrokenProcessPool:
+            logger.error("Password hashing worker died; restarting the pool")
+            self.shutdown()
+            raise
+        return [hashed for part in parts for hashed in part]
+
+    async def _existing(self, users: List[UserRegister]) -> Tuple[set, set]:
+        """Usernames and emails among these users that are already registered"""
+        usernames, emails = set(), set()
+        for start in range(0, len(users), self.chunk_size):
+            chunk = users[start:start + self.chunk_size]
+            rows = await User.filter(
+                Q(username__in=[u.username for u in chunk]) | Q(email__in=[u.email for u in chunk])
+            ).values_list("username", "email")
+            for username, email in rows:
+                usernames.add(username)
+                emails.add(email)
+        return usernames, emails
+
+    async def _insert_chunk(self, chunk: List[Tuple[Dict[str, Any], User]]):
+        """bulk_create the chunk; if a concurrent signup makes it fail, retry row by row"""
+        try:
+            async with in_transaction():
+                await User.bulk_create([user for _, user in chunk])
+            for result, _ in chunk:
+                result["status"] = CREATED
+            return
+        except IntegrityError:
+            logger.warning("Bulk insert hit a unique constraint; inserting the chunk row by row")
+        for result, user in chunk:
+            try:
+                await user.save()
+                result["status"] = CREATED
+            except IntegrityError:
+                result.update(status=EXISTS, error="Username or email already registered")
+            except Exception as e:
+                result.update(status=FAILED, error=str(e))
+
+    async def provision(self, rows: List[Tuple[int, Any]], dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Create users from parsed rows and return the report. Rows that are invalid,
+        repeat an earlier row, or name an existing username or email are skipped;
+        only the remaining passwords are hashed.
+        """
+        if len(rows) > self.max_rows:
+            raise TooManyRowsError(f"File has {len(rows)} rows; the limit is {self.max_rows}")
+        started = time.perf_counter()
+        results: List[Dict[str, Any]] = []
+        pending: List[Tuple[Dict[str, Any], UserRegister]] = []
+        seen_usernames, seen_emails = set(), set()
+
+        for number, record in rows:
+            result = {"row": number, "username": None, "status": VALID, "error": None}
+            results.append(result)
+            if isinstance(record, str):
+                result.update(status=INVALID, error=record)
+                continue
+            try:
+                # Cells beyond the CSV header come back under a None key
+                user = UserRegister(**{k: v for k, v in record.items() if isinstance(k, str)})
+            except ValidationError as e:
+                username = record.get("username")
+                result.update(username=str(username) if username is not None else None,
+                              status=INVALID, error=_validation_message(e))
+                continue
+            result["username"] = user.username
+            if user.username in seen_usernames or user.email in seen_emails:
+                result.update(status=DUPLICATE, error="Username or email repeats an earlier row")
+                continue
+            seen_usernames.add(user.username)
+            seen_emails.add(user.email)
+            pending.append((result, user))
+
+        existing_usernames, existing_emails = await self._existing([user for _, user in pending])
+        to_create = []
+        for result, user in pending:
+            if user.username in existing_usernames:
+                result.update(status=EXISTS, error="Username already registered")
+            elif user.email in existing_emails:
+                result.update(status=EXISTS, error="Email already registered")
+            else:
+                to_create.append((result, user))
+
+        if not dry_run and to_create:
+            hash_started = time.perf_counter()
+            hashes = await self._hash_all([user.password for _, user in to_create])
+            self.hash_seconds += time.perf_counter() - hash_started
+
+            insert_started = time.perf_counter()
+            models = [
+                (result, User(name=user.name, email=user.email, username=user.username,
+                              hashed_password=hashed, is_active=True, email_verified=False))
+                for (result, user), hashed in zip(to_create, hashes)
+            ]
+            for start in range(0, len(models), self.chunk_size):
+                await self._insert_chunk(models[start:start + self.chunk_size])
+            self.insert_seconds += time.perf_counter() - insert_started
+
+        counts: Dict[str, int] = {}
+        for result in results:
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+        self.runs += 1
+        self.rows += len(results)
+        self.created += counts.get(CREATED, 0)
+        return {
+            "dry_run": dry_run,
+            "total_rows": len(results),
+            "counts": counts,
+            "elapsed_seconds": round(time.perf_counter() - started, 3),
+            "rows": results,
+        }
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get provisioning throughput counters"""
+        return {
+            "workers": self.max_workers,
+            "rounds": self.rounds,
+            "runs": self.runs,
+            "rows": self.rows,
+            "created": self.created,
+            "hashes_per_second": round(self.created / self.hash_seconds, 1) if self.hash_seconds else 0.0,
+            "inserts_per_second": round(self.created / self.insert_seconds, 1) if self.insert_seconds else 0.0,
+        }
+
+
+# Global instance
+user_provisioner = UserProvisioner(
+    max_workers=settings.PROVISION_HASH_WORKERS,
+    rounds=settings.PROVISION_BCRYPT_ROUNDS,
+    chunk_size=settings.PROVISION_CHUNK_SIZE,
+    max_rows=settings.PROVISION_MAX_ROWS,
+)
@@ -0,0 +1,131 @@
+"""
+User State Tracker
+Per-worker view of recently changed users (token version bumps, deactivation,
+profile edits), synced from Postgres, so stateless tokens are only checked
+against the database for users that actually changed
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from typing import Dict, Optional, Tuple
+
+from tortoise import timezone
+
+from app.core.config import settings
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Re-read a little before the previous sync so rows committed while it ran are not missed
+SYNC_OVERLAP_SECONDS = 5
+
+
+def epoch(value: datetime) -> float:
+    """Seconds since the epoch; naive datetimes are UTC, as Tortoise stores them"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=dt_timezone.utc)
+    return value.timestamp()
+
+
+class UserStateTracker:
+    def __init__(self, sync_interval: float = 5.0, retention_seconds: float = 1800.0):
+        """
+        retention_seconds should cover the token lifetime: once a change is older
+        than that, every token issued before it has expired and it can be forgotten
+        """
+        self.sync_interval = sync_interval
+        self.retention_seconds = retention_seconds
+        # user id -> (token_version, is_active, changed_at epoch seconds)
+        self._states: Dict[int, Tuple[int, bool, float]] = {}
+        self._watermark: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.checks = 0
+        self.lookups = 0
+        self.syncs = 0
+        self.sync_failures = 0
+        self.last_sync_at = 0.0
+
+    def record(self, user_id: int, token_version: int, is_active: bool, changed_at: float):
+        """Note a user change seen locally or by a sync; an older observation never wins"""
+        current = self._states.get(user_id)
+        if current is None or changed_at >= current[2]:
+            self._states[user_id] = (token_version, is_active, changed_at)
+
+    def needs_lookup(self, user_id: int, token_version: int, issued_at: float) -> bool:
+        """
+        True if claims for this user cannot be trusted on their own: the user was
+        deactivated, their token version moved past the token's, or their row
+        changed after the token was issued
+        """
+        self.checks += 1
+        state = self._states.get(user_id)
+        if state is None:
+            return False
+        version, is_active, changed_at = state
+        if not is_active or token_version < version or issued_at <= changed_at:
+            self.lookups += 1
+            return True
+        return False
+
+    def _prune(self):
+        cutoff = time.time() - self.retention_seconds
+        for user_id in [uid for uid, state in self._states.items() if state[2] < cutoff]:
+            del self._states[user_id]
+
+    async def sync(self):
+        """Load users changed since the last sync (or within the retention window at startup)"""
+        started = timezone.now()
+        since = self._watermark or started - timedelta(seconds=self.retention_seconds)
+        rows = await User.filter(updated_at__gte=since - timedelta(seconds=SYNC_OVERLAP_SECONDS)) \
+            .values_list("id", "token_version", "is_active", "updated_at")
+        for user_id, token_version, is_active, updated_at in rows:
+            self.record(user_id, token_version, is_active, epoch(updated_at))
+        self._watermark = started
+        self._prune()
+        self.syncs += 1
+        self.last_sync_at = time.time()
+
+    async def _sync_loop(self):
+        while True:
+            try:
+                await self.sync()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.sync_failures += 1
+                logger.error(f"User state sync failed: {e}")
+            await asyncio.sleep(self.sync_interval)
+
+    def start(self):
+        """Start the periodic sync on the running loop"""
+        self._task = asyncio.create_task(self._sync_loop())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    def get_stats(self) -> Dict[str, float]:
+        """Get how often stateless tokens needed a database check"""
+        return {
+            "tracked_users": len(self._states),
+            "checks": self.checks,
+            "lookups": self.lookups,
+            "lookup_ratio": round(self.lookups / self.checks, 4) if self.checks else 0.0,
+            "syncs": self.syncs,
+            "sync_failures": self.sync_failures,
+            "seconds_since_sync": round(time.time() - self.last_sync_at, 1) if self.last_sync_at else None,
+        }
+
+
+# Global instance
+user_state = UserStateTracker(
+    sync_interval=settings.AUTH_STATE_SYNC_SECONDS,
+    retention_seconds=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Authenticated-user resolution benchmark
+
+Sends authenticated requests to a protected endpoint for a pool of users and
+compares resolving the user from Postgres on every request with the principal
+cache. Needs a database (DATABASE_URL, or --db-url); the benchmark users are
+removed afterwards. Run from the backend directory:
+
+    python -m benchmarks.bench_auth_lookup --users 100 --requests 5000 --concurrency 32
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import uuid
+
+import httpx
+from fastapi import Depends, FastAPI
+from tortoise import Tortoise
+
+from app.database import DATABASE_URL
+from app.middleware.auth_middleware import get_current_active_user
+from app.models.user import User
+from app.services.auth_service import AuthService
+from app.services.principal_cache import principal_cache
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/me")
+    async def me(current_user: dict = Depends(get_current_active_user)):
+        return {"id": current_user["id"]}
+
+    return app
+
+
+async def run_mode(mode: str, tokens: list, requests: int, concurrency: int) -> dict:
+    principal_cache.clear()
+    principal_cache.max_entries = 0 if mode == "db" else 10000
+    principal_cache.hits = principal_cache.misses = 0
+
+    lookups = 0
+    original = AuthService.get_user_by_username
+
+    async def counted(username: str):
+        nonlocal lookups
+        lookups += 1
+        return await original(username)
+
+    AuthService.get_user_by_username = staticmethod(counted)
+    latencies = []
+    transport = httpx.ASGITransport(app=build_app())
+    queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(tokens[i % len(tokens)])
+
+    async def user_loop(client: httpx.AsyncClient):
+        while not queue.empty():
+            token = queue.get_nowait()
+            started = time.perf_counter()
+            response = await client.get("/me", headers={"Authorization": f"Bearer {token}"})
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - started)
+
+    try:
+        started = time.perf_counter()
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await asyncio.gather(*(user_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    finally:
+        AuthService.get_user_by_username = staticmethod(original)
+
+    latencies.sort()
+    return {
+        "mode": mode,
+        "rps": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "lookups_per_request": lookups / requests,
+        "hit_ratio": principal_cache.get_stats()["hit_ratio"],
+    }
+
+
+async def main_async(args):
+    await Tortoise.init(db_url=args.db_url, modules={"models": ["app.models.user"]})
+    await Tortoise.generate_schemas(safe=True)
+    prefix = f"bench{uuid.uuid4().hex[:8]}"
+    try:
+        await User.bulk_create([
+            User(name=f"Bench {i}", email=f"{prefix}{i}@example.com", username=f"{prefix}{i}",
+                 hashed_password="x")
+            for i in range(args.users)
+        ])
+        tokens = [AuthService.create_access_token({"sub": f"{prefix}{i}"}) for i in range(args.users)]
+
+        print(f"🧪 Auth lookup benchmark ({args.users} users, {args.requests} requests, "
+              f"{args.concurrency} concurrent)")
+        print(f"{'mode':<8} {'req/s':>9} {'p50':>9} {'p99':>9} {'DB lookups/req':>15} {'hit ratio':>10}")
+        for mode in args.modes.split(","):
+            r = await run_mode(mode, tokens, args.requests, args.concurrency)
+            print(f"{r['mode']:<8} {r['rps']:>9.0f} {r['p50_ms']:>7.2f}ms {r['p99_ms']:>7.2f}ms "
+                  f"{r['lookups_per_request']:>15.3f} {r['hit_ratio']:>10.3f}")
+    finally:
+        await User.filter(username__startswith=prefix).delete()
+        await Tortoise.close_connections()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Authenticated-user resolution benchmark")
+    parser.add_argument("--db-url", default=os.getenv("BENCH_DATABASE_URL", DATABASE_URL))
+    parser.add_argument("--users", type=int, default=100, help="Distinct users sending requests")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--modes", default="db,cached", help="Comma-separated modes to compare")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
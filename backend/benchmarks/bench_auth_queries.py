@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Auth endpoint query benchmark
+
+Drives /auth/register, /auth/login and /auth/me through the real router and
+counts the SQL statements each request sends, with per-endpoint latency. The
+principal cache is disabled so /me shows its database cost. Needs a database
+(DATABASE_URL, or --db-url); the benchmark users are removed afterwards. Use a
+low bcrypt cost so hashing does not hide the queries. Run from the backend
+directory:
+
+    BCRYPT_ROUNDS=4 python -m benchmarks.bench_auth_queries --users 200
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import uuid
+
+import httpx
+from fastapi import FastAPI
+from tortoise import Tortoise, connections
+
+from app.api.v1.auth import router as auth_router
+from app.database import DATABASE_URL
+from app.models.user import User
+from app.services.login_throttle import login_throttle
+from app.services.principal_cache import principal_cache
+
+COUNTED_METHODS = ("execute_query", "execute_query_dict", "execute_insert", "execute_many", "execute_script")
+
+
+class QueryCounter:
+    """Counts statements sent through a Tortoise connection by wrapping its execute methods"""
+
+    def __init__(self, conn):
+        self.count = 0
+        for name in COUNTED_METHODS:
+            setattr(conn, name, self._wrap(getattr(conn, name)))
+
+    def _wrap(self, method):
+        async def counted(*args, **kwargs):
+            self.count += 1
+            return await method(*args, **kwargs)
+        return counted
+
+
+async def timed(counter: QueryCounter, stats: dict, name: str, request):
+    before = counter.count
+    started = time.perf_counter()
+    response = await request
+    stats.setdefault(name, {"latencies": [], "queries": 0, "statuses": set()})
+    stats[name]["latencies"].append(time.perf_counter() - started)
+    stats[name]["queries"] += counter.count - before
+    stats[name]["statuses"].add(response.status_code)
+    return response
+
+
+async def main_async(args):
+    await Tortoise.init(db_url=args.db_url, modules={"models": ["app.models.user"]})
+    await Tortoise.generate_schemas(safe=True)
+    counter = QueryCounter(connections.get("default"))
+    principal_cache.max_entries = 0
+    # Every login comes from the same transport address; the throttle would 429 after the per-IP limit
+    login_throttle.enabled = False
+
+    app = FastAPI()
+    app.include_router(auth_router, prefix="/api/v1")
+    prefix = f"bench{uuid.uuid4().hex[:8]}"
+    stats = {}
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench/api/v1/auth") as client:
+            for i in range(args.users):
+                user = {"name": f"Bench {i}", "email": f"{prefix}{i}@example.com",
+                        "username": f"{prefix}{i}", "password": "correct horse"}
+                await timed(counter, stats, "register", client.post("/register", json=user))
+                await timed(counter, stats, "register (dup)", client.post("/register", json=user))
+                login = await timed(counter, stats, "login", client.post(
+                    "/login", json={"username": user["username"], "password": user["password"]}))
+                login.raise_for_status()
+                token = login.json()["token"]["access_token"]
+                for _ in range(args.me_calls):
+                    await timed(counter, stats, "me", client.get(
+                        "/me", headers={"Authorization": f"Bearer {token}"}))
+
+        print(f"🧪 Auth query benchmark ({args.users} users, {args.me_calls} /me calls each)")
+        print(f"{'endpoint':<15} {'requests':>9} {'queries/req':>12} {'p50':>9} {'p95':>9} {'status':>8}")
+        for name, s in stats.items():
+            latencies = sorted(s["latencies"])
+            n = len(latencies)
+            print(f"{name:<15} {n:>9} {s['queries'] / n:>12.2f} {statistics.median(latencies) * 1000:>7.2f}ms "
+                  f"{latencies[max(0, int(n * 0.95) - 1)] * 1000:>7.2f}ms "
+                  f"{','.join(str(c) for c in sorted(s['statuses'])):>8}")
+    finally:
+        await User.filter(username__startswith=prefix).delete()
+        await Tortoise.close_connections()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Auth endpoint query benchmark")
+    parser.add_argument("--db-url", default=os.getenv("BENCH_DATABASE_URL", DATABASE_URL))
+    parser.add_argument("--users", type=int, default=200, help="Users to register and log in")
+    parser.add_argument("--me-calls", type=int, default=5, help="/auth/me requests per user")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
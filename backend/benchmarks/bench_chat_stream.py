@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Streaming chat benchmark
+
+Compares time-to-first-token and tokens/sec of BedrockService.chat_stream
+against the blocking BedrockService.chat, using the fake Bedrock client. Run from the backend directory:
+
+    python -m benchmarks.bench_chat_stream --tokens 300 --first-token 0.35 --token-rate 60
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.services.bedrock_executor import BedrockExecutor
+from app.services.bedrock_service import BedrockService
+from app.services.fake_bedrock import FakeBedrockClient
+
+
+async def measure_stream(service: BedrockService) -> dict:
+    started = time.perf_counter()
+    first_token_at = None
+    tokens = 0
+    async for _ in service.chat_stream(message="hello"):
+        if first_token_at is None:
+            first_token_at = time.perf_counter()
+        tokens += 1
+    finished = time.perf_counter()
+    generation = finished - first_token_at if first_token_at else 0.0
+    return {
+        "ttft": (first_token_at or finished) - started,
+        "total": finished - started,
+        "tokens_per_s": (tokens - 1) / generation if generation else 0.0,
+    }
+
+
+async def measure_blocking(service: BedrockService) -> float:
+    started = time.perf_counter()
+    await service.chat(message="hello")
+    return time.perf_counter() - started
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Streaming chat benchmark")
+    parser.add_argument("--tokens", type=int, default=300, help="Tokens per reply")
+    parser.add_argument("--first-token", type=float, default=0.35, help="Fake first-token delay in seconds")
+    parser.add_argument("--token-rate", type=float, default=60.0, help="Fake generation rate in tokens/sec")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent streams")
+    args = parser.parse_args()
+
+    executor = BedrockExecutor(
+        max_concurrency=max(args.concurrency, 1),
+        max_queue=args.concurrency * 4,
+        client_factory=lambda: FakeBedrockClient(
+            latency_ms=args.first_token * 1000,
+            tokens_per_second=args.token_rate,
+            output_tokens=args.tokens,
+        ),
+    )
+    service = BedrockService(executor=executor, limit_initial=executor.max_concurrency)
+
+    print(f"🧪 Streaming chat benchmark ({args.tokens} tokens, first token {args.first_token:.2f}s, "
+          f"{args.token_rate:.0f} tok/s, {args.concurrency} concurrent)")
+
+    blocking = await asyncio.gather(*(measure_blocking(service) for _ in range(args.concurrency)))
+    streamed = await asyncio.gather(*(measure_stream(service) for _ in range(args.concurrency)))
+    executor.shutdown()
+
+    ttfts = [r["ttft"] for r in streamed]
+    print(f"Blocking chat   : first visible text after {statistics.median(blocking) * 1000:.0f}ms (p50)")
+    print(f"Streaming chat  : TTFT p50 {statistics.median(ttfts) * 1000:.0f}ms, max {max(ttfts) * 1000:.0f}ms")
+    print(f"Streaming chat  : {statistics.median(r['tokens_per_s'] for r in streamed):.1f} tokens/s per stream, "
+          f"total {statistics.median(r['total'] for r in streamed) * 1000:.0f}ms (p50)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
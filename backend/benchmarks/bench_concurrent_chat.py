@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Concurrent chat benchmark for the Bedrock execution engine
+
+Drives BedrockService.chat with the fake Bedrock client at a fixed
+model latency, and measures throughput plus event-loop lag at increasing
+concurrency levels. Run from the backend directory:
+
+    python -m benchmarks.bench_concurrent_chat --latency 2.0 --levels 1,8,16,32,64
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.services.bedrock_executor import BedrockExecutor
+from app.services.bedrock_service import BedrockService
+from app.services.fake_bedrock import FakeBedrockClient
+
+
+async def measure_loop_lag(stop: asyncio.Event, samples: list, interval: float = 0.05):
+    """Record how late the event loop wakes a sleeping task (a proxy for /health latency)"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - expected))
+
+
+async def run_level(concurrency: int, latency: float, max_concurrency: int, max_queue: int,
+                    limit_initial: int) -> dict:
+    executor = BedrockExecutor(
+        max_concurrency=max_concurrency,
+        max_queue=max_queue,
+        # One output token at a very high rate, so latency is the whole call
+        client_factory=lambda: FakeBedrockClient(latency_ms=latency * 1000, output_tokens=1, tokens_per_second=1e6),
+    )
+    # Start the adaptive limiter at the pool size so the pool, not the limiter's ramp-up, is measured
+    service = BedrockService(executor=executor, limit_initial=limit_initial or max_concurrency)
+
+    stop = asyncio.Event()
+    lag_samples = []
+    lag_task = asyncio.create_task(measure_loop_lag(stop, lag_samples))
+
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(service.chat(message=f"hello {i}") for i in range(concurrency)),
+        return_exceptions=True,
+    )
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await lag_task
+    service.executor.shutdown()
+
+    ok = sum(1 for r in results if isinstance(r, str) and not r.startswith("Error"))
+    return {
+        "concurrency": concurrency,
+        "ok": ok,
+        "errors": concurrency - ok,
+        "elapsed_s": elapsed,
+        "chats_per_s": ok / elapsed if elapsed else 0.0,
+        "max_loop_lag_ms": max(lag_samples, default=0.0) * 1000,
+        "p50_loop_lag_ms": statistics.median(lag_samples) * 1000 if lag_samples else 0.0,
+        "peak_in_flight": service.executor.get_stats()["peak_in_flight"],
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Concurrent chat benchmark")
+    parser.add_argument("--latency", type=float, default=2.0, help="Fake model latency in seconds")
+    parser.add_argument("--levels", default="1,8,16,32,64", help="Comma-separated concurrency levels")
+    parser.add_argument("--max-concurrency", type=int, default=16, help="Executor thread pool size")
+    parser.add_argument("--max-queue", type=int, default=256, help="Executor queue limit")
+    parser.add_argument("--limit-initial", type=int, default=0,
+                        help="Adaptive limiter starting limit per model (0: the pool size)")
+    args = parser.parse_args()
+
+    print(f"🧪 Concurrent chat benchmark (fake latency {args.latency:.2f}s, "
+          f"pool {args.max_concurrency}, queue {args.max_queue})")
+    print(f"{'conc':>6} {'ok':>5} {'err':>5} {'elapsed':>9} {'chats/s':>9} {'peak':>6} {'lag p50':>9} {'lag max':>9}")
+    for level in (int(x) for x in args.levels.split(",")):
+        r = await run_level(level, args.latency, args.max_concurrency, args.max_queue, args.limit_initial)
+        print(f"{r['concurrency']:>6} {r['ok']:>5} {r['errors']:>5} {r['elapsed_s']:>8.2f}s "
+              f"{r['chats_per_s']:>9.2f} {r['peak_in_flight']:>6} "
+              f"{r['p50_loop_lag_ms']:>7.1f}ms {r['max_loop_lag_ms']:>7.1f}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+DOCX extraction benchmark
+
+Compares the old python-docx path (build the Document object model, then walk
+doc.paragraphs) with the streaming extractor on generated documents. Each run
+is a fresh process so peak RSS is its own. Sizes are of the uncompressed
+document.xml. Run from the backend directory:
+
+    python -m benchmarks.bench_docx_extraction --sizes 10,50,100
+    python -m benchmarks.bench_docx_extraction --file big-report.docx
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def run_worker(mode: str, path: str) -> dict:
+    started = time.perf_counter()
+    if mode == "python-docx":
+        import docx
+
+        doc = docx.Document(path)
+        text = "".join(paragraph.text + "\n" for paragraph in doc.paragraphs)
+    else:
+        from app.services.docx_extractor import extract_docx_text
+
+        with open(path, "rb") as f:
+            text = extract_docx_text(f)
+    elapsed = time.perf_counter() - started
+    # ru_maxrss is in KiB on Linux
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {"mode": mode, "elapsed_s": elapsed, "peak_mb": peak_mb, "chars": len(text)}
+
+
+def run(mode: str, path: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_docx_extraction", "--worker", mode, "--file", path],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DOCX extraction benchmark")
+    parser.add_argument("--sizes", default="10,50,100", help="Comma-separated document.xml sizes in MB")
+    parser.add_argument("--file", help="Use this document instead of generated ones")
+    parser.add_argument("--modes", default="python-docx,streaming", help="Comma-separated modes to compare")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.file)))
+        return
+
+    from benchmarks.documents import write_docx
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.file:
+            paths = [args.file]
+        else:
+            paths = []
+            for size in args.sizes.split(","):
+                path = os.path.join(tmp, f"bench-{size}mb.docx")
+                write_docx(path, int(float(size) * 1024 ** 2))
+                paths.append(path)
+
+        print("🧪 DOCX extraction benchmark")
+        print(f"{'document':<22} {'file':>8} {'mode':<12} {'elapsed':>9} {'peak RSS':>10} {'chars':>12}")
+        for path in paths:
+            file_mb = os.path.getsize(path) / 1024 ** 2
+            for mode in args.modes.split(","):
+                r = run(mode, path)
+                print(f"{os.path.basename(path):<22} {file_mb:>6.1f}MB {r['mode']:<12} "
+                      f"{r['elapsed_s']:>8.2f}s {r['peak_mb']:>8.0f}MB {r['chars']:>12,}")
+
+
+if __name__ == "__main__":
+    main()
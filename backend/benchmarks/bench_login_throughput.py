@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Login throughput benchmark
+
+Runs a burst of concurrent password verifications the way /auth/login does,
+comparing bcrypt on the event loop (the old path) with the bounded hashing
+pool, and measures event-loop lag meanwhile (what a concurrent chat stream
+would feel). No database needed. Run from the backend directory:
+
+    python -m benchmarks.bench_login_throughput --logins 200 --concurrency 50 --rounds 12 --workers 1,2,4
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.services.password_hasher import PasswordHasher, PasswordHasherBusyError, make_crypt_context
+
+
+async def measure_loop_lag(stop: asyncio.Event, samples: list, interval: float = 0.01):
+    """Record how late the event loop wakes a sleeping task"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - expected))
+
+
+async def run(mode: str, workers: int, args, hashed: str) -> dict:
+    context = make_crypt_context(args.rounds)
+    hasher = PasswordHasher(rounds=args.rounds, max_workers=workers, max_queue=args.max_queue)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    rejected = 0
+
+    async def login():
+        nonlocal rejected
+        async with semaphore:
+            if mode == "inline":
+                context.verify("correct horse", hashed)
+                await asyncio.sleep(0)
+            else:
+                try:
+                    await hasher.verify("correct horse", hashed)
+                except PasswordHasherBusyError:
+                    rejected += 1
+
+    stop = asyncio.Event()
+    lag = []
+    lag_task = asyncio.create_task(measure_loop_lag(stop, lag))
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(args.logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await lag_task
+    hasher.shutdown()
+
+    lag.sort()
+    return {
+        "mode": mode if mode == "inline" else f"pool x{workers}",
+        "logins_per_s": (args.logins - rejected) / elapsed,
+        "rejected": rejected,
+        "lag_p50_ms": statistics.median(lag) * 1000 if lag else 0.0,
+        "lag_max_ms": lag[-1] * 1000 if lag else 0.0,
+    }
+
+
+async def main_async(args):
+    hashed = make_crypt_context(args.rounds).hash("correct horse")
+    print(f"🧪 Login throughput benchmark ({args.logins} logins, {args.concurrency} concurrent, "
+          f"bcrypt cost {args.rounds})")
+    print(f"{'mode':<10} {'logins/s':>9} {'rejected':>9} {'loop lag p50':>13} {'loop lag max':>13}")
+    runs = [("inline", 0)] + [("pool", int(w)) for w in args.workers.split(",")]
+    for mode, workers in runs:
+        r = await run(mode, workers, args, hashed)
+        print(f"{r['mode']:<10} {r['logins_per_s']:>9.1f} {r['rejected']:>9} "
+              f"{r['lag_p50_ms']:>11.1f}ms {r['lag_max_ms']:>11.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Login throughput benchmark")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost")
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated hashing pool sizes")
+    parser.add_argument("--max-queue", type=int, default=1000, help="Hashing queue limit")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+PDF extraction throughput benchmark
+
+Extracts a generated text PDF with the page-parallel process pool at several
+worker counts and reports pages/sec, next to the single-threaded in-process
+baseline. Run from the backend directory:
+
+    python -m benchmarks.bench_pdf_extraction --pages 500 --workers 1,2,4,8
+    python -m benchmarks.bench_pdf_extraction --file big-report.pdf
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from app.services.document_extractor import extract_text
+from app.services.pdf_extractor import PdfExtractionPool, _pdf_layout
+from benchmarks.documents import write_text_pdf
+
+# Bytes per generated page at the default lines_per_page
+PAGE_BYTES = 4300
+
+
+async def run_pool(path: str, workers: int, repeats: int, min_pages_per_task: int) -> float:
+    pool = PdfExtractionPool(max_workers=workers, timeout=3600, max_pages=10 ** 6,
+                             min_pages_per_task=min_pages_per_task)
+    try:
+        # Warm up so process start-up is not counted
+        await pool.extract(path)
+        started = time.perf_counter()
+        for _ in range(repeats):
+            await pool.extract(path)
+        return (time.perf_counter() - started) / repeats
+    finally:
+        pool.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF extraction throughput benchmark")
+    parser.add_argument("--pages", type=int, default=500, help="Pages in the generated PDF")
+    parser.add_argument("--file", help="Use this PDF instead of a generated one")
+    parser.add_argument("--workers", default="1,2,4,8", help="Comma-separated worker counts")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed extractions per worker count")
+    parser.add_argument("--min-pages-per-task", type=int, default=16, help="Smallest page range per task")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.file
+        if path is None:
+            path = os.path.join(tmp, "bench.pdf")
+            write_text_pdf(path, args.pages * PAGE_BYTES)
+        pages, _ = _pdf_layout(path)
+
+        print(f"🧪 PDF extraction benchmark ({pages} pages, {os.cpu_count()} CPUs)")
+        started = time.perf_counter()
+        with open(path, "rb") as f:
+            extract_text(f, "bench.pdf")
+        baseline = time.perf_counter() - started
+        print(f"{'mode':<16} {'seconds':>9} {'pages/s':>9} {'speedup':>8}")
+        print(f"{'in-process':<16} {baseline:>9.2f} {pages / baseline:>9.0f} {1.0:>7.2f}x")
+
+        for workers in (int(x) for x in args.workers.split(",")):
+            elapsed = asyncio.run(run_pool(path, workers, args.repeats, args.min_pages_per_task))
+            print(f"{f'pool x{workers}':<16} {elapsed:>9.2f} {pages / elapsed:>9.0f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
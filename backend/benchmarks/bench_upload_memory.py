@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Upload memory benchmark
+
+Measures peak RSS of a worker handling concurrent large document uploads,
+comparing the old path (await file.read() then parse the bytes) with parsing
+the spooled upload file in place. Each mode runs in a fresh process so peak
+RSS is not shared between them. Run from the backend directory:
+
+    python -m benchmarks.bench_upload_memory --format pdf --size-mb 10 --concurrency 4
+    python -m benchmarks.bench_upload_memory --file big-report.pdf --concurrency 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+import psutil
+from fastapi import FastAPI, File, UploadFile
+
+from app.middleware.upload_limit import UploadSizeLimitMiddleware
+from app.services.document_extractor import extract_text
+from benchmarks.documents import write_text_file, write_text_pdf
+
+
+def build_app(mode: str) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(UploadSizeLimitMiddleware, max_bytes=8 * 1024 ** 3)
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        if mode == "buffered":
+            content = await file.read()
+            text = extract_text(content, file.filename)
+        else:
+            text = extract_text(file.file, file.filename)
+        return {"chars": len(text)}
+
+    return app
+
+
+async def run_worker(mode: str, path: str, concurrency: int) -> dict:
+    process = psutil.Process()
+    baseline_mb = process.memory_info().rss / 1024 ** 2
+    transport = httpx.ASGITransport(app=build_app(mode))
+
+    async def one_upload(client: httpx.AsyncClient):
+        with open(path, "rb") as f:
+            response = await client.post("/upload", files={"file": (os.path.basename(path), f)})
+        response.raise_for_status()
+        return response.json()["chars"]
+
+    started = time.perf_counter()
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        chars = await asyncio.gather(*(one_upload(client) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    # ru_maxrss is in KiB on Linux
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {"mode": mode, "baseline_mb": baseline_mb, "peak_mb": peak_mb,
+            "elapsed_s": elapsed, "chars": chars[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upload memory benchmark")
+    parser.add_argument("--format", choices=["pdf", "txt"], default="pdf", help="Generated document type")
+    parser.add_argument("--size-mb", type=float, default=10.0, help="Generated document size")
+    parser.add_argument("--file", help="Use this document instead of a generated one")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent uploads")
+    parser.add_argument("--modes", default="buffered,spooled", help="Comma-separated modes to compare")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(asyncio.run(run_worker(args.worker, args.file, args.concurrency))))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.file
+        if path is None:
+            path = os.path.join(tmp, f"bench.{args.format}")
+            size = int(args.size_mb * 1024 ** 2)
+            (write_text_pdf if args.format == "pdf" else write_text_file)(path, size)
+
+        size_mb = os.path.getsize(path) / 1024 ** 2
+        print(f"🧪 Upload memory benchmark ({os.path.basename(path)}, {size_mb:.1f} MB, "
+              f"{args.concurrency} concurrent uploads)")
+        print(f"{'mode':<10} {'baseline':>10} {'peak RSS':>10} {'growth':>10} {'elapsed':>9}")
+        for mode in args.modes.split(","):
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_upload_memory", "--worker", mode,
+                 "--file", path, "--concurrency", str(args.concurrency)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            r = json.loads(output.strip().splitlines()[-1])
+            print(f"{r['mode']:<10} {r['baseline_mb']:>8.0f}MB {r['peak_mb']:>8.0f}MB "
+                  f"{r['peak_mb'] - r['baseline_mb']:>8.0f}MB {r['elapsed_s']:>8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Bulk user provisioning benchmark
+
+Generates a CSV of users and loads it through the provisioning pipeline
+(process-pool bcrypt, chunked bulk_create), reporting hash and insert time.
+The one-at-a-time /auth/register cost is estimated from a serial sample of
+hashes. Needs a database (DATABASE_URL, or --db-url); the benchmark users are
+removed afterwards. Run from the backend directory:
+
+    python -m benchmarks.bench_user_provisioning --users 10000 --rounds 12 --workers 8
+"""
+import argparse
+import asyncio
+import os
+import time
+import uuid
+
+from tortoise import Tortoise
+
+from app.database import DATABASE_URL
+from app.models.user import User
+from app.services.password_hasher import make_crypt_context
+from app.services.user_provisioning import UserProvisioner, parse_rows
+
+
+def make_csv(prefix: str, users: int) -> bytes:
+    lines = ["name,email,username,password"]
+    lines += [f"Bench {i},{prefix}{i}@example.com,{prefix}{i},password{i}" for i in range(users)]
+    return ("\n".join(lines) + "\n").encode()
+
+
+async def main_async(args):
+    await Tortoise.init(db_url=args.db_url, modules={"models": ["app.models.user"]})
+    await Tortoise.generate_schemas(safe=True)
+    prefix = f"bench{uuid.uuid4().hex[:8]}"
+    provisioner = UserProvisioner(max_workers=args.workers, rounds=args.rounds,
+                                  chunk_size=args.chunk_size, max_rows=args.users)
+    try:
+        context = make_crypt_context(args.rounds)
+        started = time.perf_counter()
+        for i in range(args.sample):
+            context.hash(f"password{i}")
+        serial_hash = (time.perf_counter() - started) / args.sample
+
+        rows = parse_rows(make_csv(prefix, args.users), "users.csv")
+        report = await provisioner.provision(rows)
+        stats = provisioner.get_stats()
+
+        print(f"🧪 Provisioning benchmark ({args.users} users, bcrypt cost {args.rounds}, "
+              f"{args.workers} hashing processes, chunks of {args.chunk_size})")
+        print(f"created:            {report['counts'].get('created', 0)}")
+        print(f"total:              {report['elapsed_seconds']:.1f}s")
+        print(f"hashing:            {provisioner.hash_seconds:.1f}s ({stats['hashes_per_second']:.0f}/s)")
+        print(f"inserts:            {provisioner.insert_seconds:.2f}s ({stats['inserts_per_second']:.0f}/s)")
+        print(f"serial hashing est: {serial_hash * args.users:.0f}s ({serial_hash * 1000:.0f}ms per user)")
+    finally:
+        provisioner.shutdown()
+        await User.filter(username__startswith=prefix).delete()
+        await Tortoise.close_connections()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk user provisioning benchmark")
+    parser.add_argument("--db-url", default=os.getenv("BENCH_DATABASE_URL", DATABASE_URL))
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Hashing processes")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Rows per bulk insert")
+    parser.add_argument("--sample", type=int, default=5, help="Serial hashes timed for the estimate")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Token version check
+
+Walks one user through login -> /me -> password change -> /me with the old
+token (must be 401) -> login -> /me -> refresh -> /me, in both token modes,
+and exits non-zero if any step gives the wrong status. Needs a database
+(DATABASE_URL, or --db-url); the check user is removed afterwards. Run from
+the backend directory:
+
+    BCRYPT_ROUNDS=4 python -m benchmarks.check_token_versions
+"""
+import argparse
+import asyncio
+import os
+import sys
+import uuid
+
+import httpx
+from fastapi import FastAPI
+from tortoise import Tortoise
+
+from app.api.v1.auth import router as auth_router
+from app.core.config import settings
+from app.database import DATABASE_URL
+from app.models.user import User
+from app.services.auth_service import AuthService
+from app.services.login_throttle import login_throttle
+
+
+async def run_mode(client: httpx.AsyncClient, stateless: bool, prefix: str) -> list:
+    settings.AUTH_STATELESS_TOKENS = stateless
+    user = {"name": "Check", "email": f"{prefix}{int(stateless)}@example.com",
+            "username": f"{prefix}{int(stateless)}", "password": "first password"}
+    results = []
+
+    async def step(name: str, expected: int, request):
+        response = await request
+        results.append((name, expected, response.status_code))
+        return response
+
+    def me(token: str):
+        return client.get("/me", headers={"Authorization": f"Bearer {token}"})
+
+    def login(password: str):
+        return client.post("/login", json={"username": user["username"], "password": password})
+
+    await step("register", 201, client.post("/register", json=user))
+    first = (await step("login", 200, login("first password"))).json()["token"]
+    await step("me", 200, me(first["access_token"]))
+
+    await AuthService.update_user(user["username"], password="second password")
+    await step("me with pre-change token", 401, me(first["access_token"]))
+    await step("refresh with pre-change token", 401, client.post("/refresh", json={"refresh_token": first["refresh_token"]}))
+
+    second = (await step("login after change", 200, login("second password"))).json()["token"]
+    await step("me after re-login", 200, me(second["access_token"]))
+    refreshed = (await step("refresh", 200, client.post("/refresh", json={"refresh_token": second["refresh_token"]}))).json()
+    await step("me with refreshed token", 200, me(refreshed["access_token"]))
+    return results
+
+
+async def main_async(args) -> int:
+    await Tortoise.init(db_url=args.db_url, modules={"models": ["app.models.user", "app.models.token"]})
+    await Tortoise.generate_schemas(safe=True)
+    # Every login comes from the same transport address
+    login_throttle.enabled = False
+
+    app = FastAPI()
+    app.include_router(auth_router, prefix="/api/v1")
+    prefix = f"check{uuid.uuid4().hex[:8]}"
+    failures = 0
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://check/api/v1/auth") as client:
+            for stateless in (False, True):
+                print(f"🧪 {'stateless' if stateless else 'database'} tokens")
+                for name, expected, got in await run_mode(client, stateless, prefix):
+                    ok = expected == got
+                    failures += not ok
+                    print(f"  {'✅' if ok else '❌'} {name:<32} expected {expected}, got {got}")
+    finally:
+        await User.filter(username__startswith=prefix).delete()
+        await Tortoise.close_connections()
+    return 1 if failures else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Token version check")
+    parser.add_argument("--db-url", default=os.getenv("BENCH_DATABASE_URL", DATABASE_URL))
+    sys.exit(asyncio.run(main_async(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
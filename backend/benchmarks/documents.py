@@ -0,0 +1,89 @@
+"""
+Synthetic documents for the extraction benchmarks
+"""
+
+LINE = "Co-intelligence means people and models working on the same document together. "
+
+
+def write_text_file(path: str, size_bytes: int):
+    with open(path, "w") as f:
+        block = (LINE + "\n") * 1000
+        for _ in range(max(1, size_bytes // len(block))):
+            f.write(block)
+
+
+def write_text_pdf(path: str, size_bytes: int, lines_per_page: int = 50):
+    """Write an uncompressed text PDF of roughly size_bytes without a PDF library"""
+    content = "BT /F1 10 Tf 40 800 Td 12 TL " + " ".join(f"({LINE}) '" for _ in range(lines_per_page)) + " ET"
+    stream = f"<< /Length {len(content)} >>\nstream\n{content}\nendstream"
+    pages = max(1, size_bytes // (len(stream) + 120))
+
+    # Objects: 1 catalog, 2 page tree, 3 font, then a (page, content) pair per page
+    page_ids = [4 + 2 * i for i in range(pages)]
+    offsets = []
+    with open(path, "wb") as f:
+        def write_object(number: int, body: str):
+            offsets.append(f.tell())
+            f.write(f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1"))
+
+        f.write(b"%PDF-1.4\n")
+        write_object(1, "<< /Type /Catalog /Pages 2 0 R >>")
+        write_object(2, f"<< /Type /Pages /Kids [{' '.join(f'{p} 0 R' for p in page_ids)}] /Count {pages} >>")
+        write_object(3, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+        for page_id in page_ids:
+            write_object(page_id, f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+                                  f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>")
+            write_object(page_id + 1, stream)
+
+        xref_at = f.tell()
+        f.write(f"xref\n0 {len(offsets) + 1}\n0000000000 65535 f \n".encode())
+        for offset in offsets:
+            f.write(f"{offset:010d} 00000 n \n".encode())
+        f.write(f"trailer\n<< /Size {len(offsets) + 1} /Root 1 0 R >>\nstartxref\n{xref_at}\n%%EOF\n".encode())
+
+
+_DOCX_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+_DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="word/document.xml" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+    '</Relationships>'
+)
+_W_NS = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+
+def write_docx(path: str, size_bytes: int, table_every: int = 20):
+    """
+    Write a .docx whose document.xml is roughly size_bytes without a DOCX library,
+    with a three-column table after every table_every paragraphs, plus a header,
+    footer and footnote part; the XML is streamed into the zip
+    """
+    import zipfile
+
+    paragraph = f'<w:p><w:r><w:t xml:space="preserve">{LINE}</w:t></w:r></w:p>'
+    cell = f'<w:tc><w:p><w:r><w:t>{LINE[:30]}</w:t></w:r></w:p></w:tc>'
+    table = "<w:tbl>" + f"<w:tr>{cell * 3}</w:tr>" * 3 + "</w:tbl>"
+    block = (paragraph * table_every + table).encode()
+
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _DOCX_TYPES)
+        archive.writestr("_rels/.rels", _DOCX_RELS)
+        with archive.open("word/document.xml", "w", force_zip64=True) as f:
+            f.write(f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                    f'<w:document {_W_NS}><w:body>'.encode())
+            for _ in range(max(1, size_bytes // len(block))):
+                f.write(block)
+            f.write(b"</w:body></w:document>")
+        archive.writestr("word/header1.xml", f"<w:hdr {_W_NS}>{paragraph}</w:hdr>")
+        archive.writestr("word/footer1.xml", f"<w:ftr {_W_NS}>{paragraph}</w:ftr>")
+        archive.writestr("word/footnotes.xml", f"<w:footnotes {_W_NS}><w:footnote w:id=\"1\">"
+                                               f"{paragraph}</w:footnote></w:footnotes>")
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test for the backend API
+
+Registers and logs in a pool of virtual users, then drives a weighted mix of
+chat, analyze-text, analyze-document, apps and system-stats requests for a fixed
+duration. Reports p50/p95/p99 latency, throughput and error rates per endpoint,
+and can save results as JSON and compare them against a previous run.
+
+Start the backend with BEDROCK_CLIENT=fake (see app/services/fake_bedrock.py)
+to measure the service itself without Bedrock cost. Every virtual user logs in
+from this machine's address, so also set LOGIN_THROTTLE_ENABLED=false (or raise
+LOGIN_THROTTLE_MAX_PER_IP) for more users than the per-IP login limit. Then,
+from the backend directory:
+
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.load_test --users 32 --duration 60 --json-out run.json
+    python -m benchmarks.load_test --users 32 --duration 60 --baseline run.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+import uuid
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+
+DEFAULT_MIX = "chat=4,analyze_text=2,analyze_document=1,apps=3,system_stats=2"
+
+SAMPLE_PARAGRAPH = (
+    "Generative AI systems combine large language models with retrieval, tools and "
+    "human review to support analysts in drafting, summarizing and checking documents. "
+)
+
+
+class Recorder:
+    """Collects per-endpoint latencies and outcomes"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.overloaded: Dict[str, int] = defaultdict(int)
+
+    def record(self, endpoint: str, elapsed: float, status_code: Optional[int]):
+        self.latencies[endpoint].append(elapsed)
+        if status_code is None or status_code >= 400:
+            self.errors[endpoint] += 1
+        if status_code in (429, 503):
+            self.overloaded[endpoint] += 1
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+async def timed(client: httpx.AsyncClient, recorder: Recorder, endpoint: str, method: str, url: str, **kwargs):
+    started = time.perf_counter()
+    status_code = None
+    try:
+        response = await client.request(method, url, **kwargs)
+        status_code = response.status_code
+        return response
+    except httpx.HTTPError:
+        return None
+    finally:
+        recorder.record(endpoint, time.perf_counter() - started, status_code)
+
+
+class VirtualUser:
+    def __init__(self, index: int, client: httpx.AsyncClient, recorder: Recorder, args):
+        self.index = index
+        self.client = client
+        self.recorder = recorder
+        self.args = args
+        self.username = f"load{uuid.uuid4().hex[:10]}{index}"
+        self.headers: Dict[str, str] = {}
+        if args.cache_bypass:
+            self.headers["X-Cache-Bypass"] = "true"
+
+    async def authenticate(self) -> bool:
+        """Register then log in, so both auth endpoints are measured"""
+        password = "loadtest-password"
+        await timed(self.client, self.recorder, "auth_register", "POST", "/api/v1/auth/register", json={
+            "name": f"Load User {self.index}",
+            "email": f"{self.username}@example.com",
+            "username": self.username,
+            "password": password,
+        })
+        response = await timed(self.client, self.recorder, "auth_login", "POST", "/api/v1/auth/login", json={
+            "username": self.username,
+            "password": password,
+        })
+        if response is None or response.status_code != 200:
+            return False
+        self.headers["Authorization"] = f"Bearer {response.json()['token']['access_token']}"
+        return True
+
+    def _document_text(self) -> str:
+        repeats = max(1, self.args.doc_chars // len(SAMPLE_PARAGRAPH))
+        return SAMPLE_PARAGRAPH * repeats
+
+    async def chat(self):
+        await timed(self.client, self.recorder, "chat", "POST", "/api/v1/bedrock/chat", headers=self.headers,
+                    json={"message": f"Give me one tip about prompt design ({random.randint(0, 10**6)})"})
+
+    async def analyze_text(self):
+        await timed(self.client, self.recorder, "analyze_text", "POST", "/api/v1/bedrock/analyze-text",
+                    headers=self.headers,
+                    json={"text": self._document_text(), "analysis_type": random.choice(["summary", "key_points"])})
+
+    async def analyze_document(self):
+        files = {"file": ("load-test.txt", self._document_text().encode("utf-8"), "text/plain")}
+        await timed(self.client, self.recorder, "analyze_document", "POST", "/api/v1/bedrock/analyze-document",
+                    headers=self.headers, files=files)
+
+    async def apps(self):
+        await timed(self.client, self.recorder, "apps", "GET", "/api/v1/apps")
+
+    async def system_stats(self):
+        await timed(self.client, self.recorder, "system_stats", "GET", "/api/v1/system/stats", headers=self.headers)
+
+    async def run(self, deadline: float, mix: Dict[str, int]):
+        actions = list(mix)
+        weights = [mix[a] for a in actions]
+        while time.perf_counter() < deadline:
+            await getattr(self, random.choices(actions, weights)[0])()
+            if self.args.think_time:
+                await asyncio.sleep(random.uniform(0, self.args.think_time * 2))
+
+
+def parse_mix(spec: str) -> Dict[str, int]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if not hasattr(VirtualUser, name) or name in ("run", "authenticate"):
+            raise SystemExit(f"Unknown endpoint in --mix: {name}")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+def summarize(recorder: Recorder, duration: float) -> Dict[str, Dict[str, float]]:
+    summary = {}
+    for endpoint, values in sorted(recorder.latencies.items()):
+        values = sorted(values)
+        count = len(values)
+        summary[endpoint] = {
+            "requests": count,
+            "errors": recorder.errors[endpoint],
+            "overloaded": recorder.overloaded[endpoint],
+            "error_rate": recorder.errors[endpoint] / count if count else 0.0,
+            "throughput_rps": count / duration if duration else 0.0,
+            "mean_ms": sum(values) / count * 1000 if count else 0.0,
+            "p50_ms": percentile(values, 50) * 1000,
+            "p95_ms": percentile(values, 95) * 1000,
+            "p99_ms": percentile(values, 99) * 1000,
+        }
+    return summary
+
+
+def print_report(summary: Dict[str, Dict[str, float]], baseline: Optional[Dict] = None):
+    print(f"{'endpoint':<18} {'reqs':>6} {'rps':>8} {'err%':>6} {'429/503':>8} "
+          f"{'p50':>9} {'p95':>9} {'p99':>9}")
+    for endpoint, r in summary.items():
+        line = (f"{endpoint:<18} {r['requests']:>6} {r['throughput_rps']:>8.2f} {r['error_rate'] * 100:>5.1f}% "
+                f"{r['overloaded']:>8} {r['p50_ms']:>7.0f}ms {r['p95_ms']:>7.0f}ms {r['p99_ms']:>7.0f}ms")
+        previous = (baseline or {}).get(endpoint)
+        if previous and previous["p95_ms"]:
+            line += f"  p95 {(r['p95_ms'] / previous['p95_ms'] - 1) * 100:+.0f}% vs baseline"
+        print(line)
+
+
+def regressions(summary: Dict, baseline: Dict, threshold_pct: float) -> List[str]:
+    """Endpoints whose p95 latency or error rate got worse than the baseline allows"""
+    found = []
+    for endpoint, r in summary.items():
+        previous = baseline.get(endpoint)
+        if not previous:
+            continue
+        if previous["p95_ms"] and r["p95_ms"] > previous["p95_ms"] * (1 + threshold_pct / 100):
+            found.append(f"{endpoint}: p95 {previous['p95_ms']:.0f}ms -> {r['p95_ms']:.0f}ms")
+        if r["error_rate"] > previous["error_rate"] + 0.01:
+            found.append(f"{endpoint}: error rate {previous['error_rate']:.1%} -> {r['error_rate']:.1%}")
+    return found
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="End-to-end backend load test")
+    parser.add_argument("--base-url", default="http://localhost:8000", help="Backend base URL")
+    parser.add_argument("--users", type=int, default=16, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="Test duration in seconds")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Weighted endpoint mix, e.g. chat=4,apps=1")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean pause between requests per user")
+    parser.add_argument("--doc-chars", type=int, default=4000, help="Size of analyzed texts and documents")
+    parser.add_argument("--cache-bypass", action="store_true", help="Send X-Cache-Bypass on analysis requests")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout in seconds")
+    parser.add_argument("--json-out", help="Write the summary to this JSON file")
+    parser.add_argument("--baseline", help="Compare against a summary written by --json-out")
+    parser.add_argument("--fail-threshold", type=float, default=20.0,
+                        help="Exit non-zero if p95 regresses more than this percent over the baseline")
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["endpoints"]
+
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=args.users * 2, max_keepalive_connections=args.users * 2)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        users = [VirtualUser(i, client, recorder, args) for i in range(args.users)]
+        authenticated = await asyncio.gather(*(u.authenticate() for u in users))
+        users = [u for u, ok in zip(users, authenticated) if ok]
+        if not users:
+            raise SystemExit("❌ No virtual user could log in; is the backend running?")
+
+        print(f"🧪 Load test: {len(users)} users for {args.duration:.0f}s against {args.base_url}")
+        started = time.perf_counter()
+        await asyncio.gather(*(u.run(started + args.duration, mix) for u in users))
+        elapsed = time.perf_counter() - started
+
+    summary = summarize(recorder, elapsed)
+    total = sum(r["requests"] for name, r in summary.items() if not name.startswith("auth_"))
+    print_report(summary, baseline)
+    print(f"Total: {total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s, auth excluded)")
+
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump({"started_at": time.time() - elapsed, "users": len(users), "duration_s": elapsed,
+                       "mix": mix, "endpoints": summary}, f, indent=2)
+        print(f"Saved results to {args.json_out}")
+
+    if baseline:
+        found = regressions(summary, baseline, args.fail_threshold)
+        for item in found:
+            print(f"⚠️  Regression: {item}")
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
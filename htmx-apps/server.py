@@ -1,10 +1,13 @@
 from fastapi import FastAPI, Form, File, UploadFile, HTTPException, Header
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import HTMLResponse, FileResponse, StreamingResponse, Response
 from fastapi.staticfiles import StaticFiles
 import requests
 import os
 import asyncio
 import time
+import html
+import json
+import uuid
 from duckduckgo_search import DDGS
 from typing import Dict, List, Optional
 
@@ -17,6 +20,13 @@ PORT = int(os.getenv("PORT", "8501"))
 # In-memory conversation storage (in production, use proper session management)
 conversations: Dict[str, List] = {}
 
+# Chat messages waiting for their SSE stream to be opened, keyed by stream id
+pending_streams: Dict[str, Dict] = {}
+PENDING_STREAM_TTL = 60  # seconds
+
+# Warn before analyses estimated to send more input tokens than this
+ESTIMATE_WARN_TOKENS = int(os.getenv("ESTIMATE_WARN_TOKENS", "50000"))
+
 # Rate limiting for web search
 last_search_time = 0
 SEARCH_COOLDOWN = 3  # seconds
@@ -44,6 +54,46 @@ def make_authenticated_request(method, url, auth_header=None, **kwargs):
     else:
         raise ValueError(f"Unsupported HTTP method: {method}")
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+def stream_multipart(upload: UploadFile):
+    """
+    (headers, body iterator) for a multipart/form-data request carrying only the
+    upload as "file"; the body is read from the spooled upload a chunk at a time,
+    so requests sends it chunked instead of building it in memory. The backend
+    takes analysis options as query parameters, so pass them with params=.
+    """
+    boundary = uuid.uuid4().hex
+    filename = (upload.filename or "upload").replace('"', "%22").replace("\r", "").replace("\n", "")
+    content_type = upload.content_type or "application/octet-stream"
+
+    def body():
+        yield (f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+               f'Content-Type: {content_type}\r\n\r\n').encode()
+        upload.file.seek(0)
+        while True:
+            chunk = upload.file.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+        yield f'\r\n--{boundary}--\r\n'.encode()
+
+    return {"Content-Type": f"multipart/form-data; boundary={boundary}"}, body()
+
+def render_estimate(input_tokens: int, calls: int) -> str:
+    """Estimated token usage line, highlighted past ESTIMATE_WARN_TOKENS"""
+    css = "estimate-warning" if input_tokens > ESTIMATE_WARN_TOKENS else "estimate-info"
+    icon = "⚠️" if input_tokens > ESTIMATE_WARN_TOKENS else "🔢"
+    plural = "" if calls == 1 else "s"
+    return f'<div class="{css}">{icon} About {input_tokens:,} input tokens in {calls} model call{plural}</div>'
+
+def estimate_from_headers(response) -> str:
+    """Estimate line from the backend's X-Estimated-* response headers, if present"""
+    tokens = response.headers.get("X-Estimated-Input-Tokens")
+    if tokens is None:
+        return ""
+    return render_estimate(int(tokens), int(response.headers.get("X-Estimated-Bedrock-Calls", "1")))
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -142,6 +192,106 @@ async def chat(
             </div>
         """)
 
+@app.post("/chat/stream")
+async def chat_stream_start(
+    message: str = Form(...),
+    authorization: Optional[str] = Header(None)
+):
+    """Start a streaming chat turn and return bubbles wired to the SSE relay"""
+    # Drop streams that were never opened
+    now = time.time()
+    for stale_id in [k for k, v in pending_streams.items() if now - v["created_at"] > PENDING_STREAM_TTL]:
+        pending_streams.pop(stale_id, None)
+
+    stream_id = uuid.uuid4().hex
+    pending_streams[stream_id] = {
+        "message": message,
+        "authorization": authorization,
+        "session_id": "default",  # In production, use proper session management
+        "created_at": now
+    }
+
+    return HTMLResponse(f"""
+        <div class="message user">
+            <div class="message-bubble">{html.escape(message)}</div>
+        </div>
+        <div class="message assistant" hx-ext="sse" sse-connect="/chat/stream/{stream_id}">
+            <div class="message-bubble" sse-swap="token" hx-swap="beforeend"></div>
+            <span sse-swap="done" hx-swap="none"></span>
+        </div>
+    """)
+
+def _relay_chat_stream(pending: Dict):
+    """Relay backend SSE events as HTML fragments for the htmx SSE extension"""
+    session_id = pending["session_id"]
+    if session_id not in conversations:
+        conversations[session_id] = []
+
+    reply_parts = []
+    event_name = None
+    try:
+        with make_authenticated_request(
+            'POST',
+            f"{API_BASE_URL}/api/v1/bedrock/chat/stream",
+            auth_header=pending["authorization"],
+            json={
+                "message": pending["message"],
+                "conversation_history": conversations[session_id]
+            },
+            stream=True,
+            timeout=(5, 120)
+        ) as response:
+            if response.status_code != 200:
+                error = html.escape(f"Error: {response.status_code} - {response.text}")
+                yield f"event: token\ndata: {error}\n\n"
+                yield "event: done\ndata: \n\n"
+                return
+
+            for line in response.iter_lines(decode_unicode=True):
+                if line.startswith("event:"):
+                    event_name = line[len("event:"):].strip()
+                elif line.startswith("data:"):
+                    data = json.loads(line[len("data:"):].strip() or "{}")
+                    if event_name == "token":
+                        reply_parts.append(data["text"])
+                        fragment = html.escape(data["text"]).replace("\n", "<br>")
+                        yield f"event: token\ndata: {fragment}\n\n"
+                    elif event_name == "error":
+                        error = html.escape(f"Error: {data.get('detail', 'unknown error')}")
+                        yield f"event: token\ndata: {error}\n\n"
+                    elif event_name == "done":
+                        break
+    except Exception as e:
+        error = html.escape(f"Error connecting to backend: {str(e)}")
+        yield f"event: token\ndata: {error}\n\n"
+
+    # Update conversation history once the full reply is known
+    if reply_parts:
+        conversations[session_id].append({
+            "role": "user",
+            "content": [{"text": pending["message"]}]
+        })
+        conversations[session_id].append({
+            "role": "assistant",
+            "content": [{"text": "".join(reply_parts)}]
+        })
+
+    yield "event: done\ndata: \n\n"
+
+@app.get("/chat/stream/{stream_id}")
+async def chat_stream_relay(stream_id: str):
+    """SSE relay for a pending chat turn"""
+    pending = pending_streams.pop(stream_id, None)
+    if pending is None:
+        # 204 tells EventSource not to reconnect once the turn is finished
+        return Response(status_code=204)
+
+    return StreamingResponse(
+        _relay_chat_stream(pending),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.post("/analyze-text")
 async def analyze_text(
     text: str = Form(...), 
@@ -175,6 +325,7 @@ async def analyze_text(
                 <div class="analysis-result">
                     <h3>{title}</h3>
                     <div style="white-space: pre-wrap; line-height: 1.6;">{analysis}</div>
+                    {estimate_from_headers(response)}
                 </div>
             """)
         else:
@@ -198,16 +349,16 @@ async def analyze_document(
 ):
     """Handle document analysis requests"""
     try:
-        # Forward file to backend
-        files = {"file": (file.filename, await file.read(), file.content_type)}
-        data = {"analysis_type": analysis_type}
+        # Stream the spooled upload to the backend instead of building the multipart body in memory
+        headers, body = stream_multipart(file)
         
         response = make_authenticated_request(
             'POST',
             f"{API_BASE_URL}/api/v1/bedrock/analyze-document",
             auth_header=authorization,
-            files=files,
-            data=data,
+            headers=headers,
+            data=body,
+            params={"analysis_type": analysis_type},
             timeout=60
         )
         
@@ -225,6 +376,7 @@ async def analyze_document(
                 <div class="analysis-result">
                     <h3>{title}</h3>
                     <div style="white-space: pre-wrap; line-height: 1.6;">{analysis}</div>
+                    {estimate_from_headers(response)}
                 </div>
             """)
         else:
@@ -240,6 +392,34 @@ async def analyze_document(
             </div>
         """)
 
+@app.post("/estimate-document")
+async def estimate_document(
+    file: UploadFile = File(...),
+    analysis_type: str = Form("summary"),
+    authorization: Optional[str] = Header(None)
+):
+    """Estimate a document analysis before running it, so large ones can be reconsidered"""
+    try:
+        headers, body = stream_multipart(file)
+        response = make_authenticated_request(
+            'POST',
+            f"{API_BASE_URL}/api/v1/bedrock/estimate-document",
+            auth_header=authorization,
+            headers=headers,
+            data=body,
+            params={"analysis_type": analysis_type},
+            timeout=60
+        )
+        if response.status_code == 200:
+            estimate = response.json()
+            return HTMLResponse(render_estimate(estimate["input_tokens"], estimate["calls"]))
+        if response.status_code == 413:
+            return HTMLResponse(f'<div class="estimate-warning">⚠️ {html.escape(response.json()["detail"])}</div>')
+        return HTMLResponse("")
+    except Exception:
+        # The estimate is advisory; analysis still works without it
+        return HTMLResponse("")
+
 async def search_web_with_retry(query: str, max_results: int = 5, max_retries: int = 3) -> List[Dict]:
     """Perform web search with retry logic and rate limiting"""
     global last_search_time
@@ -54,6 +54,7 @@ export const AuthProvider = ({ children }) => {
     setToken(null);
     setError(null);
     localStorage.removeItem('auth_token');
+    localStorage.removeItem('auth_refresh_token');
     localStorage.removeItem('auth_user');
   };
 
@@ -69,6 +70,7 @@ export const AuthProvider = ({ children }) => {
       
       // Store in localStorage
       localStorage.setItem('auth_token', response.token.access_token);
+      localStorage.setItem('auth_refresh_token', response.token.refresh_token);
       localStorage.setItem('auth_user', JSON.stringify(response.user));
       
       return response;
@@ -92,6 +94,7 @@ export const AuthProvider = ({ children }) => {
       
       // Store in localStorage
       localStorage.setItem('auth_token', response.token.access_token);
+      localStorage.setItem('auth_refresh_token', response.token.refresh_token);
       localStorage.setItem('auth_user', JSON.stringify(response.user));
       
       return response;
@@ -106,7 +109,7 @@ export const AuthProvider = ({ children }) => {
   const logout = async () => {
     try {
       if (token) {
-        await authService.logout(token);
+        await authService.logout(token, localStorage.getItem('auth_refresh_token'));
       }
     } catch (error) {
       console.error('Logout error:', error);
@@ -117,11 +120,14 @@ export const AuthProvider = ({ children }) => {
 
   const refreshToken = async () => {
     try {
-      if (!token) return null;
+      const storedRefreshToken = localStorage.getItem('auth_refresh_token');
+      if (!storedRefreshToken) return null;
       
-      const response = await authService.refreshToken(token);
+      // Refresh tokens are single-use; keep the rotated one for next time
+      const response = await authService.refreshToken(storedRefreshToken);
       setToken(response.access_token);
       localStorage.setItem('auth_token', response.access_token);
+      localStorage.setItem('auth_refresh_token', response.refresh_token);
       
       return response.access_token;
     } catch (error) {
@@ -80,14 +80,15 @@ class AuthService {
     }
   }
 
-  async logout(token) {
+  async logout(token, refreshToken) {
     try {
       const response = await fetch(`${this.baseURL}/auth/logout`, {
         method: 'POST',
         headers: {
           'Authorization': `Bearer ${token}`,
           'Content-Type': 'application/json',
-        }
+        },
+        body: refreshToken ? JSON.stringify({ refresh_token: refreshToken }) : undefined
       });
 
       if (!response.ok) {
@@ -103,14 +104,14 @@ class AuthService {
     }
   }
 
-  async refreshToken(token) {
+  async refreshToken(refreshToken) {
     try {
       const response = await fetch(`${this.baseURL}/auth/refresh`, {
         method: 'POST',
         headers: {
-          'Authorization': `Bearer ${token}`,
           'Content-Type': 'application/json',
-        }
+        },
+        body: JSON.stringify({ refresh_token: refreshToken })
       });
 
       if (!response.ok) {